@@ -0,0 +1,30 @@
+#!/bin/bash
+
+# Script to apply schema to the Solr NYT articles collection using Schema API
+# Run this after creating the collection: bin/solr create -c nyt_articles
+# Assumes the text_general field type from apply_schema.sh (or the default configset)
+
+SOLR_URL="${ARTICLES_SOLR_URL:-http://localhost:8983/solr/nyt_articles}"
+
+echo "Applying schema to nyt_articles collection..."
+
+# Add fields
+curl -X POST -H 'Content-type:application/json' \
+  "${SOLR_URL}/schema" -d '{
+  "add-field": [
+    {"name": "imdb_id", "type": "string", "stored": true, "indexed": true, "docValues": true},
+    {"name": "movie_title", "type": "text_general", "stored": true, "indexed": true},
+    {"name": "headline", "type": "text_general", "stored": true, "indexed": true},
+    {"name": "abstract", "type": "text_general", "stored": true, "indexed": true},
+    {"name": "snippet", "type": "text_general", "stored": true, "indexed": true},
+    {"name": "lead_paragraph", "type": "text_general", "stored": true, "indexed": true},
+    {"name": "pub_date", "type": "pdate", "stored": true, "indexed": true},
+    {"name": "web_url", "type": "string", "stored": true, "indexed": false},
+    {"name": "source", "type": "string", "stored": true, "indexed": false},
+    {"name": "confidence", "type": "pfloat", "stored": true, "indexed": true}
+  ]
+}'
+
+echo ""
+echo "Schema applied successfully!"
+echo "You can verify at: ${SOLR_URL}/schema"
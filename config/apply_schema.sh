@@ -2,10 +2,43 @@
 
 # Script to apply schema to Solr movies collection using Schema API
 # Run this after creating the movies collection
+#
+# Usage:
+#   ./apply_schema.sh                  Apply the default schema to $SOLR_URL
+#   ./apply_schema.sh --profile perf   Also apply the performance profile
+#                                      (docValues, term vectors, offsets; see
+#                                      managed-schema-perf)
+#   ./apply_schema.sh --compare        Create the side collection $SIDE_CORE,
+#                                      apply the performance profile, reindex
+#                                      $DATA_FILE into it and compare latency
+#                                      and index size against $SOLR_URL
+#                                      (index both from the same data file
+#                                      for a fair comparison)
 
-SOLR_URL="http://localhost:8983/solr/movies"
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+SOLR_URL="${SOLR_URL:-http://localhost:8983/solr/movies}"
+SIDE_CORE="${SIDE_CORE:-movies_perf}"
+DATA_FILE="${DATA_FILE:-${SCRIPT_DIR}/../data/solr/movies.json}"
 
-echo "Applying schema to movies collection..."
+PROFILE="default"
+COMPARE=false
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --profile) PROFILE="$2"; shift 2 ;;
+    --compare) COMPARE=true; PROFILE="perf"; shift ;;
+    *) echo "Unknown option: $1"; exit 1 ;;
+  esac
+done
+
+if [ "$COMPARE" = true ]; then
+  BASELINE_URL="$SOLR_URL"
+  SOLR_URL="${SOLR_URL%/*}/${SIDE_CORE}"
+
+  echo "Creating side collection ${SIDE_CORE}..."
+  curl -s "${SOLR_URL%/*}/admin/cores?action=CREATE&name=${SIDE_CORE}&configSet=_default" > /dev/null
+fi
+
+echo "Applying schema to ${SOLR_URL}..."
 
 # Add text_general field type
 curl -X POST -H 'Content-type:application/json' \
@@ -82,6 +115,40 @@ curl -X POST -H 'Content-type:application/json' \
   ]
 }'
 
+# Performance profile: docValues for faceting/sorting, offsets for the
+# highlighter and term vectors for MoreLikeThis
+if [ "$PROFILE" = "perf" ]; then
+  echo "Applying performance profile..."
+  curl -X POST -H 'Content-type:application/json' \
+    "${SOLR_URL}/schema" -d '{
+    "replace-field": [
+      {"name": "id", "type": "string", "stored": true, "indexed": true, "required": true, "multiValued": false, "docValues": true},
+      {"name": "genres", "type": "string", "stored": true, "indexed": true, "multiValued": true, "docValues": true},
+      {"name": "directors", "type": "string", "stored": true, "indexed": true, "multiValued": true, "docValues": true},
+      {"name": "cast", "type": "string", "stored": true, "indexed": true, "multiValued": true, "docValues": true},
+      {"name": "site", "type": "string", "stored": true, "indexed": true, "docValues": true},
+      {"name": "plot", "type": "text_general", "stored": true, "indexed": true, "storeOffsetsWithPositions": true, "termVectors": true},
+      {"name": "reviews", "type": "text_general", "stored": true, "indexed": true, "storeOffsetsWithPositions": true, "termVectors": true},
+      {"name": "text", "type": "text_general", "stored": false, "indexed": true, "multiValued": true, "termVectors": true}
+    ]
+  }'
+fi
+
 echo ""
 echo "Schema applied successfully!"
 echo "You can verify at: ${SOLR_URL}/schema"
+
+if [ "$COMPARE" = true ]; then
+  # Schema changes only take effect for newly indexed documents
+  echo ""
+  echo "Reindexing ${DATA_FILE} into ${SIDE_CORE}..."
+  curl -s -X POST -H 'Content-type:application/json' \
+    "${SOLR_URL}/update?commit=true" --data-binary "@${DATA_FILE}" || exit 1
+
+  echo ""
+  echo "Comparing ${BASELINE_URL} against ${SOLR_URL}..."
+  python3 "${SCRIPT_DIR}/compare_schemas.py" \
+    --baseline "${BASELINE_URL}" \
+    --candidate "${SOLR_URL}" \
+    --output "${SCRIPT_DIR}/../reports/schema_comparison.json"
+fi
@@ -0,0 +1,227 @@
+"""
+Compares query latency and index size of two Solr collections holding the
+same documents under different schemas (e.g. movies and movies_perf).
+
+The same query set is run against both collections for each feature the
+web app uses (search, faceting, highlighting, sorting, MoreLikeThis), with
+Solr's query result cache bypassed, and per-feature latency and index-size
+deltas are reported.
+
+Usage:
+    python compare_schemas.py --baseline http://localhost:8983/solr/movies \\
+        --candidate http://localhost:8983/solr/movies_perf
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+DEFAULT_QUERIES = [
+    'batman', 'love', 'war', 'space', 'murder', 'family',
+    'comedy', 'detective', 'zombie', 'christmas', 'robot', 'heist'
+]
+
+FACET_FIELDS = ['genres', 'year', 'directors', 'cast', 'site']
+
+
+def feature_params(query: str, doc_id: Optional[str]) -> Dict[str, Dict]:
+    """
+    Build the Solr parameters of each feature for one query.
+
+    Mirrors what SolrClient sends for /search and /similar.
+
+    Args:
+        query: Query text
+        doc_id: Document used as MoreLikeThis source (skipped if None)
+
+    Returns:
+        Mapping of feature name to Solr parameters
+    """
+    q = '{!lucene cache=false}text:' + query
+    features = {
+        'search': {'q': q, 'rows': 10, 'fl': 'id,title,year,rating'},
+        'facets': {
+            'q': q, 'rows': 0, 'facet': 'true', 'facet.field': FACET_FIELDS,
+            'facet.mincount': 1, 'facet.limit': 20
+        },
+        'highlight': {
+            'q': q, 'rows': 10, 'fl': 'id', 'hl': 'true', 'hl.fl': 'plot,reviews',
+            'hl.fragsize': 200
+        },
+        'sort': {'q': q, 'rows': 10, 'fl': 'id', 'sort': 'rating desc, num_reviews desc'},
+    }
+    if doc_id is not None:
+        features['mlt'] = {
+            'q': '{!lucene cache=false}id:' + doc_id, 'mlt': 'true',
+            'mlt.fl': 'text,genres,cast,directors', 'mlt.mindf': 1, 'mlt.mintf': 1,
+            'mlt.minwl': 3, 'mlt.maxqt': 25, 'mlt.count': 10, 'fl': 'id'
+        }
+    return features
+
+
+def timed_select(session: requests.Session, url: str, params: Dict) -> Dict[str, float]:
+    """
+    Run one select request.
+
+    Returns:
+        Wall time and Solr QTime in milliseconds
+    """
+    started = time.perf_counter()
+    response = session.get(f'{url}/select', params=dict(params, wt='json'), timeout=60)
+    wall = (time.perf_counter() - started) * 1000
+    response.raise_for_status()
+    return {'wall': wall, 'qtime': float(response.json()['responseHeader']['QTime'])}
+
+
+def index_size(session: requests.Session, url: str) -> Dict[str, int]:
+    """
+    Get the on-disk index size and document count of a core.
+
+    Args:
+        url: Core URL, e.g. http://localhost:8983/solr/movies
+
+    Returns:
+        Dictionary with size_bytes and num_docs
+    """
+    base, core = url.rstrip('/').rsplit('/', 1)
+    response = session.get(
+        f'{base}/admin/cores', params={'action': 'STATUS', 'core': core, 'wt': 'json'}, timeout=30
+    )
+    response.raise_for_status()
+    index = response.json()['status'][core].get('index', {})
+    return {'size_bytes': index.get('sizeInBytes', 0), 'num_docs': index.get('numDocs', 0)}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def measure(
+    session: requests.Session,
+    url: str,
+    queries: List[str],
+    doc_ids: List[Optional[str]],
+    runs: int,
+    warmup: int,
+    progress: Callable[[str], None] = print
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure per-feature latency of a collection.
+
+    Args:
+        url: Collection URL
+        queries: Query texts
+        doc_ids: MoreLikeThis source per query (None to skip)
+        runs: Timed repetitions of every query
+        warmup: Untimed repetitions first (fills OS and Solr caches)
+
+    Returns:
+        Mapping of feature name to p50/p95/mean wall time and mean QTime (ms)
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for query, doc_id in zip(queries, doc_ids):
+        for feature, params in feature_params(query, doc_id).items():
+            for i in range(warmup + runs):
+                timing = timed_select(session, url, params)
+                if i >= warmup:
+                    bucket = samples.setdefault(feature, {'wall': [], 'qtime': []})
+                    bucket['wall'].append(timing['wall'])
+                    bucket['qtime'].append(timing['qtime'])
+    progress(f"Measured {url}")
+
+    return {
+        feature: {
+            'p50_ms': statistics.median(values['wall']),
+            'p95_ms': _percentile(values['wall'], 95),
+            'mean_ms': statistics.mean(values['wall']),
+            'qtime_ms': statistics.mean(values['qtime'])
+        }
+        for feature, values in samples.items()
+    }
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return 'n/a'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def print_report(report: Dict):
+    """Print the comparison as tables."""
+    baseline, candidate = report['baseline'], report['candidate']
+    print(f"\nBaseline:  {baseline['url']}")
+    print(f"Candidate: {candidate['url']}\n")
+
+    print(f"{'feature':<10} {'p50 base':>9} {'p50 cand':>9} {'delta':>8} "
+          f"{'p95 base':>9} {'p95 cand':>9} {'delta':>8} {'QTime delta':>12}")
+    for feature, base in baseline['latency'].items():
+        cand = candidate['latency'].get(feature)
+        if cand is None:
+            continue
+        print(f"{feature:<10} {base['p50_ms']:>9.1f} {cand['p50_ms']:>9.1f} "
+              f"{_delta(base['p50_ms'], cand['p50_ms']):>8} "
+              f"{base['p95_ms']:>9.1f} {cand['p95_ms']:>9.1f} "
+              f"{_delta(base['p95_ms'], cand['p95_ms']):>8} "
+              f"{_delta(base['qtime_ms'], cand['qtime_ms']):>12}")
+
+    base_size, cand_size = baseline['index'], candidate['index']
+    print(f"\nIndex size: {base_size['size_bytes'] / 1e6:.1f} MB -> "
+          f"{cand_size['size_bytes'] / 1e6:.1f} MB "
+          f"({_delta(base_size['size_bytes'], cand_size['size_bytes'])})")
+    if base_size['num_docs'] != cand_size['num_docs']:
+        print(f"Warning: document counts differ ({base_size['num_docs']} vs "
+              f"{cand_size['num_docs']}); reindex before comparing.")
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Compare two Solr schemas on the same documents.")
+    parser.add_argument('--baseline', required=True, help="URL of the baseline collection")
+    parser.add_argument('--candidate', required=True, help="URL of the candidate collection")
+    parser.add_argument('--queries', help="File with one query per line (default: built-in set)")
+    parser.add_argument('--runs', type=int, default=10, help="Timed runs per query and feature")
+    parser.add_argument('--warmup', type=int, default=2, help="Untimed runs per query and feature")
+    parser.add_argument('--output', help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    session = requests.Session()
+
+    # MoreLikeThis sources: the top hit of each query in the baseline
+    doc_ids = []
+    for query in queries:
+        response = session.get(
+            f'{args.baseline}/select',
+            params={'q': f'text:{query}', 'rows': 1, 'fl': 'id', 'wt': 'json'},
+            timeout=30
+        ).json()
+        docs = response.get('response', {}).get('docs', [])
+        doc_ids.append(docs[0]['id'] if docs else None)
+
+    report = {}
+    for name, url in (('baseline', args.baseline), ('candidate', args.candidate)):
+        report[name] = {
+            'url': url,
+            'index': index_size(session, url),
+            'latency': measure(session, url, queries, doc_ids, args.runs, args.warmup)
+        }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,30 @@ Merges and enriches movie data from multiple sources into a single file for Solr
 This script orchestrates the merging of data from several sources:
 1.  **IMDb**: The base movie information (title, year, cast, etc.).
 2.  **OMDb**: Enriches IMDb data with ratings (Metascore, Tomatometer) and posters.
-3.  **NYT**: Adds movie review articles (headlines, snippets, abstracts).
+3.  **NYT**: Movie review articles, kept as their own documents keyed by `imdb_id`.
 4.  **Rotten Tomatoes (Sample)**: A fallback source, largely superseded by OMDb.
 
-The final output is a single `movies.json` file ready for Solr indexing.
+The output is a `movies.json` file for the Solr movies collection and an
+`nyt_articles.json` file for the separate articles collection, which the
+web app searches alongside movies and joins back by `imdb_id`.
 """
 
 import json
 import os
 from typing import List, Dict, Any
 from collections import defaultdict
+from scraper_utils import find_records_file, load_records, to_solr_date
 
 
 class DataMerger:
     """Merges and enriches movie data from various sources."""
 
-    def __init__(self, base_data_path: str, output_path: str):
+    def __init__(self, base_data_path: str, output_path: str, articles_output_path: str = None):
         self.base_path = base_data_path
         self.output_path = output_path
+        self.articles_output_path = articles_output_path or os.path.join(
+            os.path.dirname(output_path), 'nyt_articles.json'
+        )
         self.movies: Dict[str, Dict[str, Any]] = {}
         self.nyt_articles: Dict[str, List[Dict]] = defaultdict(list)
         self.omdb_data: Dict[str, Dict] = {}
@@ -61,16 +67,16 @@ class DataMerger:
         print(f"Loaded {len(self.nyt_articles)} NYT article lists.")
 
     def _load_json(self, filepath: str) -> List[Dict]:
-        """Safely loads a JSON file."""
-        if not os.path.exists(filepath):
+        """Safely loads a JSON file, or its JSON Lines sibling if only that exists."""
+        found = find_records_file(filepath)
+        if found is None:
             print(f"Warning: {filepath} not found, skipping...")
             return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON from {filepath}: {e}")
-                return []
+        try:
+            return load_records(found)
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON from {found}: {e}")
+            return []
 
     def _get_title_year_key(self, title: str, year: int) -> str:
         """Creates a consistent key from title and year."""
@@ -91,12 +97,8 @@ class DataMerger:
                 if omdb_record.get('plot'):
                     movie['plot'] = omdb_record['plot']
 
-            # Merge NYT articles
-            if imdb_id in self.nyt_articles:
-                articles = self.nyt_articles[imdb_id]
-                movie['nyt_reviews_headlines'] = [a.get('headline') for a in articles if a.get('headline')]
-                movie['nyt_reviews_abstracts'] = [a.get('abstract') for a in articles if a.get('abstract')]
-                movie['nyt_reviews_snippets'] = [a.get('snippet') for a in articles if a.get('snippet')]
+            # NYT articles are indexed separately (see save_articles); only
+            # the source marker is kept on the movie
 
             # Finalize ID and source field
             movie['id'] = movie.get('tconst') # Use IMDb ID as the unique Solr ID
@@ -124,6 +126,24 @@ class DataMerger:
             json.dump(final_movie_list, f, indent=2, ensure_ascii=False)
         print(f"Successfully saved merged data to {self.output_path}")
 
+    def save_articles(self):
+        """Saves NYT articles of merged movies for the articles collection."""
+        # Articles journaled before pub_date was normalized carry the NYT format
+        articles = [
+            dict(article, pub_date=to_solr_date(article.get('pub_date')))
+            for imdb_id, movie_articles in self.nyt_articles.items()
+            if imdb_id in self.movies
+            for article in movie_articles
+        ]
+        if not articles:
+            print("No NYT articles to save.")
+            return
+
+        os.makedirs(os.path.dirname(self.articles_output_path), exist_ok=True)
+        with open(self.articles_output_path, 'w', encoding='utf-8') as f:
+            json.dump(articles, f, indent=2, ensure_ascii=False)
+        print(f"Saved {len(articles)} NYT articles to {self.articles_output_path}")
+
 
 def main():
     """Main execution function."""
@@ -136,6 +156,7 @@ def main():
     merger.load_data()
     merger.process_and_merge()
     merger.save_merged_data()
+    merger.save_articles()
     
     print("\nData merging complete!")
 
@@ -6,10 +6,22 @@ data source (https://datasets.imdbws.com/), processes them in chunks to conserve
 memory, and saves the extracted movie data into a JSON file.
 
 This version is optimized to:
-- Load data in chunks to provide progress bars and reduce memory usage.
-- Pre-filter data to only process relevant movies.
+- Download the files concurrently, resuming interrupted downloads and
+  skipping datasets the server reports as unchanged.
+- Read each file in a single streaming pass with the PyArrow CSV reader
+  (or the pandas C engine when PyArrow is not installed), projecting only
+  the needed columns and tracking progress by compressed bytes read.
+- Pre-filter data inside the chunk loop to only keep relevant movies.
+- Cache each stage's filtered output as Parquet, keyed by the checksums of
+  its source files and the configuration, so reruns only recompute stages
+  whose inputs changed (requires PyArrow).
+- Assemble movie records with vectorized column operations and stream them
+  to disk one at a time as compact JSON (or JSONL with --jsonl), using
+  orjson when it is installed.
 - Handle large files more gracefully.
 
+Run with --force to rebuild the JSON output from the cached stages.
+
 Required files from IMDb:
 - title.basics.tsv.gz
 - title.ratings.tsv.gz
@@ -17,21 +29,43 @@ Required files from IMDb:
 - name.basics.tsv.gz
 """
 
+import argparse
 import requests
 import gzip
+import hashlib
 import json
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
 from tqdm import tqdm
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- Configuration ---
-BASE_URL = "https://datasets.imdbws.com/"
+BASE_URL = os.getenv("IMDB_DATASETS_URL", "https://datasets.imdbws.com/")
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw', 'imdb_datasets')
 OUTPUT_FILE = os.path.join(DATA_DIR, 'raw', 'imdb_movies.json')
+CACHE_DIR = os.path.join(RAW_DATA_DIR, 'cache')
 CHUNK_SIZE = 100000
+DOWNLOAD_BUFFER = 1024 * 1024  # Bytes per streamed download chunk
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_TIMEOUT = 60  # Seconds to connect / between received bytes
+ARROW_BLOCK_SIZE = 16 * 1024 * 1024  # Bytes of decompressed TSV per Arrow batch
 MOVIE_LIMIT = 250000 # Limit the number of movies to process
 MIN_VOTES = 5000
+TOP_ACTORS = 5 # Top-billed actors kept per movie
 
 # File constants
 TITLE_BASICS = "title.basics.tsv.gz"
@@ -47,143 +81,431 @@ DTYPES = {
     NAME_BASICS: {'nconst': 'str', 'primaryName': 'str'}
 }
 
+# Arrow equivalents of the DTYPES names
+ARROW_TYPES = {'str': 'string', 'float': 'float64', 'int': 'int64'}
+
+# Bump when the filtering logic of a cached stage changes
+STAGE_VERSION = 1
+
 # Create directories if they don't exist
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
 
-def download_file(filename):
-    """Downloads a single file from the IMDb dataset URL if it doesn't exist."""
+def _read_meta(path):
+    """Returns the saved HTTP validators of a download, or {}."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_meta(path, response):
+    """Saves a response's ETag and Last-Modified next to the download."""
+    meta = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+def _expected_size(response, offset):
+    """Returns the full size of the file being served, or None if unknown."""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and not content_range.endswith('/*'):
+        return int(content_range.rsplit('/', 1)[1])
+    length = response.headers.get('Content-Length')
+    return offset + int(length) if length is not None else None
+
+def download_file(filename, position=0):
+    """
+    Downloads a single IMDb dataset file, resuming and refreshing as needed.
+
+    The body is streamed to `<file>.part` and renamed into place only once its
+    size matches what the server announced, so an interrupted download never
+    looks complete. A leftover `.part` is resumed with a Range request,
+    guarded by If-Range so a dataset that changed in between restarts from
+    scratch. An existing file is revalidated with If-None-Match /
+    If-Modified-Since and kept on 304 or when the server can't be reached.
+
+    Args:
+        filename: Dataset file name under BASE_URL
+        position: tqdm bar position, for concurrent downloads
+
+    Returns:
+        Local path, or None if the file could not be obtained
+    """
     url = BASE_URL + filename
     local_path = os.path.join(RAW_DATA_DIR, filename)
-    
+    part_path = local_path + '.part'
+    meta_path = local_path + '.meta.json'
+    part_meta_path = part_path + '.meta.json'
+
+    headers = {}
     if os.path.exists(local_path):
-        print(f"File already exists: {filename}")
-        return local_path
+        meta = _read_meta(meta_path)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        headers['If-Modified-Since'] = meta.get('last_modified') or formatdate(
+            os.path.getmtime(local_path), usegmt=True
+        )
+
+    offset = 0
+    if os.path.exists(part_path):
+        part_meta = _read_meta(part_meta_path)
+        validator = part_meta.get('etag') or part_meta.get('last_modified')
+        if validator:
+            offset = os.path.getsize(part_path)
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator
 
-    print(f"Downloading {filename}...")
     try:
-        with requests.get(url, stream=True) as r:
+        with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+            if r.status_code == 304:
+                print(f"File is up to date: {filename}")
+                return local_path
+            if r.status_code == 416:
+                # The part file is no longer a valid prefix; start over
+                os.remove(part_path)
+                return download_file(filename, position)
             r.raise_for_status()
-            total_size = int(r.headers.get('content-length', 0))
-            with open(local_path, 'wb') as f, tqdm(
-                total=total_size, unit='iB', unit_scale=True, desc=filename
+
+            if r.status_code != 206:
+                offset = 0
+            expected = _expected_size(r, offset)
+            _write_meta(part_meta_path, r)
+
+            action = "Resuming" if offset else "Downloading"
+            print(f"{action} {filename}...")
+            with open(part_path, 'ab' if offset else 'wb') as f, tqdm(
+                total=expected, initial=offset, unit='iB', unit_scale=True,
+                desc=filename, position=position, leave=False
             ) as pbar:
-                for chunk in r.iter_content(chunk_size=8192):
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_BUFFER):
                     f.write(chunk)
                     pbar.update(len(chunk))
-        print(f"Downloaded {filename} successfully.")
-        return local_path
     except requests.exceptions.RequestException as e:
+        if os.path.exists(local_path):
+            print(f"Could not update {filename} ({e}); using the local copy.")
+            return local_path
         print(f"Error downloading {filename}: {e}")
         return None
 
-def load_tsv_in_chunks(filename, dtypes, filter_col=None, filter_set=None):
-    """Loads and filters a gzipped TSV file in chunks to save memory."""
-    path = os.path.join(RAW_DATA_DIR, filename)
-    
-    # Get total lines for progress bar
-    print(f"Counting lines in {filename} for progress tracking...")
-    with gzip.open(path, 'rt', encoding='utf-8') as f:
-        total_lines = sum(1 for _ in f)
-    
-    num_chunks = (total_lines // CHUNK_SIZE) + 1
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        print(f"Incomplete download of {filename} ({size} of {expected} bytes); "
+              f"rerun to resume.")
+        return local_path if os.path.exists(local_path) else None
+
+    os.replace(part_path, local_path)
+    os.replace(part_meta_path, meta_path)
+    print(f"Downloaded {filename} successfully.")
+    return local_path
 
-    chunk_list = []
-    with gzip.open(path, 'rt', encoding='utf-8') as f:
-        reader = pd.read_csv(
-            f, sep='\\t', na_values=['\\N', 'nan'], quoting=3,
-            dtype=dtypes, chunksize=CHUNK_SIZE, engine='python'
+def download_all(filenames, workers=DOWNLOAD_WORKERS):
+    """
+    Downloads several dataset files concurrently.
+
+    Returns:
+        True if every file is available locally
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        paths = list(executor.map(download_file, filenames, range(len(filenames))))
+    return all(paths)
+
+def _arrow_chunks(f, dtypes, filter_col, filter_set):
+    """Yields filtered DataFrames from a TSV stream using the PyArrow CSV reader."""
+    reader = pa_csv.open_csv(
+        f,
+        read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(
+            delimiter='\t', quote_char=False, invalid_row_handler=lambda row: 'skip'
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(dtypes),
+            column_types={col: ARROW_TYPES[t] for col, t in dtypes.items()},
+            null_values=['\\N'],
+            strings_can_be_null=True
         )
-        
-        for chunk in tqdm(reader, total=num_chunks, desc=f"Loading {filename}"):
-            if filter_col and filter_set:
-                chunk = chunk[chunk[filter_col].isin(filter_set)]
-            chunk_list.append(chunk)
-    
+    )
+    value_set = pa.array(list(filter_set), type=pa.string()) if filter_set is not None else None
+    for batch in reader:
+        if value_set is not None:
+            batch = batch.filter(pc.is_in(batch.column(filter_col), value_set=value_set))
+        yield batch.to_pandas()
+
+
+def _pandas_chunks(f, dtypes, filter_col, filter_set):
+    """Yields filtered DataFrames from a TSV stream using the pandas C engine."""
+    reader = pd.read_csv(
+        f, sep='\t', na_values=['\\N'], keep_default_na=False, quoting=3,
+        usecols=list(dtypes), dtype=dtypes, chunksize=CHUNK_SIZE,
+        engine='c', on_bad_lines='skip'
+    )
+    for chunk in reader:
+        if filter_set is not None:
+            chunk = chunk[chunk[filter_col].isin(filter_set)]
+        yield chunk
+
+
+def iter_tsv_chunks(filename, dtypes, filter_col=None, filter_set=None):
+    """
+    Streams a gzipped TSV file in a single pass, yielding filtered chunks.
+
+    Only the columns in dtypes are parsed, and rows whose filter_col value
+    is not in filter_set are dropped chunk by chunk. Progress is tracked by
+    compressed bytes consumed, so the file is never decompressed twice.
+    """
+    path = os.path.join(RAW_DATA_DIR, filename)
+    read_chunks = _arrow_chunks if pa is not None else _pandas_chunks
+
+    with open(path, 'rb') as raw, gzip.GzipFile(fileobj=raw) as f, tqdm(
+        total=os.path.getsize(path), unit='B', unit_scale=True, desc=f"Loading {filename}"
+    ) as pbar:
+        for chunk in read_chunks(f, dtypes, filter_col, filter_set):
+            pbar.update(raw.tell() - pbar.n)
+            if len(chunk):
+                yield chunk
+        pbar.update(pbar.total - pbar.n)
+
+
+def load_tsv_in_chunks(filename, dtypes, filter_col=None, filter_set=None):
+    """Loads and filters a gzipped TSV file in chunks to save memory."""
+    chunk_list = list(iter_tsv_chunks(filename, dtypes, filter_col, filter_set))
     if not chunk_list:
-        return pd.DataFrame()
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in dtypes})
     return pd.concat(chunk_list, ignore_index=True)
 
-def process_data():
-    """Processes the downloaded data and creates the final JSON output."""
-    if os.path.exists(OUTPUT_FILE):
-        print(f"IMDb data already processed. Found {OUTPUT_FILE}.")
-        print("Delete the file to re-process.")
+def file_checksum(path):
+    """
+    Returns the SHA-256 of a file.
+
+    The checksum is remembered in a sidecar file keyed by size and mtime, so
+    each downloaded file is only hashed once.
+    """
+    stat = os.stat(path)
+    sidecar = path + '.sha256'
+    if os.path.exists(sidecar):
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('size') == stat.st_size and saved.get('mtime') == stat.st_mtime:
+            return saved['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    checksum = digest.hexdigest()
+    with open(sidecar, 'w', encoding='utf-8') as f:
+        json.dump({'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': checksum}, f)
+    return checksum
+
+def cached_stage(name, sources, config, compute):
+    """
+    Returns a stage's DataFrame from the Parquet cache, computing it on a miss.
+
+    Args:
+        name: Stage name, used in the cache file name
+        sources: Source files the stage reads (their checksums key the cache)
+        config: JSON-serializable settings and upstream stage keys it depends on
+        compute: Zero-argument callable producing the DataFrame
+
+    Returns:
+        Tuple of (DataFrame, cache key); downstream stages include the key in
+        their config so invalidation cascades
+    """
+    key = hashlib.sha256(json.dumps({
+        'stage': name,
+        'version': STAGE_VERSION,
+        'sources': {os.path.basename(p): file_checksum(os.path.join(RAW_DATA_DIR, p)) for p in sources},
+        'config': config
+    }, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    if pa is None:
+        return compute(), key
+
+    path = os.path.join(CACHE_DIR, f'{name}-{key}.parquet')
+    if os.path.exists(path):
+        print(f"Using cached {name} stage ({os.path.basename(path)}).")
+        return pd.read_parquet(path), key
+
+    df = compute()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    # Drop outdated versions of this stage
+    for entry in os.listdir(CACHE_DIR):
+        if entry.startswith(f'{name}-') and entry != os.path.basename(path):
+            os.remove(os.path.join(CACHE_DIR, entry))
+    return df, key
+
+def _column_or_empty_lists(series):
+    """Returns a column's values as a list, with missing entries replaced by []."""
+    return [value if isinstance(value, list) else [] for value in series.tolist()]
+
+def iter_movie_records(movies_df, director_map, actor_map):
+    """
+    Yields one JSON-ready record per movie.
+
+    Genres, years and the director/actor joins are computed column-wise;
+    only the final dict construction runs per row.
+    """
+    genres = movies_df['genres'].str.split(',').map(
+        lambda values: [g for g in values if g] if isinstance(values, list) else []
+    )
+    years = pd.to_numeric(movies_df['startYear'], errors='coerce')
+    years = years.astype('Int64').astype(object).where(years.notna(), None)
+    tconsts = movies_df['tconst']
+
+    columns = zip(
+        tconsts.tolist(),
+        movies_df['primaryTitle'].tolist(),
+        years.tolist(),
+        genres.tolist(),
+        movies_df['averageRating'].tolist(),
+        movies_df['numVotes'].astype('int64').tolist(),
+        _column_or_empty_lists(tconsts.map(director_map)),
+        _column_or_empty_lists(tconsts.map(actor_map))
+    )
+    for tconst, title, year, movie_genres, rating, num_votes, directors, cast in columns:
+        yield {
+            'id': f"imdb_{tconst}",
+            'tconst': tconst, # Keep for merging
+            'title': title,
+            'year': year,
+            'genres': movie_genres,
+            'plot': None,
+            'rating': rating,
+            'numVotes': num_votes,
+            'runtimeMinutes': None, # This info was removed from basics for performance
+            'directors': directors,
+            'cast': cast,
+            'source': 'imdb'
+        }
+
+def _dumps(record):
+    """Serializes one record to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def write_json_stream(records, path, jsonl=False):
+    """
+    Writes records to path one at a time, as a JSON array or as JSONL.
+
+    The array form keeps one record per line so the file stays diffable.
+    The file is written under a temporary name and renamed when complete.
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        if not jsonl:
+            f.write(b'[\n')
+        for record in records:
+            if jsonl:
+                f.write(_dumps(record) + b'\n')
+            else:
+                if count:
+                    f.write(b',\n')
+                f.write(_dumps(record))
+            count += 1
+        if not jsonl:
+            f.write(b'\n]\n')
+    os.replace(tmp_path, path)
+    return count
+
+def process_data(force=False, jsonl=False):
+    """Processes the downloaded data and creates the final JSON (or JSONL) output."""
+    output_file = os.path.splitext(OUTPUT_FILE)[0] + '.jsonl' if jsonl else OUTPUT_FILE
+    if os.path.exists(output_file) and not force:
+        print(f"IMDb data already processed. Found {output_file}.")
+        print("Delete the file or run with --force to re-process.")
         return
         
     print("\n--- Starting Data Processing ---")
 
-    # Download all necessary files
-    for filename in DTYPES.keys():
-        if not download_file(filename):
-            print("Failed to download a required file. Aborting.")
-            return
+    # Download (or revalidate) all necessary files
+    if not download_all(list(DTYPES.keys())):
+        print("Failed to download a required file. Aborting.")
+        return
 
     # 1. Load ratings and find popular movies
     print("\nStep 1: Finding popular movies from ratings...")
-    ratings_df = load_tsv_in_chunks(TITLE_RATINGS, DTYPES[TITLE_RATINGS])
-    popular_movies_df = ratings_df[ratings_df['numVotes'] > MIN_VOTES]
-    popular_movies_df = popular_movies_df.sort_values(by='numVotes', ascending=False).head(MOVIE_LIMIT)
+    def popular_ratings():
+        ratings_df = load_tsv_in_chunks(TITLE_RATINGS, DTYPES[TITLE_RATINGS])
+        popular_df = ratings_df[ratings_df['numVotes'] > MIN_VOTES]
+        return popular_df.sort_values(by='numVotes', ascending=False).head(MOVIE_LIMIT)
+    popular_movies_df, popular_key = cached_stage(
+        'popular_ratings', [TITLE_RATINGS],
+        {'MIN_VOTES': MIN_VOTES, 'MOVIE_LIMIT': MOVIE_LIMIT}, popular_ratings
+    )
     popular_movie_ids = set(popular_movies_df['tconst'])
     print(f"Identified {len(popular_movie_ids)} popular movies to process.")
 
     # 2. Load basics for popular movies only
     print("\nStep 2: Loading basic info for popular movies...")
-    basics_df = load_tsv_in_chunks(TITLE_BASICS, DTYPES[TITLE_BASICS], 'tconst', popular_movie_ids)
-    movies_df = basics_df[basics_df['titleType'] == 'movie'].copy()
+    def movie_basics():
+        basics_df = load_tsv_in_chunks(TITLE_BASICS, DTYPES[TITLE_BASICS], 'tconst', popular_movie_ids)
+        return basics_df[basics_df['titleType'] == 'movie']
+    movies_df, _ = cached_stage('movie_basics', [TITLE_BASICS], {'popular': popular_key}, movie_basics)
     
     # 3. Merge ratings into the movie basics
     movies_df = pd.merge(movies_df, popular_movies_df, on='tconst', how='inner', validate="one_to_one")
 
     # 4. Load principals (cast/crew) for popular movies
     print("\nStep 3: Loading cast and crew for popular movies...")
-    principals_df = load_tsv_in_chunks(TITLE_PRINCIPALS, DTYPES[TITLE_PRINCIPALS], 'tconst', popular_movie_ids)
+    def principals_subset():
+        principals_df = load_tsv_in_chunks(TITLE_PRINCIPALS, DTYPES[TITLE_PRINCIPALS], 'tconst', popular_movie_ids)
+        return principals_df[principals_df['category'].isin(['director', 'actor', 'actress'])]
+    principals_df, _ = cached_stage(
+        'principals', [TITLE_PRINCIPALS], {'popular': popular_key}, principals_subset
+    )
 
-    # 5. Load all names for lookup
-    print("\nStep 4: Loading all names for lookups...")
-    names_df = load_tsv_in_chunks(NAME_BASICS, DTYPES[NAME_BASICS])
-    name_map = names_df.set_index('nconst')['primaryName'].to_dict()
+    # 5. Select directors and top-billed actors of the kept movies
+    directors = principals_df[principals_df['category'] == 'director'].copy()
+    actors = principals_df[principals_df['category'].isin(['actor', 'actress'])]
+    actors = actors.sort_values(by=['tconst', 'ordering'])
+    top_actors = actors.groupby('tconst').head(TOP_ACTORS).copy()
 
-    # 6. Process principals to get director and actor maps
+    # 6. Load only the names those people need (semi-join on nconst)
+    print("\nStep 4: Loading names of directors and actors...")
+    needed_nconsts = set(directors['nconst']) | set(top_actors['nconst'])
+    def name_subset():
+        return load_tsv_in_chunks(NAME_BASICS, DTYPES[NAME_BASICS], 'nconst', needed_nconsts)
+    # Keyed on the selected people themselves, since the selection above isn't a cached stage
+    needed_digest = hashlib.sha256('\n'.join(sorted(needed_nconsts)).encode('utf-8')).hexdigest()
+    names_df, _ = cached_stage('names', [NAME_BASICS], {'nconsts': needed_digest}, name_subset)
+    name_map = dict(zip(names_df['nconst'], names_df['primaryName']))
+    print(f"Loaded {len(name_map)} of {len(needed_nconsts)} needed names.")
+
+    # 7. Map directors and actors to names
     print("\nStep 5: Mapping directors and actors...")
-    directors = principals_df[principals_df['category'] == 'director'].copy()
+    # People whose name is missing from name.basics are left out
     directors['primaryName'] = directors['nconst'].map(name_map)
+    directors = directors.dropna(subset=['primaryName'])
     director_map = directors.groupby('tconst')['primaryName'].apply(list).to_dict()
 
-    actors = principals_df[principals_df['category'].isin(['actor', 'actress'])].copy()
-    actors = actors.sort_values(by=['tconst', 'ordering'])
-    top_actors = actors.groupby('tconst').head(5) # Top 5 actors
     top_actors['primaryName'] = top_actors['nconst'].map(name_map)
+    top_actors = top_actors.dropna(subset=['primaryName'])
     actor_map = top_actors.groupby('tconst')['primaryName'].apply(list).to_dict()
 
-    # 7. Assemble the final JSON data
-    print("\nStep 6: Assembling final movie data...")
-    movies_list = []
-    for _, row in tqdm(movies_df.iterrows(), total=len(movies_df), desc="Creating JSON"):
-        tconst = row['tconst']
-        genres = row['genres'].split(',') if isinstance(row['genres'], str) else []
-        
-        movie_data = {
-            'id': f"imdb_{tconst}",
-            'tconst': tconst, # Keep for merging
-            'title': row['primaryTitle'],
-            'year': int(row['startYear']) if pd.notna(row['startYear']) and row['startYear'].isdigit() else None,
-            'genres': [g for g in genres if g],
-            'plot': None,
-            'rating': row['averageRating'],
-            'numVotes': int(row['numVotes']),
-            'runtimeMinutes': None, # This info was removed from basics for performance
-            'directors': director_map.get(tconst, []),
-            'cast': actor_map.get(tconst, []),
-            'source': 'imdb'
-        }
-        movies_list.append(movie_data)
-
-    # 8. Save to JSON
-    print(f"\nSaving {len(movies_list)} movies to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(movies_list, f, indent=2)
+    # 8. Assemble and stream the final JSON data
+    print(f"\nStep 6: Writing {len(movies_df)} movies to {output_file}...")
+    records = iter_movie_records(movies_df, director_map, actor_map)
+    count = write_json_stream(
+        tqdm(records, total=len(movies_df), desc="Writing JSON"), output_file, jsonl=jsonl
+    )
+    print(f"Saved {count} movies.")
     print("IMDb data processing complete!")
 
 
 if __name__ == "__main__":
-    process_data()
+    parser = argparse.ArgumentParser(description="Download and process IMDb datasets.")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-process even if the output exists (cached stages are reused)")
+    parser.add_argument('--jsonl', action='store_true',
+                        help="Write imdb_movies.jsonl (one record per line) instead of a JSON array")
+    args = parser.parse_args()
+    process_data(force=args.force, jsonl=args.jsonl)
@@ -9,42 +9,219 @@ then queries the NYT API to find relevant movie reviews or articles.
 2. Create a file named `.env` in the `scrapers/` directory.
 3. Add your API key to the `.env` file like this:
    NYT_API_KEY="YOUR_API_KEY"
+
+Movies are searched in batches: titles released in the same or adjacent
+years are OR'd into one query, the results are paged through, and each
+returned review is attributed back to a movie by matching its keywords,
+headline and abstract against the titles, with a confidence score. Titles
+left unmatched by a query cut short at MAX_PAGES are searched again in
+smaller batches, within the requests per-movie searches would have cost. A
+scheduler spaces requests to the API's per-minute limit, backs off on 429
+responses and stops when the run's request budget is spent.
+
+Each movie's articles are appended to a journal (nyt_articles.journal.jsonl)
+as soon as they are fetched. An interrupted run resumes after the movies
+already in the journal, and the journal is compacted into nyt_articles.json
+at the end (or with --compact-only).
 """
 
+import argparse
 import requests
 import json
 import os
+import re
 import time
 from dotenv import load_dotenv
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from tqdm import tqdm
+from scraper_utils import JsonlJournal, find_records_file, load_records, to_solr_date
 
 # --- Configuration ---
 API_BASE_URL = "https://api.nytimes.com/svc/search/v2/articlesearch.json"
 IMDB_INPUT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'imdb_movies.json')
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'nyt_articles.json')
+JOURNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'nyt_articles.journal.jsonl')
 
 # Load API credentials from .env file
 load_dotenv()
 API_KEY = os.getenv("NYT_API_KEY")
+REQUESTS_PER_MINUTE = float(os.getenv("NYT_REQUESTS_PER_MINUTE", "8"))
+DAILY_REQUESTS = int(os.getenv("NYT_DAILY_REQUESTS", "500"))
+BATCH_SIZE = 10  # Titles OR'd into one query
+MAX_PAGES = 3  # Result pages fetched per batch query
+PAGE_SIZE = 10  # Fixed by the Article Search API
+ARTICLES_PER_MOVIE = 2
+MIN_CONFIDENCE = 0.5
+MAX_RETRIES = 5
+BACKOFF_BASE = 60  # Seconds to pause after the first 429; doubles on each retry
+
+Movie = Tuple[str, str, int]
+
+
+class BudgetExhausted(Exception):
+    """Raised when the run's request budget is used up."""
+
+
+class RequestScheduler:
+    """
+    Spaces API requests to a per-minute rate, backs off exponentially on
+    429 responses, and enforces a per-run request budget.
+    """
+
+    def __init__(
+        self,
+        per_minute: float = REQUESTS_PER_MINUTE,
+        budget: int = DAILY_REQUESTS,
+        max_retries: int = MAX_RETRIES
+    ):
+        self.interval = 60.0 / per_minute
+        self.budget = budget
+        self.max_retries = max_retries
+        self.sent = 0
+        self.next_slot = 0.0
+
+    def request(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Sends a request in the next free slot, retrying it after 429s.
+
+        Raises:
+            BudgetExhausted: If the budget is spent before a response arrives
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.budget and self.sent >= self.budget:
+                raise BudgetExhausted(f"Request budget of {self.budget} used up.")
+            delay = self.next_slot - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.sent += 1
+            response = send()
+            self.next_slot = time.monotonic() + self.interval
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            retry_after = response.headers.get('Retry-After', '')
+            pause = float(retry_after) if retry_after.isdigit() else BACKOFF_BASE * 2 ** attempt
+            print(f"Rate limit hit. Pausing for {pause:.0f} seconds...")
+            self.next_slot = time.monotonic() + pause
+        return response
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Lowercases text and reduces it to space-separated words."""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def _contains_phrase(text: str, phrase: str) -> bool:
+    """True if the normalized phrase occurs in the normalized text as whole words."""
+    return f' {phrase} ' in f' {text} '
+
+
+def match_confidence(article: Dict, title: str, year: int) -> float:
+    """
+    Scores how likely an article is about the given movie.
+
+    1.0 if the article is tagged with the title as a creative work, 0.8 if
+    the title is in the headline, 0.5 if it is only in the abstract, snippet
+    or lead paragraph; one-word titles score 0.2 less, as they also match
+    ordinary words. Articles published outside the release year and the
+    year after score 0.
+    """
+    pub_year = (article.get('pub_date') or '')[:4]
+    if pub_year.isdigit() and not year <= int(pub_year) <= year + 1:
+        return 0.0
+    phrase = _normalize(title)
+    if not phrase:
+        return 0.0
+
+    for keyword in article.get('keywords') or []:
+        # e.g. {"name": "creative_works", "value": "Inception (Movie)"}
+        if keyword.get('name') == 'creative_works':
+            if _normalize(re.sub(r'\(.*?\)', '', keyword.get('value', ''))) == phrase:
+                return 1.0
+
+    headline = article.get('headline') or {}
+    if any(_contains_phrase(_normalize(headline.get(k)), phrase) for k in ('main', 'print_headline')):
+        confidence = 0.8
+    elif any(_contains_phrase(_normalize(article.get(k)), phrase)
+             for k in ('abstract', 'snippet', 'lead_paragraph')):
+        confidence = 0.5
+    else:
+        return 0.0
+    if ' ' not in phrase:
+        confidence -= 0.2
+    return confidence
+
+
+def attribute_article(article: Dict, movies: List[Movie]) -> Tuple[Optional[Movie], float]:
+    """
+    Picks the movie of a batch an article is about.
+
+    When several titles match equally well, the longest wins if it contains
+    the others ("Toy Story 2" over "Toy Story"); otherwise the confidence is
+    split between the candidates.
+
+    Returns:
+        The movie and confidence, or (None, 0.0) below MIN_CONFIDENCE
+    """
+    scored = [(match_confidence(article, title, year), (imdb_id, title, year))
+              for imdb_id, title, year in movies]
+    best = max((confidence for confidence, _ in scored), default=0.0)
+    if best < MIN_CONFIDENCE:
+        return None, 0.0
+
+    candidates = sorted((movie for confidence, movie in scored if confidence == best),
+                        key=lambda movie: len(_normalize(movie[1])), reverse=True)
+    chosen = candidates[0]
+    rivals = [movie for movie in candidates[1:]
+              if not _contains_phrase(_normalize(chosen[1]), _normalize(movie[1]))]
+    confidence = best / (1 + len(rivals))
+    if confidence < MIN_CONFIDENCE:
+        return None, 0.0
+    return chosen, confidence
+
+
+def make_batches(movies: List[Movie], batch_size: int) -> List[List[Movie]]:
+    """Groups movies into batches whose release years span at most two years."""
+    batches: List[List[Movie]] = []
+    for movie in sorted(movies, key=lambda movie: movie[2]):
+        if batches and len(batches[-1]) < batch_size and movie[2] - batches[-1][0][2] <= 1:
+            batches[-1].append(movie)
+        else:
+            batches.append([movie])
+    return batches
+
 
 class NYTArticleProcessor:
     """Fetches movie review articles from the NYT API."""
 
-    def __init__(self, input_file: str = IMDB_INPUT_FILE, output_file: str = OUTPUT_FILE):
+    def __init__(
+        self,
+        input_file: str = IMDB_INPUT_FILE,
+        output_file: str = OUTPUT_FILE,
+        journal_file: str = JOURNAL_FILE,
+        batch_size: int = BATCH_SIZE,
+        max_pages: int = MAX_PAGES,
+        scheduler: Optional[RequestScheduler] = None
+    ):
         self.input_file = input_file
         self.output_file = output_file
+        self.batch_size = batch_size
+        self.max_pages = max_pages
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self.session = requests.Session()
+        # Requests are seconds apart, so syncing every record costs nothing
+        self.journal = JsonlJournal(journal_file, fsync_every=1)
         self.articles: List[Dict] = []
 
     def _get_movies_to_process(self) -> List[Tuple[str, str, int]]:
-        """Loads IMDb ID, title, and year from the IMDb JSON file."""
-        if not os.path.exists(self.input_file):
+        """Loads IMDb ID, title, and year from the IMDb JSON (or JSONL) file."""
+        input_file = find_records_file(self.input_file)
+        if input_file is None:
             print(f"ERROR: IMDb input file not found at {self.input_file}")
             print("Please run the process_imdb_data.py script first.")
             return []
         
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            imdb_data = json.load(f)
+        imdb_data = load_records(input_file)
         
         movies = [
             (movie.get('tconst'), movie.get('title'), movie.get('year'))
@@ -54,41 +231,135 @@ class NYTArticleProcessor:
         print(f"Loaded {len(movies)} movies to search for in NYT.")
         return movies
 
-    def fetch_articles_for_movie(self, title: str, year: int) -> List[Dict]:
-        """Fetches articles for a single movie from the NYT API."""
-        if not API_KEY:
-            return []
-
-        # Construct a query that is likely to find a movie review
-        query = f'"{title}"'
-        # Filter query to the year of release and the year after
-        filter_query = f'pub_year:({year} OR {year + 1}) AND type_of_material:("Review")'
-        
+    def _search(self, query: str, filter_query: str, page: int = 0) -> Optional[List[Dict]]:
+        """Runs one Article Search request; returns its docs, or None on error."""
         params = {
             "q": query,
             "fq": filter_query,
             "api-key": API_KEY,
-            "sort": "relevance"
+            "sort": "relevance",
+            "page": page
         }
         try:
-            response = requests.get(API_BASE_URL, params=params)
+            response = self.scheduler.request(
+                lambda: self.session.get(API_BASE_URL, params=params, timeout=30)
+            )
             response.raise_for_status()
-            data = response.json()
-            return data.get("response", {}).get("docs", [])
+            return response.json().get("response", {}).get("docs") or []
         except requests.exceptions.RequestException as e:
-            if e.response and e.response.status_code == 401:
+            if e.response is not None and e.response.status_code == 401:
                 raise ValueError("NYT API key is invalid (401 Unauthorized). Halting NYT processing.")
-            elif e.response and e.response.status_code == 429:
-                print(f"Rate limit hit for '{title}'. Pausing for 60 seconds...")
-                time.sleep(60)
-                return self.fetch_articles_for_movie(title, year) # Retry after pause
-            
-            print(f"Error fetching articles for '{title}': {e}")
+            print(f"Error fetching articles for {query}: {e}")
+            return None
+
+    @staticmethod
+    def _review_filter(years: List[int]) -> str:
+        """Filter query for reviews published in a release year or the year after."""
+        pub_years = sorted(set(years) | {year + 1 for year in years})
+        return f'pub_year:({" OR ".join(map(str, pub_years))}) AND type_of_material:("Review")'
+
+    def fetch_articles_for_movie(self, title: str, year: int) -> Optional[List[Dict]]:
+        """Fetches articles for a single movie from the NYT API (None on error)."""
+        if not API_KEY:
             return []
+        # Construct a query that is likely to find a movie review
+        return self._search(f'"{title.replace(chr(34), "")}"', self._review_filter([year]))
+
+    def fetch_articles_for_batch(
+        self, movies: List[Movie], max_pages: Optional[int] = None
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Fetches reviews for several movies with one OR'd title query.
+
+        Result pages are read until they run out, max_pages (default:
+        the processor's) is reached, or every movie has ARTICLES_PER_MOVIE
+        attributed reviews.
+
+        Returns:
+            Formatted articles per IMDb ID (best first), or None if the
+            first request failed. If the pages were cut short (MAX_PAGES or
+            a failed later page), movies without any match are left out:
+            their reviews may be on the unread pages.
+        """
+        query = ' OR '.join(f'"{title.replace(chr(34), "")}"' for _, title, _ in movies)
+        filter_query = self._review_filter([year for _, _, year in movies])
+
+        matches: Dict[str, List[Tuple[float, Dict, str]]] = {imdb_id: [] for imdb_id, _, _ in movies}
+        exhausted = False
+        for page in range(max_pages or self.max_pages):
+            docs = self._search(query, filter_query, page)
+            if docs is None:
+                if page == 0:
+                    return None
+                break
+            for article in docs:
+                movie, confidence = attribute_article(article, movies)
+                if movie is not None:
+                    matches[movie[0]].append((confidence, article, movie[1]))
+            if len(docs) < PAGE_SIZE:
+                exhausted = True
+                break
+            if all(len(found) >= ARTICLES_PER_MOVIE for found in matches.values()):
+                break
+
+        return {
+            imdb_id: [
+                self._format_document(article, imdb_id, title, confidence)
+                for confidence, article, title
+                in sorted(found, key=lambda match: -match[0])[:ARTICLES_PER_MOVIE]
+            ]
+            for imdb_id, found in matches.items()
+            if found or exhausted
+        }
+
+    def _fetch_single(self, movie: Movie) -> Optional[Dict[str, List[Dict]]]:
+        """Per-movie search; the top results are taken as the movie's reviews."""
+        imdb_id, title, year = movie
+        articles = self.fetch_articles_for_movie(title, year)
+        if articles is None:
+            return None
+        # Usually, the most relevant article is the first one; take the top 2
+        return {imdb_id: [
+            self._format_document(article, imdb_id, title)
+            for article in articles[:ARTICLES_PER_MOVIE]
+        ]}
+
+    def _journal_results(self, found: Optional[Dict[str, List[Dict]]]):
+        """Journals fetched articles; failed requests (None) are not, so the next run retries them."""
+        for imdb_id, articles in (found or {}).items():
+            self.journal.append({'imdb_id': imdb_id, 'articles': articles})
+
+    def _process_batch(self, batch: List[Movie]):
+        """
+        Searches a batch and journals the results.
+
+        Movies a cut-short search left unmatched are searched again in
+        halves, down to single movies, but the batch never costs more
+        requests than searching its movies one by one would. Movies still
+        unresolved when that allowance is spent are not journaled, so a
+        later run retries them.
+        """
+        allowance = len(batch)
+        pending = [batch]
+        while pending and allowance > 0:
+            group = pending.pop(0)
+            sent = self.scheduler.sent
+            if len(group) == 1:
+                found = self._fetch_single(group[0])
+            else:
+                found = self.fetch_articles_for_batch(group, min(self.max_pages, allowance))
+            allowance -= self.scheduler.sent - sent
+            self._journal_results(found)
+            if found is None:
+                continue
+            unmatched = [movie for movie in group if movie[0] not in found]
+            if unmatched:
+                half = (len(unmatched) + 1) // 2
+                pending.extend(unmatched[i:i + half] for i in range(0, len(unmatched), half))
 
     def process_movies(self, limit: int = 0):
         """
-        Iterates through movies, fetches articles from NYT, and saves them.
+        Fetches articles for the movies not yet journaled, in batches.
         """
         if not API_KEY:
             print("ERROR: NYT_API_KEY not found.")
@@ -99,22 +370,39 @@ class NYTArticleProcessor:
         if not movies_to_process:
             return
 
+        # Resume after the movies already journaled by an earlier run
+        processed = {record['imdb_id'] for record in self.journal.read()}
+        if processed:
+            movies_to_process = [m for m in movies_to_process if m[0] not in processed]
+            print(f"Resuming: {len(processed)} movies already processed, "
+                  f"{len(movies_to_process)} remaining.")
+
         if limit > 0:
             movies_to_process = movies_to_process[:limit]
             print(f"Processing a limit of {limit} movies.")
 
-        for imdb_id, title, year in tqdm(movies_to_process, desc="Fetching from NYT"):
-            articles = self.fetch_articles_for_movie(title, year)
-            if articles:
-                # Usually, the most relevant article is the first one
-                for article in articles[:2]: # Take top 2 most relevant
-                    formatted_article = self._format_document(article, imdb_id, title)
-                    self.articles.append(formatted_article)
-            
-            # NYT API has a rate limit of ~10 requests/minute. Sleep for 7 seconds for safety.
-            time.sleep(7)
-
-    def _format_document(self, article: Dict, imdb_id: str, movie_title: str) -> Dict:
+        try:
+            with tqdm(total=len(movies_to_process), desc="Fetching from NYT") as pbar:
+                for batch in make_batches(movies_to_process, self.batch_size):
+                    self._process_batch(batch)
+                    pbar.update(len(batch))
+        except BudgetExhausted as e:
+            print(f"{e} Rerun later to continue.")
+        finally:
+            self.journal.close()
+            print(f"Sent {self.scheduler.sent} requests.")
+
+    def compact(self):
+        """Compacts the journal and collects every journaled article."""
+        count = self.journal.compact(key=lambda record: record['imdb_id'])
+        self.articles = [
+            article for record in self.journal.read() for article in record['articles']
+        ]
+        print(f"Compacted journal: {count} movies, {len(self.articles)} articles.")
+
+    def _format_document(
+        self, article: Dict, imdb_id: str, movie_title: str, confidence: Optional[float] = None
+    ) -> Dict:
         """Formats the NYT API response into our document structure."""
         return {
             "id": f"nyt_{article.get('_id')}",
@@ -124,9 +412,10 @@ class NYTArticleProcessor:
             "abstract": article.get("abstract"),
             "snippet": article.get("snippet"),
             "lead_paragraph": article.get("lead_paragraph"),
-            "pub_date": article.get("pub_date"),
+            "pub_date": to_solr_date(article.get("pub_date")),
             "web_url": article.get("web_url"),
-            "source": "The New York Times"
+            "source": "The New York Times",
+            "confidence": confidence
         }
 
     def save_data(self):
@@ -144,15 +433,34 @@ class NYTArticleProcessor:
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Fetch NYT articles for IMDb movies.")
+    # Process a subset by default to avoid long waits
+    parser.add_argument('--limit', type=int, default=100,
+                        help="Only fetch the next N unprocessed movies (0 for all)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="Titles searched per request (1 searches movie by movie)")
+    parser.add_argument('--budget', type=int, default=DAILY_REQUESTS,
+                        help="Maximum API requests in this run (0 for no limit)")
+    parser.add_argument('--compact-only', action='store_true',
+                        help="Rebuild the output from the journal without fetching")
+    args = parser.parse_args()
+
     print("Starting NYT article processing...")
 
-    if os.path.exists(OUTPUT_FILE):
+    if os.path.exists(OUTPUT_FILE) and not os.path.exists(JOURNAL_FILE):
         print(f"NYT data already exists at {OUTPUT_FILE}. Skipping.")
         return
 
-    processor = NYTArticleProcessor()
-    # Process a small subset for demonstration to avoid long waits
-    processor.process_movies(limit=10) 
+    processor = NYTArticleProcessor(
+        batch_size=args.batch_size, scheduler=RequestScheduler(budget=args.budget)
+    )
+    if not args.compact_only:
+        try:
+            processor.process_movies(limit=args.limit)
+        except KeyboardInterrupt:
+            print("\nInterrupted; progress is saved in the journal.")
+    if os.path.exists(JOURNAL_FILE):
+        processor.compact()
     processor.save_data()
     print("\nNYT processing complete!")
 
@@ -10,76 +10,285 @@ including ratings from Rotten Tomatoes and Metacritic.
 2. Create a file named `.env` in the `scrapers/` directory.
 3. Add your API key to the `.env` file like this:
    OMDB_API_KEY="YOUR_API_KEY"
+4. Optionally match the request rate to your key's quota:
+   OMDB_RATE_LIMIT=10      # requests per second
+   OMDB_BURST=10           # requests allowed back to back
+   OMDB_CONCURRENCY=20     # requests in flight
+
+Requests are issued concurrently with asyncio and aiohttp, paced by a token
+bucket, and retried with exponential backoff and jitter on 429 and 5xx
+responses.
+
+Results are appended to a local store (omdb_store.jsonl) as they arrive,
+with the time each IMDb ID was fetched, so an interrupted run resumes
+where it stopped. Each run only fetches IDs that are new or older than
+--max-age-days (misses are retried after --missing-max-age-days), then
+rebuilds omdb_movies.json from the store.
 """
 
-import requests
+import argparse
+import asyncio
 import json
 import os
+import random
 import time
+from datetime import datetime, timedelta, timezone
+import aiohttp
 from dotenv import load_dotenv
 from typing import List, Dict, Optional
 from tqdm import tqdm
+from scraper_utils import JsonlJournal, find_records_file, load_records
 
 # --- Configuration ---
-API_BASE_URL = "https://www.omdbapi.com/"
+API_BASE_URL = os.getenv("OMDB_API_URL", "https://www.omdbapi.com/")
 IMDB_INPUT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'imdb_movies.json')
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'omdb_movies.json')
+STORE_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'omdb_store.jsonl')
 
 # Load API credentials from .env file
 load_dotenv()
 API_KEY = os.getenv("OMDB_API_KEY")
+RATE_LIMIT = float(os.getenv("OMDB_RATE_LIMIT", "10"))
+BURST = int(os.getenv("OMDB_BURST", "10"))
+CONCURRENCY = int(os.getenv("OMDB_CONCURRENCY", "20"))
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # Seconds before the first retry; doubles on each attempt
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_AGE_DAYS = float(os.getenv("OMDB_MAX_AGE_DAYS", "30"))
+MISSING_MAX_AGE_DAYS = float(os.getenv("OMDB_MISSING_MAX_AGE_DAYS", "7"))
+# OMDb errors meaning the ID has no data (anything else is treated as transient)
+NOT_FOUND_ERRORS = {"Incorrect IMDb ID.", "Movie not found!"}
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Returns the wait before a retry: Retry-After if given, else full-jitter backoff."""
+    if retry_after and retry_after.isdigit():
+        return min(BACKOFF_MAX, float(retry_after))
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class OMDbStore:
+    """
+    Local store of OMDb results, one JSON line per IMDb ID, indexed in memory.
+
+    Each entry holds the formatted document (None if OMDb has no data for
+    the ID) and when it was fetched. Entries are journaled as they are put,
+    so later lines supersede earlier ones until the store is compacted.
+    """
+
+    def __init__(self, path: str = STORE_FILE):
+        self.path = path
+        self.journal = JsonlJournal(path)
+        self.entries: Dict[str, Dict] = {}
+        for entry in self.journal.read():
+            self.entries[entry['imdb_id']] = entry
+        if self.entries:
+            print(f"Loaded {len(self.entries)} stored OMDb results from {path}")
+
+    def put(self, imdb_id: str, document: Optional[Dict]):
+        """Records the result of fetching an ID."""
+        entry = {
+            'imdb_id': imdb_id,
+            'fetched_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'document': document
+        }
+        self.entries[imdb_id] = entry
+        self.journal.append(entry)
+
+    def needs_fetch(self, imdb_id: str, max_age: timedelta, missing_max_age: timedelta) -> bool:
+        """True if the ID was never fetched or its entry is older than allowed."""
+        entry = self.entries.get(imdb_id)
+        if entry is None:
+            return True
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(entry['fetched_at'])
+        return age > (max_age if entry['document'] is not None else missing_max_age)
+
+    def documents(self, imdb_ids: List[str]) -> List[Dict]:
+        """Returns the stored documents of the given IDs, in order."""
+        entries = (self.entries.get(imdb_id) for imdb_id in imdb_ids)
+        return [entry['document'] for entry in entries if entry and entry['document']]
+
+    def save(self):
+        """Flushes the journal and compacts it to one line per ID."""
+        self.journal.compact(key=lambda entry: entry['imdb_id'])
+
 
 class OMDbProcessor:
     """Enriches movie data using the OMDb API."""
 
-    def __init__(self, input_file: str = IMDB_INPUT_FILE, output_file: str = OUTPUT_FILE):
+    def __init__(
+        self,
+        input_file: str = IMDB_INPUT_FILE,
+        output_file: str = OUTPUT_FILE,
+        rate_limit: float = RATE_LIMIT,
+        burst: int = BURST,
+        concurrency: int = CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        store: Optional[OMDbStore] = None,
+        max_age_days: float = MAX_AGE_DAYS,
+        missing_max_age_days: float = MISSING_MAX_AGE_DAYS
+    ):
         self.input_file = input_file
         self.output_file = output_file
+        self.store = store if store is not None else OMDbStore()
+        self.max_age = timedelta(days=max_age_days)
+        self.missing_max_age = timedelta(days=missing_max_age_days)
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
         self.enriched_movies: List[Dict] = []
 
     def _get_imdb_ids(self) -> List[str]:
-        """Loads IMDb IDs from the processed IMDb JSON file."""
-        if not os.path.exists(self.input_file):
+        """Loads IMDb IDs from the processed IMDb JSON (or JSONL) file."""
+        input_file = find_records_file(self.input_file)
+        if input_file is None:
             print(f"ERROR: IMDb input file not found at {self.input_file}")
             print("Please run the process_imdb_data.py script first.")
             return []
         
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            imdb_data = json.load(f)
+        imdb_data = load_records(input_file)
         
         ids = [movie.get('tconst') for movie in imdb_data if movie.get('tconst')]
         print(f"Loaded {len(ids)} IMDb IDs to process.")
         return ids
 
-    def fetch_movie_data(self, imdb_id: str) -> Optional[Dict]:
-        """Fetches data for a single movie from the OMDb API."""
-        if not API_KEY:
-            return None
+    async def fetch_movie_data(
+        self, session: aiohttp.ClientSession, bucket: TokenBucket, imdb_id: str
+    ) -> Optional[Dict]:
+        """
+        Fetches data for a single movie from the OMDb API, retrying transient errors.
 
+        Returns the API response (with Response "False" if OMDb has no data
+        for the ID), or None if it could not be fetched.
+        """
         params = {
             "i": imdb_id,
             "apikey": API_KEY,
             "plot": "full"
         }
-        try:
-            response = requests.get(API_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("Response") == "True":
-                return data
-            else:
-                print(f"Warning: OMDb API returned an error for {imdb_id}: {data.get('Error')}")
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            data = None
+            try:
+                async with session.get(API_BASE_URL, params=params) as response:
+                    status = response.status
+                    retry_after = response.headers.get('Retry-After')
+                    if status != 401 and status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+            except aiohttp.ClientResponseError as e:
+                # Statuses outside RETRY_STATUSES won't change on a retry
+                print(f"Error fetching data for {imdb_id}: HTTP {e.status}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                print(f"Error fetching data for {imdb_id}: {e!r}")
                 return None
-        except requests.exceptions.RequestException as e:
-            if e.response and e.response.status_code == 401:
+            except ValueError as e:
+                # The body was not JSON (e.g. an HTML error page)
+                print(f"Error decoding OMDb response for {imdb_id}: {e}")
+                return None
+
+            if status == 401:
                 # This is a fatal error for the session, raise an exception to stop.
-                raise ValueError("OMDb API key is invalid (401 Unauthorized). Halting OMDb processing.")
-            print(f"Error fetching data for {imdb_id}: {e}")
+                raise ValueError("OMDb API key is invalid or over its quota "
+                                 "(401 Unauthorized). Halting OMDb processing.")
+            if status in RETRY_STATUSES:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
+                    continue
+                print(f"Error fetching data for {imdb_id}: HTTP {status} after {attempt + 1} attempts")
+                return None
+            if not isinstance(data, dict):
+                print(f"Error decoding OMDb response for {imdb_id}: not a JSON object")
+                return None
+
+            if data.get("Response") == "True" or data.get("Error") in NOT_FOUND_ERRORS:
+                return data
+            print(f"Warning: OMDb API returned an error for {imdb_id}: {data.get('Error')}")
             return None
+        return None
+
+    def _store_result(self, imdb_id: str, data: Dict):
+        """Formats and records a response; malformed ones are skipped and retried next run."""
+        document = None
+        if data.get("Response") == "True":
+            try:
+                document = self._format_document(data)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"Error formatting OMDb data for {imdb_id}: {e}")
+                return
+        self.store.put(imdb_id, document)
+
+    async def _fetch_all(self, imdb_ids: List[str]):
+        """
+        Fetches all IDs with a fixed pool of workers pulling from a queue,
+        recording each result in the store.
+        """
+        bucket = TokenBucket(self.rate_limit, self.burst)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        queue: asyncio.Queue = asyncio.Queue()
+        for imdb_id in imdb_ids:
+            queue.put_nowait(imdb_id)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            with tqdm(total=len(imdb_ids), desc="Fetching from OMDb") as pbar:
+                async def worker():
+                    while True:
+                        try:
+                            imdb_id = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        try:
+                            data = await self.fetch_movie_data(session, bucket, imdb_id)
+                        finally:
+                            pbar.update(1)
+                        if data is not None:
+                            self._store_result(imdb_id, data)
+
+                workers = [
+                    asyncio.ensure_future(worker())
+                    for _ in range(min(self.concurrency, len(imdb_ids)))
+                ]
+                try:
+                    await asyncio.gather(*workers)
+                finally:
+                    for task in workers:
+                        task.cancel()
 
     def process_movies(self, limit: int = 0):
         """
-        Iterates through IMDb IDs, fetches data from OMDb, and saves it.
+        Fetches OMDb data for new and stale IMDb IDs and collects the stored
+        documents of all current IDs.
         """
         if not API_KEY:
             print("ERROR: OMDB_API_KEY not found.")
@@ -90,16 +299,28 @@ class OMDbProcessor:
         if not imdb_ids:
             return
 
+        pending = [
+            imdb_id for imdb_id in imdb_ids
+            if self.store.needs_fetch(imdb_id, self.max_age, self.missing_max_age)
+        ]
+        new = sum(1 for imdb_id in pending if imdb_id not in self.store.entries)
+        print(f"{new} new and {len(pending) - new} stale IDs to fetch; "
+              f"{len(imdb_ids) - len(pending)} are up to date.")
+
         if limit > 0:
-            imdb_ids = imdb_ids[:limit]
+            pending = pending[:limit]
             print(f"Processing a limit of {limit} movies.")
 
-        for imdb_id in tqdm(imdb_ids, desc="Fetching from OMDb"):
-            movie_data = self.fetch_movie_data(imdb_id)
-            if movie_data:
-                self.enriched_movies.append(self._format_document(movie_data))
-            # OMDb has a rate limit, a small delay is good practice
-            time.sleep(0.05) 
+        if pending:
+            print(f"Rate limit: {self.rate_limit:g} req/s (burst {self.burst}), "
+                  f"{self.concurrency} concurrent requests.")
+            try:
+                asyncio.run(self._fetch_all(pending))
+            finally:
+                # Everything fetched is already journaled; fold it into one line per ID
+                self.store.save()
+
+        self.enriched_movies = self.store.documents(imdb_ids)
 
     def _format_document(self, data: Dict) -> Dict:
         """Formats the OMDb API response into our standard document structure."""
@@ -149,15 +370,21 @@ class OMDbProcessor:
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Enrich IMDb movies with OMDb data.")
+    parser.add_argument('--limit', type=int, default=0,
+                        help="Only fetch the first N pending movies (default: all)")
+    parser.add_argument('--max-age-days', type=float, default=MAX_AGE_DAYS,
+                        help="Refetch movies fetched longer ago than this")
+    parser.add_argument('--missing-max-age-days', type=float, default=MISSING_MAX_AGE_DAYS,
+                        help="Retry IDs OMDb had no data for after this many days")
+    args = parser.parse_args()
+
     print("Starting OMDb data enrichment process...")
-    
-    if os.path.exists(OUTPUT_FILE):
-        print(f"OMDb data already exists at {OUTPUT_FILE}. Skipping.")
-        return
-        
-    processor = OMDbProcessor()
-    # Process a subset for demonstration purposes to avoid long waits
-    processor.process_movies(limit=100) 
+
+    processor = OMDbProcessor(
+        max_age_days=args.max_age_days, missing_max_age_days=args.missing_max_age_days
+    )
+    processor.process_movies(limit=args.limit)
     processor.save_data()
     print("\nOMDb processing complete!")
 
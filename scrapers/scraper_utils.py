@@ -1,12 +1,21 @@
 """
 Common utilities for web scraping movie data.
-Provides shared functions for HTTP requests, data cleaning, and rate limiting.
+Provides shared functions for HTTP requests, data cleaning, rate limiting,
+a concurrent crawler with per-host politeness, and crash-safe checkpointing
+of fetched results.
 """
 
+import heapq
+import itertools
+import json
+import os
+import threading
 import time
 import re
 import hashlib
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, Optional, List, Tuple
+from urllib.parse import urlsplit
 import requests
 from bs4 import BeautifulSoup
 
@@ -20,6 +29,30 @@ class ScraperUtils:
         'AppleWebKit/537.36 (KHTML, like Gecko) '
         'Chrome/120.0.0.0 Safari/537.36'
     )
+
+    POOL_SIZE = 32  # Connections kept alive per host
+
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+
+    @staticmethod
+    def session() -> requests.Session:
+        """
+        Return the shared HTTP session.
+
+        Connections are pooled and kept alive across requests and threads.
+        """
+        with ScraperUtils._session_lock:
+            if ScraperUtils._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=ScraperUtils.POOL_SIZE, pool_maxsize=ScraperUtils.POOL_SIZE
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = ScraperUtils.USER_AGENT
+                ScraperUtils._session = session
+            return ScraperUtils._session
     
     @staticmethod
     def get_page(url: str, delay: float = 1.0) -> Optional[BeautifulSoup]:
@@ -36,8 +69,7 @@ class ScraperUtils:
         time.sleep(delay)  # Respectful crawling
         
         try:
-            headers = {'User-Agent': ScraperUtils.USER_AGENT}
-            response = requests.get(url, headers=headers, timeout=10)
+            response = ScraperUtils.session().get(url, timeout=10)
             response.raise_for_status()
             return BeautifulSoup(response.content, 'lxml')
         except requests.RequestException as e:
@@ -167,6 +199,73 @@ class ScraperUtils:
         return truncated + '...'
 
 
+def find_records_file(path: str) -> Optional[str]:
+    """
+    Locate a JSON records file, accepting its JSON Lines variant.
+
+    process_imdb_data.py --jsonl writes imdb_movies.jsonl instead of
+    imdb_movies.json; readers pass the .json path and get whichever exists.
+
+    Args:
+        path: Expected path of the JSON file
+
+    Returns:
+        The path itself, its .jsonl sibling, or None if neither exists
+    """
+    if os.path.exists(path):
+        return path
+    jsonl_path = os.path.splitext(path)[0] + '.jsonl'
+    if os.path.exists(jsonl_path):
+        return jsonl_path
+    return None
+
+
+def load_records(path: str) -> List[Dict]:
+    """
+    Load a list of records from a JSON array file or a .jsonl file.
+
+    Args:
+        path: File path; read as JSON Lines if it ends with .jsonl
+
+    Returns:
+        List of records
+
+    Raises:
+        ValueError: If the file is not valid JSON
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def to_solr_date(value: Optional[str]) -> Optional[str]:
+    """
+    Convert an ISO-8601 timestamp to the UTC form Solr date fields accept.
+
+    The NYT API returns dates like 2010-07-16T00:00:00+0000, which Solr's
+    DatePointField rejects; it only takes YYYY-MM-DDTHH:MM:SSZ.
+
+    Args:
+        value: Timestamp with or without a UTC offset (naive means UTC)
+
+    Returns:
+        Timestamp as YYYY-MM-DDTHH:MM:SSZ, or None if it can't be parsed
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z')
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
 def create_movie_document(
     title: str,
     year: int,
@@ -217,3 +316,293 @@ def create_movie_document(
         'reviews': reviews,
         'num_reviews': num_reviews
     }
+
+
+class Crawler:
+    """
+    Concurrent crawler built on ScraperUtils' pooled session.
+
+    URLs wait in a priority frontier (lower priority values first) split by
+    host. A pool of worker threads takes the best URL whose host is ready:
+    each host gets at most `host_concurrency` requests in flight and one new
+    request per `host_delay` seconds, so politeness is enforced per host and
+    the total crawl rate grows with the number of hosts.
+
+    Usage:
+        def handle(url, soup):
+            ...  # extract data
+            return [(link, 1.0) for link in links]  # URLs to crawl next
+
+        Crawler(handle, workers=8).crawl(seed_urls)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, BeautifulSoup], Optional[Iterable[Tuple[str, float]]]],
+        workers: int = 8,
+        host_delay: float = 1.0,
+        host_concurrency: int = 1,
+        max_pages: int = 0,
+        max_retries: int = 2,
+        timeout: float = 10
+    ):
+        """
+        Initialize the crawler.
+
+        Args:
+            handler: Called with each fetched page; returns (url, priority)
+                pairs to add to the frontier
+            workers: Worker threads
+            host_delay: Minimum seconds between request starts to one host
+            host_concurrency: Maximum requests in flight per host
+            max_pages: Stop after fetching this many pages (0 for no limit)
+            max_retries: Retries of a URL after 429/5xx responses or
+                connection errors
+            timeout: Request timeout in seconds
+        """
+        self.handler = handler
+        self.workers = workers
+        self.host_delay = host_delay
+        self.host_concurrency = host_concurrency
+        self.max_pages = max_pages
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._frontier: Dict[str, List[Tuple[float, int, str, int]]] = {}
+        self._seen = set()
+        self._counter = itertools.count()
+        self._next_start: Dict[str, float] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._active = 0
+        self.fetched = 0
+        self.failed = 0
+
+    def add(self, url: str, priority: float = 0.0, attempt: int = 0) -> bool:
+        """
+        Add a URL to the frontier.
+
+        Returns:
+            False if the URL was already added
+        """
+        host = urlsplit(url).netloc
+        with self._cond:
+            if attempt == 0:
+                if url in self._seen:
+                    return False
+                self._seen.add(url)
+            heapq.heappush(
+                self._frontier.setdefault(host, []), (priority, next(self._counter), url, attempt)
+            )
+            self._cond.notify()
+        return True
+
+    def _take(self) -> Optional[Tuple[str, float, int]]:
+        """Block until a URL can be fetched; None when the crawl is over."""
+        with self._cond:
+            while True:
+                if self.max_pages and self.fetched + self._active >= self.max_pages:
+                    if self._active == 0:
+                        return None
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                best_host, wake_at = None, None
+                for host, queue in self._frontier.items():
+                    if not queue or self._in_flight.get(host, 0) >= self.host_concurrency:
+                        continue
+                    ready_at = self._next_start.get(host, 0.0)
+                    if ready_at > now:
+                        wake_at = ready_at if wake_at is None else min(wake_at, ready_at)
+                    elif best_host is None or queue[0] < self._frontier[best_host][0]:
+                        best_host = host
+
+                if best_host is not None:
+                    priority, _, url, attempt = heapq.heappop(self._frontier[best_host])
+                    self._in_flight[best_host] = self._in_flight.get(best_host, 0) + 1
+                    self._next_start[best_host] = now + self.host_delay
+                    self._active += 1
+                    return url, priority, attempt
+
+                if self._active == 0 and wake_at is None:
+                    return None  # Frontier drained and nothing in flight to add more
+                self._cond.wait(None if wake_at is None else wake_at - now)
+
+    def _done(self, url: str, fetched: bool, backoff: float = 0.0):
+        host = urlsplit(url).netloc
+        with self._cond:
+            self._in_flight[host] -= 1
+            self._active -= 1
+            if fetched:
+                self.fetched += 1
+            if backoff:
+                self._next_start[host] = max(self._next_start.get(host, 0.0),
+                                             time.monotonic() + backoff)
+            self._cond.notify_all()
+
+    def _fetch(self, url: str, priority: float, attempt: int):
+        """Fetch and handle one URL, then release its host slot."""
+        links: Iterable[Tuple[str, float]] = ()
+        fetched, retry, backoff = False, False, 0.0
+        try:
+            response = ScraperUtils.session().get(url, timeout=self.timeout)
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = response.headers.get('Retry-After', '')
+                backoff = (float(retry_after) if retry_after.isdigit()
+                           else self.host_delay * 2 ** (attempt + 1))
+            response.raise_for_status()
+            soup = BeautifulSoup(response.content, 'lxml')
+            fetched = True
+            links = list(self.handler(url, soup) or ())
+        except requests.RequestException as e:
+            # Connection errors, 429 and 5xx are worth another try; other 4xx are not
+            retry = attempt < self.max_retries and (e.response is None or backoff > 0)
+            if not retry:
+                print(f"Error fetching {url}: {e}")
+        except Exception as e:
+            print(f"Error handling {url}: {e}")
+
+        # New URLs go in before the slot is released, so idle workers
+        # never see an empty frontier while this page still has links
+        if retry:
+            self.add(url, priority, attempt + 1)
+        for link, link_priority in links:
+            self.add(link, link_priority)
+        with self._cond:
+            if not fetched and not retry:
+                self.failed += 1
+        self._done(url, fetched, backoff)
+
+    def _work(self):
+        while True:
+            task = self._take()
+            if task is None:
+                return
+            self._fetch(*task)
+
+    def crawl(self, seeds: Iterable[str], priority: float = 0.0) -> int:
+        """
+        Crawl from the seed URLs until the frontier is empty or max_pages is reached.
+
+        Returns:
+            Number of pages fetched
+        """
+        for url in seeds:
+            self.add(url, priority)
+        threads = [
+            threading.Thread(target=self._work, name=f'crawler-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.fetched
+
+
+class JsonlJournal:
+    """
+    Append-only JSON Lines checkpoint file.
+
+    Fetchers append each result as soon as it arrives, so a crash or Ctrl-C
+    loses at most the records not yet fsynced. On restart, `read()` replays
+    the journal (dropping a half-written last line), and `compact()` rewrites
+    it with only the latest record per key.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 100, fsync_interval: float = 5.0):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Journal file path (created on first append)
+            fsync_every: Records appended between fsyncs
+            fsync_interval: Maximum seconds between fsyncs
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def read(self) -> Iterator[Dict]:
+        """
+        Yield the journal's records in order.
+
+        A trailing partial line left by a crash is truncated away so later
+        appends start on a clean line.
+        """
+        if not os.path.exists(self.path):
+            return
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_end += len(line)
+                yield record
+        if valid_end < os.path.getsize(self.path):
+            print(f"Discarding a partial record at the end of {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    def append(self, record: Dict):
+        """Append one record, fsyncing periodically."""
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        """Force appended records to disk."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Sync and close the journal file."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def compact(self, key: Callable[[Dict], str]) -> int:
+        """
+        Rewrite the journal atomically, keeping the last record per key.
+
+        Args:
+            key: Function returning a record's key
+
+        Returns:
+            Number of records kept
+        """
+        self.close()
+        latest = {key(record): record for record in self.read()}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in latest.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return len(latest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
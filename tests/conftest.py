@@ -0,0 +1,112 @@
+"""
+Shared test fixtures.
+
+The web app and scrapers use flat imports (e.g. `from solr_client import
+SolrClient`), so both directories are put on sys.path. Network-facing code
+is tested against StubServer, a local HTTP server whose responses are set
+by each test.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ('web', 'scrapers'):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+
+
+# respond(request) -> (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class StubRequest:
+    """A request received by a StubServer."""
+
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]], headers: Dict[str, str]):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+
+    def param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """First value of a query parameter."""
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class StubServer:
+    """
+    Local HTTP server answering every request with `respond(request)`.
+
+    If the response headers set a Content-Length larger than the body, the
+    body is sent and the connection closed, simulating a dropped transfer.
+    """
+
+    def __init__(self, respond: Callable[[StubRequest], Response], host: str = '127.0.0.1'):
+        self.respond = respond
+        self.requests: List[StubRequest] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query, keep_blank_values=True)
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode('utf-8')
+                    for key, values in parse_qs(body, keep_blank_values=True).items():
+                        query.setdefault(key, []).extend(values)
+                request = StubRequest(self.command, parts.path, query, dict(self.headers))
+                with server._lock:
+                    server.requests.append(request)
+
+                status, headers, body = server.respond(request)
+                self.send_response(status)
+                headers = dict(headers)
+                headers.setdefault('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+                if int(headers['Content-Length']) != len(body):
+                    self.close_connection = True
+
+            do_GET = do_POST = do_HEAD = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f'http://{host}:{self._httpd.server_port}'
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """Factory starting StubServers that are shut down after the test."""
+    servers = []
+
+    def start(respond: Callable[[StubRequest], Response]) -> StubServer:
+        server = StubServer(respond)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
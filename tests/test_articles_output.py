@@ -0,0 +1,37 @@
+"""Tests for NYT article documents posted to the articles collection."""
+
+import json
+
+import pytest
+
+from merge_data import DataMerger
+from scraper_utils import to_solr_date
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2010-07-16T00:00:00+0000', '2010-07-16T00:00:00Z'),
+    ('2010-07-16T20:30:00-0500', '2010-07-17T01:30:00Z'),
+    ('2024-01-02T03:04:05.123Z', '2024-01-02T03:04:05Z'),
+    ('2010-07-16', '2010-07-16T00:00:00Z'),
+    ('July 2010', None),
+    (None, None),
+])
+def test_to_solr_date(value, expected):
+    assert to_solr_date(value) == expected
+
+
+def test_save_articles_normalizes_pub_date(tmp_path):
+    merger = DataMerger(str(tmp_path), str(tmp_path / 'movies.json'))
+    merger.movies = {'tt0000001': {}}
+    merger.nyt_articles['tt0000001'].append(
+        {'id': 'nyt_1', 'imdb_id': 'tt0000001', 'pub_date': '2010-07-16T00:00:00+0000'}
+    )
+    merger.nyt_articles['tt0000002'].append(
+        {'id': 'nyt_2', 'imdb_id': 'tt0000002', 'pub_date': '2011-01-01T00:00:00+0000'}
+    )
+
+    merger.save_articles()
+
+    with open(tmp_path / 'nyt_articles.json', encoding='utf-8') as f:
+        articles = json.load(f)
+    assert articles == [{'id': 'nyt_1', 'imdb_id': 'tt0000001', 'pub_date': '2010-07-16T00:00:00Z'}]
@@ -0,0 +1,71 @@
+"""Tests for batch search spec validation (web/batch_search.py)."""
+
+import pytest
+
+import app as web_app
+from batch_search import BatchSearcher, parse_spec
+
+
+class FakeSolr:
+    """Records searches and answers each with one document."""
+
+    def __init__(self):
+        self.calls = []
+
+    def search(self, timeout=None, **kwargs):
+        self.calls.append(kwargs)
+        return {'num_found': 1, 'start': kwargs['start'], 'docs': [{'id': 'tt0000001'}]}
+
+
+def test_parse_spec_defaults():
+    assert parse_spec({}, max_rows=100) == {
+        'query': '*:*', 'filters': {}, 'sort': None, 'start': 0, 'rows': 10, 'fields': None
+    }
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'start': float('inf')}, 'must be integers'),
+    ({'rows': float('-inf')}, 'must be integers'),
+    ({'start': float('nan')}, 'must be integers'),
+    ({'start': 'ten'}, 'must be integers'),
+    ({'start': 20000}, 'at most 10000'),
+    ({'rows': 500}, 'at most 100'),
+    ({'filters': ['year']}, "'filters' must be an object"),
+    ({'filters': {'year': {'min': float('inf')}}}, 'must be numbers'),
+    ({'filters': {'year': {'min': '1990'}}}, 'must be numbers'),
+    ({'filters': {'genres': 'Drama" OR "x'}}, 'quotes'),
+    ({'filters': {'plot': 'x'}}, "cannot filter on 'plot'"),
+    ({'fields': 'title'}, "'fields' must be a list"),
+    ({'sort': 'title asc'}, 'unsupported sort'),
+])
+def test_parse_spec_rejects(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_spec(spec, max_rows=100)
+
+
+def test_invalid_specs_fail_only_their_item():
+    solr = FakeSolr()
+    searcher = BatchSearcher(solr, max_workers=2)
+
+    results = searcher.run([{'query': 'alien'}, {'start': float('inf')}, {'query': 'alien'}], timeout=5)
+
+    assert results[0] == results[2] == {'num_found': 1, 'start': 0, 'docs': [{'id': 'tt0000001'}]}
+    assert 'error' in results[1]
+    # Identical specs are searched once
+    assert len(solr.calls) == 1
+
+
+def test_endpoint_reports_overflowing_start_per_item(monkeypatch):
+    monkeypatch.setattr(web_app.batch_searcher, 'solr_client', FakeSolr())
+    client = web_app.app.test_client()
+
+    response = client.post(
+        '/api/search/batch',
+        data='{"queries": [{"query": "alien", "start": 1e400}, {"query": "alien"}]}',
+        content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    first, second = response.get_json()['results']
+    assert first == {'error': "'start' and 'rows' must be integers"}
+    assert second['num_found'] == 1
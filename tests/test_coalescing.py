@@ -0,0 +1,77 @@
+"""Tests for coalescing of concurrent identical Solr requests (web/solr_client.py)."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from solr_client import SolrClient
+
+
+def slow_solr(request):
+    """Stub Solr select that takes long enough for concurrent callers to overlap."""
+    time.sleep(0.3)
+    body = {
+        'responseHeader': {'status': 0, 'QTime': 300},
+        'response': {'numFound': 1, 'start': 0, 'docs': [{'id': 'tt0000001', 'title': 'Movie 1'}]}
+    }
+    return 200, {'Content-Type': 'application/json'}, json.dumps(body).encode()
+
+
+@pytest.fixture
+def client(stub_server):
+    server = stub_server(slow_solr)
+    client = SolrClient(server.url, health_interval=0)
+    yield client, server
+    for pool in client.pools:
+        pool.close()
+
+
+def concurrently(*calls):
+    results = [None] * len(calls)
+
+    def run(index, call):
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_requests_share_one_solr_call(client):
+    solr, server = client
+
+    results = concurrently(
+        lambda: solr.search(query='movie', timeout=2.0),
+        lambda: solr.search(query='movie', timeout=2.0)
+    )
+
+    assert len(server.requests) == 1
+    assert server.requests[0].param('timeAllowed') == '2000'
+    assert all(r['num_found'] == 1 for r in results)
+
+
+def test_different_budgets_are_not_coalesced(client):
+    solr, server = client
+
+    concurrently(
+        lambda: solr.search(query='movie', timeout=0.5),
+        lambda: solr.search(query='movie', timeout=5.0)
+    )
+
+    assert sorted(r.param('timeAllowed') for r in server.requests) == ['500', '5000']
+
+
+def test_different_shards_or_operations_are_not_coalesced(client):
+    solr, server = client
+
+    concurrently(
+        lambda: solr._execute('search', shard=0, q='*:*'),
+        lambda: solr._execute('get_by_id', shard=0, q='*:*')
+    )
+
+    assert len(server.requests) == 2
@@ -0,0 +1,62 @@
+"""Tests for ETag caching of Flask routes when Solr fails (web/http_cache.py)."""
+
+import time
+
+import pytest
+
+import app as web_app
+
+SOURCE = {'id': 'tt0000001', 'title': 'Movie 1', 'year': 1999, 'genres': [], 'cast': [], 'directors': []}
+SOLR_ERROR = {'docs': [], 'num_found': 0, 'error': 'Connection refused'}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client whose Solr client still reports the last known index version."""
+    solr = web_app.solr_client
+    monkeypatch.setattr(solr, '_index_version', ('1-100', time.monotonic() + 3600))
+    monkeypatch.setattr(solr, 'get_by_id', lambda doc_id, on_missing=None: dict(SOURCE))
+    # Don't start a background ID filter build against the unreachable Solr
+    monkeypatch.setattr(web_app.doc_id_filter, 'might_exist', lambda doc_id: True)
+    return web_app.app.test_client()
+
+
+def test_similar_solr_error_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(web_app.solr_client, 'more_like_this', lambda doc_id, rows=5: dict(SOLR_ERROR))
+
+    response = client.get('/similar/tt0000001')
+
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert 'ETag' not in response.headers
+
+
+def test_similar_results_are_cached(client, monkeypatch):
+    monkeypatch.setattr(web_app.solr_client, 'more_like_this',
+                        lambda doc_id, rows=5: {'docs': [], 'num_found': 0, 'source_id': doc_id})
+
+    response = client.get('/similar/tt0000001')
+
+    assert response.status_code == 200
+    assert 'public' in response.headers['Cache-Control']
+    assert 'ETag' in response.headers
+
+
+def test_autocomplete_solr_error_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(web_app.solr_client, 'search', lambda **kwargs: dict(SOLR_ERROR))
+
+    response = client.get('/api/autocomplete?q=mov')
+
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_autocomplete_results_are_cached(client, monkeypatch):
+    monkeypatch.setattr(web_app.solr_client, 'search',
+                        lambda **kwargs: {'docs': [dict(SOURCE)], 'num_found': 1})
+
+    response = client.get('/api/autocomplete?q=mov')
+
+    assert response.get_json()[0]['id'] == SOURCE['id']
+    assert 's-maxage=3600' in response.headers['Cache-Control']
@@ -0,0 +1,153 @@
+"""Tests for resumable, conditional dataset downloads (scrapers/process_imdb_data.py)."""
+
+import json
+import os
+
+import pytest
+
+import process_imdb_data
+
+FILENAME = 'title.ratings.tsv.gz'
+CONTENT = bytes(range(256)) * 400
+ETAG = '"v1"'
+LAST_MODIFIED = 'Mon, 05 Oct 2026 10:00:00 GMT'
+
+
+class Dataset:
+    """Stub responder serving CONTENT with ETag, Range and If-None-Match support."""
+
+    def __init__(self, content=CONTENT, etag=ETAG, truncate_at=None):
+        self.content = content
+        self.etag = etag
+        self.truncate_at = truncate_at
+
+    def __call__(self, request):
+        headers = {'ETag': self.etag, 'Last-Modified': LAST_MODIFIED}
+        if request.headers.get('If-None-Match') == self.etag:
+            return 304, headers, b''
+
+        status, body = 200, self.content
+        byte_range = request.headers.get('Range')
+        if byte_range and request.headers.get('If-Range') == self.etag:
+            offset = int(byte_range[len('bytes='):].rstrip('-'))
+            if offset >= len(self.content):
+                return 416, {'Content-Range': f'bytes */{len(self.content)}'}, b''
+            status, body = 206, self.content[offset:]
+            headers['Content-Range'] = f'bytes {offset}-{len(self.content) - 1}/{len(self.content)}'
+
+        headers['Content-Length'] = str(len(body))
+        if self.truncate_at is not None:
+            # Announce the full body but drop the connection part way through
+            body = body[:self.truncate_at]
+            self.truncate_at = None
+        return status, headers, body
+
+
+@pytest.fixture
+def dataset(stub_server, tmp_path, monkeypatch):
+    """Start a dataset server and point the downloader at it and tmp_path."""
+    def start(responder):
+        server = stub_server(responder)
+        monkeypatch.setattr(process_imdb_data, 'BASE_URL', server.url + '/')
+        return server
+
+    monkeypatch.setattr(process_imdb_data, 'RAW_DATA_DIR', str(tmp_path))
+    return start
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_download_renames_part_file(dataset, tmp_path):
+    dataset(Dataset())
+
+    path = process_imdb_data.download_file(FILENAME)
+
+    assert path == str(tmp_path / FILENAME)
+    assert read(path) == CONTENT
+    assert not os.path.exists(path + '.part')
+    assert not os.path.exists(path + '.part.meta.json')
+    with open(path + '.meta.json', encoding='utf-8') as f:
+        assert json.load(f) == {'etag': ETAG, 'last_modified': LAST_MODIFIED}
+
+
+def test_truncated_download_keeps_part_file(dataset, tmp_path):
+    dataset(Dataset(truncate_at=1000))
+
+    assert process_imdb_data.download_file(FILENAME) is None
+    assert not (tmp_path / FILENAME).exists()
+    part = tmp_path / (FILENAME + '.part')
+    assert part.exists()
+    assert CONTENT.startswith(read(part))
+
+
+def test_resume_requests_remaining_range(dataset, tmp_path):
+    server = dataset(Dataset())
+    offset = 5000
+    (tmp_path / (FILENAME + '.part')).write_bytes(CONTENT[:offset])
+    (tmp_path / (FILENAME + '.part.meta.json')).write_text(
+        json.dumps({'etag': ETAG, 'last_modified': LAST_MODIFIED})
+    )
+
+    path = process_imdb_data.download_file(FILENAME)
+
+    request = server.requests[-1]
+    assert request.headers['Range'] == f'bytes={offset}-'
+    assert request.headers['If-Range'] == ETAG
+    assert read(path) == CONTENT
+    assert not os.path.exists(path + '.part')
+
+
+def test_resume_after_truncation(dataset, tmp_path):
+    server = dataset(Dataset(truncate_at=1000))
+
+    assert process_imdb_data.download_file(FILENAME) is None
+    path = process_imdb_data.download_file(FILENAME)
+
+    assert 'Range' in server.requests[-1].headers
+    assert read(path) == CONTENT
+
+
+def test_changed_dataset_restarts_resume(dataset, tmp_path):
+    new_content = CONTENT[::-1]
+    server = dataset(Dataset(content=new_content, etag='"v2"'))
+    (tmp_path / (FILENAME + '.part')).write_bytes(CONTENT[:5000])
+    (tmp_path / (FILENAME + '.part.meta.json')).write_text(json.dumps({'etag': ETAG}))
+
+    path = process_imdb_data.download_file(FILENAME)
+
+    # If-Range no longer matches, so the server sent the whole new file
+    assert server.requests[-1].headers['If-Range'] == ETAG
+    assert read(path) == new_content
+
+
+def test_unchanged_file_is_not_downloaded_again(dataset, tmp_path):
+    server = dataset(Dataset())
+    path = process_imdb_data.download_file(FILENAME)
+    mtime = os.path.getmtime(path)
+
+    assert process_imdb_data.download_file(FILENAME) == path
+
+    request = server.requests[-1]
+    assert request.headers['If-None-Match'] == ETAG
+    assert request.headers['If-Modified-Since'] == LAST_MODIFIED
+    assert read(path) == CONTENT
+    assert os.path.getmtime(path) == mtime
+
+
+def test_local_copy_used_when_server_unreachable(dataset, tmp_path, monkeypatch):
+    (tmp_path / FILENAME).write_bytes(CONTENT)
+    monkeypatch.setattr(process_imdb_data, 'BASE_URL', 'http://127.0.0.1:9/')
+
+    assert process_imdb_data.download_file(FILENAME) == str(tmp_path / FILENAME)
+
+
+def test_download_all(dataset, tmp_path):
+    dataset(Dataset())
+    names = [process_imdb_data.TITLE_BASICS, process_imdb_data.TITLE_RATINGS]
+
+    assert process_imdb_data.download_all(names)
+    for name in names:
+        assert read(tmp_path / name) == CONTENT
@@ -0,0 +1,73 @@
+"""Tests for the Parquet-cached processing stages (scrapers/process_imdb_data.py)."""
+
+import gzip
+import json
+
+import pytest
+
+import process_imdb_data
+
+DATASETS = {
+    process_imdb_data.TITLE_RATINGS: [
+        ['tconst', 'averageRating', 'numVotes'],
+        ['tt0000001', '8.1', '9000'],
+    ],
+    process_imdb_data.TITLE_BASICS: [
+        ['tconst', 'titleType', 'primaryTitle', 'originalTitle', 'startYear', 'genres'],
+        ['tt0000001', 'movie', 'Movie 1', 'Movie 1', '1999', 'Drama,Crime'],
+    ],
+    process_imdb_data.TITLE_PRINCIPALS: [
+        ['tconst', 'ordering', 'nconst', 'category'],
+        ['tt0000001', '1', 'nm0000010', 'director'],
+        ['tt0000001', '2', 'nm0000001', 'actor'],
+        ['tt0000001', '3', 'nm0000002', 'actress'],
+        ['tt0000001', '4', 'nm0000003', 'actor'],
+    ],
+    process_imdb_data.NAME_BASICS: [
+        ['nconst', 'primaryName'],
+        ['nm0000010', 'A Director'],
+        ['nm0000001', 'First Actor'],
+        ['nm0000002', 'Second Actress'],
+        ['nm0000003', 'Third Actor'],
+    ],
+}
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    """Write small datasets to tmp_path and point the pipeline at them."""
+    for filename, rows in DATASETS.items():
+        with gzip.open(tmp_path / filename, 'wt', encoding='utf-8') as f:
+            f.write(''.join('\t'.join(row) + '\n' for row in rows))
+    monkeypatch.setattr(process_imdb_data, 'RAW_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(process_imdb_data, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(process_imdb_data, 'OUTPUT_FILE', str(tmp_path / 'imdb_movies.json'))
+    monkeypatch.setattr(process_imdb_data, 'MIN_VOTES', 10)
+    monkeypatch.setattr(process_imdb_data, 'download_all', lambda filenames: True)
+    return tmp_path
+
+
+def run(tmp_path):
+    process_imdb_data.process_data(force=True)
+    with open(tmp_path / 'imdb_movies.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_process_data_joins_names(datasets):
+    [movie] = run(datasets)
+
+    assert movie['tconst'] == 'tt0000001'
+    assert movie['genres'] == ['Drama', 'Crime']
+    assert movie['directors'] == ['A Director']
+    assert movie['cast'] == ['First Actor', 'Second Actress', 'Third Actor']
+
+
+def test_names_stage_follows_people_selection(datasets, monkeypatch):
+    monkeypatch.setattr(process_imdb_data, 'TOP_ACTORS', 1)
+    [movie] = run(datasets)
+    assert movie['cast'] == ['First Actor']
+
+    # Principals are unchanged, but more actors need names now
+    monkeypatch.setattr(process_imdb_data, 'TOP_ACTORS', 3)
+    [movie] = run(datasets)
+    assert movie['cast'] == ['First Actor', 'Second Actress', 'Third Actor']
@@ -0,0 +1,42 @@
+"""Tests for the Prometheus-style metrics (web/metrics.py)."""
+
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_and_gauge_render_labelled_values():
+    registry = Registry()
+    requests = Counter('requests_total', 'Requests', ['route'], registry=registry)
+    in_flight = Gauge('in_flight', 'Requests in flight', registry=registry)
+
+    requests.labels('search').inc()
+    requests.labels(route='search').inc(2)
+    in_flight.inc()
+    in_flight.dec(0.5)
+
+    lines = registry.render().splitlines()
+    assert '# TYPE requests_total counter' in lines
+    assert 'requests_total{route="search"} 3' in lines
+    assert 'in_flight 0.5' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0), registry=registry)
+
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'latency_seconds_count 3' in text
+
+
+def test_function_backed_gauge():
+    registry = Registry()
+    Gauge('queue_depth', 'Queued', ['route'], registry=registry).set_function(
+        lambda: {('search',): 4}
+    )
+
+    assert 'queue_depth{route="search"} 4' in registry.render()
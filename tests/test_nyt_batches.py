@@ -0,0 +1,124 @@
+"""Tests for batched NYT review searches (scrapers/process_nyt_articles.py)."""
+
+import json
+import re
+
+import pytest
+
+import process_nyt_articles
+from process_nyt_articles import NYTArticleProcessor, RequestScheduler
+from scraper_utils import JsonlJournal
+
+TITLES = ['Alpha Story', 'Bravo Story', 'Charlie Story', 'Delta Story', 'Echo Story',
+          'Foxtrot Story', 'Golf Story', 'Hotel Story', 'India Story', 'Juliet Story']
+
+
+def article(n, headline):
+    return {'_id': f'nyt://article/{n}', 'headline': {'main': headline}, 'abstract': '',
+            'pub_date': '2010-07-16T00:00:00+0000', 'keywords': [], 'web_url': f'https://nyt/{n}'}
+
+
+class NYT:
+    """
+    Stub Article Search API.
+
+    Multi-title queries return a review for each title in `batch_hits`,
+    padded with unrelated reviews to full pages that never run out unless
+    `full_pages` is False; a single-title query returns one review of that
+    title.
+    """
+
+    def __init__(self, batch_hits=(), full_pages=True):
+        self.batch_hits = set(batch_hits)
+        self.full_pages = full_pages
+        self.queries = []
+
+    def __call__(self, request):
+        query = request.param('q')
+        self.queries.append(query)
+        titles = re.findall(r'"([^"]+)"', query)
+        if len(titles) == 1:
+            docs = [article(0, f'Review: {titles[0]}')]
+        else:
+            hits = [article(i, f'Review: {t}') for i, t in enumerate(titles) if t in self.batch_hits]
+            page = int(request.param('page'))
+            docs = hits if page == 0 else []
+            if self.full_pages:
+                docs += [article(100 * page + i, f'Unrelated film {i}')
+                         for i in range(process_nyt_articles.PAGE_SIZE - len(docs))]
+        body = {'status': 'OK', 'response': {'docs': docs}}
+        return 200, {'Content-Type': 'application/json'}, json.dumps(body).encode()
+
+
+@pytest.fixture
+def nyt(stub_server, tmp_path, monkeypatch):
+    """Start a stub NYT API and return a processor over len(TITLES) movies from 2010."""
+    def start(responder):
+        server = stub_server(responder)
+        monkeypatch.setattr(process_nyt_articles, 'API_BASE_URL', server.url + '/')
+        movies = [{'tconst': f'tt{i:07d}', 'title': title, 'year': 2010}
+                  for i, title in enumerate(TITLES, 1)]
+        with open(tmp_path / 'imdb_movies.json', 'w', encoding='utf-8') as f:
+            json.dump(movies, f)
+        return NYTArticleProcessor(
+            input_file=str(tmp_path / 'imdb_movies.json'),
+            output_file=str(tmp_path / 'nyt_articles.json'),
+            journal_file=str(tmp_path / 'journal.jsonl'),
+            scheduler=RequestScheduler(per_minute=60000, budget=0)
+        )
+
+    monkeypatch.setattr(process_nyt_articles, 'API_KEY', 'test-key')
+    return start
+
+
+def journaled(processor):
+    return {r['imdb_id']: r['articles'] for r in JsonlJournal(processor.journal.path).read()}
+
+
+def test_cut_short_batch_costs_no_more_than_single_searches(nyt):
+    stub = NYT()
+    processor = nyt(stub)
+
+    processor.process_movies()
+
+    assert processor.scheduler.sent <= len(TITLES)
+    # Nothing matched, and the pages never ran out: everything is left for a later run
+    assert journaled(processor) == {}
+
+
+def test_unmatched_movies_are_searched_alone(nyt):
+    stub = NYT(batch_hits=TITLES[:8])
+    processor = nyt(stub)
+
+    processor.process_movies()
+
+    records = journaled(processor)
+    assert set(records) == {f'tt{i:07d}' for i in range(1, len(TITLES) + 1)}
+    assert all(len(articles) == 1 for articles in records.values())
+    # Three batch pages, then one search per unmatched title
+    assert processor.scheduler.sent == 5
+    assert stub.queries[3:] == ['"India Story"', '"Juliet Story"']
+
+
+def test_unmatched_movies_are_rebatched(nyt):
+    stub = NYT(batch_hits=TITLES[:6])
+    processor = nyt(stub)
+
+    processor.process_movies()
+
+    assert stub.queries[3] == '"Golf Story" OR "Hotel Story"'
+    assert processor.scheduler.sent == len(TITLES)
+    assert set(journaled(processor)) >= {f'tt{i:07d}' for i in range(1, 7)}
+
+
+def test_exhausted_batch_journals_every_movie(nyt):
+    processor = nyt(NYT(batch_hits=TITLES[:5], full_pages=False))
+
+    processor.process_movies()
+
+    records = journaled(processor)
+    assert processor.scheduler.sent == 1
+    # The results ran out, so the unmatched movies have no reviews
+    assert len(records) == len(TITLES)
+    assert records['tt0000010'] == []
+    assert records['tt0000001'][0]['pub_date'] == '2010-07-16T00:00:00Z'
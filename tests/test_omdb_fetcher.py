@@ -0,0 +1,188 @@
+"""Tests for the rate-limited, retrying OMDb fetcher (scrapers/process_omdb_data.py)."""
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+import aiohttp
+import pytest
+
+import process_omdb_data
+from process_omdb_data import OMDbProcessor, OMDbStore, TokenBucket, backoff_delay
+
+
+def movie(imdb_id):
+    return {
+        'Response': 'True', 'imdbID': imdb_id, 'Title': f'Movie {imdb_id}', 'Year': '1999',
+        'Genre': 'Drama, Crime', 'Director': 'A Director', 'Actors': 'One, Two',
+        'Plot': 'A plot.', 'Poster': 'N/A',
+        'Ratings': [{'Source': 'Internet Movie Database', 'Value': '8.1/10'}]
+    }
+
+
+class OMDb:
+    """
+    Stub OMDb responder.
+
+    `script` maps an IMDb ID to the responses it gets before succeeding,
+    each a status code or a (status, headers, body) tuple.
+    """
+
+    def __init__(self, script=None):
+        self.script = defaultdict(list, script or {})
+        self.calls = defaultdict(int)
+
+    def __call__(self, request):
+        imdb_id = request.param('i')
+        attempt = self.calls[imdb_id]
+        self.calls[imdb_id] += 1
+        if attempt < len(self.script[imdb_id]):
+            response = self.script[imdb_id][attempt]
+            if isinstance(response, int):
+                return response, {'Content-Type': 'text/plain'}, b'error'
+            return response
+        return 200, {'Content-Type': 'application/json'}, json.dumps(movie(imdb_id)).encode()
+
+
+@pytest.fixture
+def omdb(stub_server, monkeypatch):
+    """Start a stub OMDb and point the fetcher at it, with short backoffs."""
+    def start(responder):
+        server = stub_server(responder)
+        monkeypatch.setattr(process_omdb_data, 'API_BASE_URL', server.url + '/')
+        return server
+
+    monkeypatch.setattr(process_omdb_data, 'API_KEY', 'test-key')
+    monkeypatch.setattr(process_omdb_data, 'BACKOFF_BASE', 0.01)
+    return start
+
+
+@pytest.fixture
+def processor(tmp_path):
+    return OMDbProcessor(
+        input_file=str(tmp_path / 'imdb_movies.json'),
+        output_file=str(tmp_path / 'omdb_movies.json'),
+        rate_limit=1000, burst=10, concurrency=4, max_retries=3,
+        store=OMDbStore(str(tmp_path / 'omdb_store.jsonl'))
+    )
+
+
+def fetch(processor, imdb_id, rate=1000, burst=10):
+    """Fetch one ID through a fresh session and bucket."""
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return await processor.fetch_movie_data(session, TokenBucket(rate, burst), imdb_id)
+    return asyncio.run(run())
+
+
+def test_token_bucket_paces_after_burst():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=5)
+        started = time.monotonic()
+        for _ in range(15):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # The first 5 tokens are free; the next 10 arrive at 50 per second
+    elapsed = asyncio.run(run())
+    assert 0.18 <= elapsed < 0.5
+
+
+def test_backoff_delay_honours_retry_after():
+    assert backoff_delay(0, '3') == 3.0
+    assert backoff_delay(0, str(10 ** 6)) == process_omdb_data.BACKOFF_MAX
+    for attempt in range(5):
+        delay = backoff_delay(attempt)
+        assert 0 <= delay <= min(process_omdb_data.BACKOFF_MAX, process_omdb_data.BACKOFF_BASE * 2 ** attempt)
+
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_retries_transient_statuses(omdb, processor, status):
+    stub = OMDb({'tt0000001': [status, status]})
+    omdb(stub)
+
+    data = fetch(processor, 'tt0000001')
+
+    assert data['imdbID'] == 'tt0000001'
+    assert stub.calls['tt0000001'] == 3
+
+
+def test_gives_up_after_max_retries(omdb, processor):
+    stub = OMDb({'tt0000001': [503] * 10})
+    omdb(stub)
+
+    assert fetch(processor, 'tt0000001') is None
+    assert stub.calls['tt0000001'] == processor.max_retries + 1
+
+
+def test_retry_after_overrides_backoff(omdb, processor, monkeypatch):
+    monkeypatch.setattr(process_omdb_data, 'BACKOFF_BASE', 30)
+    throttled = (429, {'Retry-After': '0', 'Content-Type': 'text/plain'}, b'slow down')
+    stub = OMDb({'tt0000001': [throttled, throttled]})
+    omdb(stub)
+
+    started = time.monotonic()
+    data = fetch(processor, 'tt0000001')
+
+    assert data['Response'] == 'True'
+    assert time.monotonic() - started < 5
+
+
+def test_client_errors_are_not_retried(omdb, processor):
+    stub = OMDb({'tt0000001': [404]})
+    omdb(stub)
+
+    assert fetch(processor, 'tt0000001') is None
+    assert stub.calls['tt0000001'] == 1
+
+
+def test_invalid_key_halts(omdb, processor):
+    omdb(OMDb({'tt0000001': [401]}))
+
+    with pytest.raises(ValueError, match='401'):
+        fetch(processor, 'tt0000001')
+
+
+def test_fetch_all_isolates_bad_responses(omdb, processor):
+    html = (200, {'Content-Type': 'text/html'}, b'<html>Server error</html>')
+    not_found = (200, {'Content-Type': 'application/json'},
+                 json.dumps({'Response': 'False', 'Error': 'Incorrect IMDb ID.'}).encode())
+    bad_rating = movie('tt0000004')
+    bad_rating['Ratings'] = [{'Source': 'Internet Movie Database', 'Value': 'N/A'}]
+    stub = OMDb({
+        'tt0000002': [html],
+        'tt0000003': [not_found],
+        'tt0000004': [(200, {'Content-Type': 'application/json'}, json.dumps(bad_rating).encode())],
+        'tt0000005': [429, 500],
+    })
+    omdb(stub)
+    ids = [f'tt{i:07d}' for i in range(1, 9)]
+
+    asyncio.run(processor._fetch_all(ids))
+
+    entries = processor.store.entries
+    # The undecodable and unformattable responses are left for the next run
+    assert 'tt0000002' not in entries
+    assert 'tt0000004' not in entries
+    assert entries['tt0000003']['document'] is None
+    for imdb_id in ['tt0000001', 'tt0000005', 'tt0000006', 'tt0000007', 'tt0000008']:
+        assert entries[imdb_id]['document']['imdb_id'] == imdb_id
+    assert entries['tt0000001']['document']['rating'] == 8.1
+    assert sum(stub.calls.values()) == len(ids) + 2
+
+
+def test_process_movies_skips_stored_ids(omdb, processor, tmp_path):
+    stub = OMDb()
+    omdb(stub)
+    ids = ['tt0000001', 'tt0000002', 'tt0000003']
+    with open(processor.input_file, 'w', encoding='utf-8') as f:
+        json.dump([{'tconst': imdb_id} for imdb_id in ids], f)
+    processor.store.put('tt0000002', processor._format_document(movie('tt0000002')))
+
+    processor.process_movies()
+
+    assert set(stub.calls) == {'tt0000001', 'tt0000003'}
+    assert [doc['imdb_id'] for doc in processor.enriched_movies] == ids
+    reloaded = OMDbStore(processor.store.path)
+    assert set(reloaded.entries) == set(ids)
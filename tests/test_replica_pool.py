@@ -0,0 +1,158 @@
+"""Tests for ReplicaPool failover and its circuit breaker (web/replica_pool.py)."""
+
+import json
+import time
+
+import pysolr
+import pytest
+
+from replica_pool import CLOSED, HALF_OPEN, OPEN, ReplicaPool
+
+
+def solr_response(status=200):
+    """Stub responder: an empty Solr select response, or a bare error status."""
+    def respond(request):
+        if status != 200:
+            return status, {'Content-Type': 'text/plain'}, b'error'
+        body = {
+            'responseHeader': {'status': 0, 'QTime': 1},
+            'response': {'numFound': 0, 'start': 0, 'docs': []}
+        }
+        return 200, {'Content-Type': 'application/json'}, json.dumps(body).encode()
+    return respond
+
+
+class Switchable:
+    """Responder whose status can be changed during a test."""
+
+    def __init__(self, status=200):
+        self.status = status
+
+    def __call__(self, request):
+        return solr_response(self.status)(request)
+
+
+def search(pool):
+    return pool.execute(lambda solr: solr.search(q='*:*', rows=0))
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(urls, **kwargs):
+        kwargs.setdefault('health_interval', 0)
+        pool = ReplicaPool(urls, timeout=5, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_fails_over_to_healthy_replica(stub_server, make_pool):
+    broken = stub_server(solr_response(500))
+    healthy = stub_server(solr_response())
+    pool = make_pool([broken.url, healthy.url], failure_threshold=3)
+
+    for _ in range(4):
+        search(pool)
+
+    broken_node, healthy_node = pool.nodes
+    assert healthy_node.total_failures == 0
+    assert broken_node.total_failures >= 1
+    assert len(healthy.requests) == 4
+
+
+def test_breaker_ejects_node_after_threshold(stub_server, make_pool):
+    broken = stub_server(solr_response(503))
+    healthy = stub_server(solr_response())
+    pool = make_pool([broken.url, healthy.url], failure_threshold=2, reset_timeout=60)
+
+    for _ in range(6):
+        search(pool)
+
+    broken_node = pool.nodes[0]
+    assert broken_node.state == OPEN
+    # No more requests reach the ejected node once its breaker is open
+    assert len(broken.requests) == 2
+
+
+def test_breaker_readmits_after_successful_trial(stub_server, make_pool):
+    flaky = Switchable(500)
+    first = stub_server(flaky)
+    second = stub_server(solr_response())
+    pool = make_pool([first.url, second.url], failure_threshold=1, reset_timeout=0.2)
+
+    search(pool)
+    node = pool.nodes[0]
+    if node.total_requests == 0:
+        search(pool)
+    assert node.state == OPEN
+
+    flaky.status = 200
+    time.sleep(0.25)
+    # The expired breaker lets one trial request through; it succeeds and closes
+    for _ in range(4):
+        search(pool)
+    assert node.state == CLOSED
+    assert node.consecutive_failures == 0
+
+
+def test_failed_trial_reopens_breaker(stub_server, make_pool):
+    broken = stub_server(solr_response(500))
+    pool = make_pool([broken.url], failure_threshold=1, reset_timeout=0.1)
+
+    with pytest.raises(pysolr.SolrError):
+        search(pool)
+    node = pool.nodes[0]
+    assert node.state == OPEN
+
+    # Before the reset timeout, nothing is sent
+    with pytest.raises(pysolr.SolrError, match="No healthy Solr replicas"):
+        search(pool)
+    assert len(broken.requests) == 1
+
+    time.sleep(0.15)
+    with pytest.raises(pysolr.SolrError):
+        search(pool)
+    assert len(broken.requests) == 2
+    assert node.state == OPEN
+
+
+def test_health_check_readmits_recovered_node(stub_server, make_pool):
+    flaky = Switchable(500)
+    server = stub_server(flaky)
+    pool = make_pool([server.url], failure_threshold=1, reset_timeout=60)
+
+    with pytest.raises(pysolr.SolrError):
+        search(pool)
+    assert pool.nodes[0].state == OPEN
+
+    flaky.status = 200
+    pool.check_health()
+    assert pool.nodes[0].state == CLOSED
+    search(pool)
+
+
+def test_query_errors_do_not_trip_breaker(stub_server, make_pool):
+    bad_query = stub_server(solr_response(400))
+    pool = make_pool([bad_query.url], failure_threshold=1)
+
+    with pytest.raises(pysolr.SolrError):
+        search(pool)
+    node = pool.nodes[0]
+    assert node.state == CLOSED
+    assert node.total_failures == 0
+
+
+def test_status_reports_every_node(stub_server, make_pool):
+    servers = [stub_server(solr_response()) for _ in range(2)]
+    pool = make_pool([s.url for s in servers])
+    search(pool)
+
+    status = pool.status()
+    assert [s['url'] for s in status] == [s.url for s in servers]
+    assert sum(s['total_requests'] for s in status) == 1
+    assert all(s['state'] in (CLOSED, HALF_OPEN, OPEN) for s in status)
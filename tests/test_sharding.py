@@ -0,0 +1,129 @@
+"""Tests for scatter-gather queries across shards (web/sharding.py)."""
+
+import json
+from collections import Counter
+
+import pytest
+
+from sharding import merge_responses, shard_for_id, shard_params, split_documents
+from solr_client import SolrClient
+
+
+DOCS = [
+    {'id': f'tt{i:07d}', 'title': f'Movie {i}', 'rating': (i * 37) % 100 / 10,
+     'genres': ['Drama'] if i % 3 else ['Drama', 'Comedy'] if i % 2 else ['Horror']}
+    for i in range(1, 31)
+]
+
+
+def solr_shard(docs):
+    """Stub responder for /select over docs: rating sort, paging and genre facets."""
+    def respond(request):
+        ranked = list(docs)
+        if request.param('sort') == 'rating desc':
+            ranked.sort(key=lambda doc: -doc['rating'])
+        start = int(request.param('start', '0'))
+        rows = int(request.param('rows', '10'))
+        body = {
+            'responseHeader': {'status': 0, 'QTime': 1},
+            'response': {'numFound': len(docs), 'start': start, 'docs': ranked[start:start + rows]}
+        }
+        if request.param('facet') == 'true':
+            limit = int(request.param('facet.limit', '100'))
+            counts = Counter(g for doc in docs for g in doc['genres'])
+            top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            body['facet_counts'] = {'facet_fields': {'genres': [x for pair in top for x in pair]}}
+        return 200, {'Content-Type': 'application/json'}, json.dumps(body).encode()
+    return respond
+
+
+def failing_shard(request):
+    return 500, {'Content-Type': 'text/plain'}, b'error'
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(shards):
+        client = SolrClient(shards=shards, health_interval=0)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        for pool in client.pools:
+            pool.close()
+
+
+def test_split_documents_routes_by_id():
+    shards = split_documents(DOCS, 3)
+    assert sum(len(s) for s in shards) == len(DOCS)
+    for index, shard_docs in enumerate(shards):
+        assert all(shard_for_id(doc['id'], 3) == index for doc in shard_docs)
+
+
+def test_shard_params_requests_top_start_plus_rows():
+    params = {'q': '*:*', 'start': 20, 'rows': 10, 'sort': 'rating desc', 'fl': 'id,title',
+              'facet': 'true', 'facet.limit': 20}
+    shard = shard_params(params)
+    assert shard['start'] == 0
+    assert shard['rows'] == 30
+    assert shard['fl'] == 'id,title,rating'
+    assert shard['facet.limit'] == 40
+    # The client-level parameters are left untouched
+    assert params['start'] == 20
+
+
+def test_merge_responses_pages_and_sums_facets():
+    shard_a = {'response': {'numFound': 3, 'docs': [
+        {'id': 'a1', 'rating': 9.0}, {'id': 'a2', 'rating': 5.0}, {'id': 'a3'}
+    ]}, 'facet_counts': {'facet_fields': {'genres': ['Drama', 2, 'Horror', 1]}}}
+    shard_b = {'response': {'numFound': 2, 'docs': [
+        {'id': 'b1', 'rating': 7.0}, {'id': 'b2', 'rating': 5.0}
+    ]}, 'facet_counts': {'facet_fields': {'genres': ['Drama', 1, 'Comedy', 1]}}}
+    params = {'start': 1, 'rows': 3, 'sort': 'rating desc', 'facet': 'true', 'facet.limit': 2}
+
+    merged = merge_responses([shard_a, shard_b], params)
+
+    # Ties keep shard order; documents missing the sort field go last
+    assert [d['id'] for d in merged['response']['docs']] == ['b1', 'a2', 'b2']
+    assert merged['response']['numFound'] == 5
+    assert merged['response']['start'] == 1
+    assert merged['facet_counts']['facet_fields']['genres'] == ['Drama', 3, 'Comedy', 1]
+    assert merged['responseHeader']['partialResults'] is False
+
+
+def test_search_merges_shards(stub_server, make_client):
+    shards = split_documents(DOCS, 2)
+    servers = [stub_server(solr_shard(docs)) for docs in shards]
+    client = make_client([s.url for s in servers])
+
+    result = client.search(sort='rating desc', start=3, rows=4, facets=['genres'])
+
+    expected = sorted(DOCS, key=lambda doc: -doc['rating'])[3:7]
+    assert [d['rating'] for d in result['docs']] == [d['rating'] for d in expected]
+    assert result['num_found'] == len(DOCS)
+    assert result['partial'] is False
+
+    for server in servers:
+        request = server.requests[-1]
+        assert request.param('start') == '0'
+        assert request.param('rows') == '7'
+
+    genres = Counter(g for doc in DOCS for g in doc['genres'])
+    assert {f['value']: f['count'] for f in result['facets']['genres']} == dict(genres)
+
+
+def test_search_marks_partial_when_a_shard_fails(stub_server, make_client):
+    shards = split_documents(DOCS, 2)
+    healthy = stub_server(solr_shard(shards[0]))
+    broken = stub_server(failing_shard)
+    client = make_client([healthy.url, broken.url])
+
+    result = client.search(sort='rating desc', rows=5)
+
+    assert 'error' not in result
+    assert result['partial'] is True
+    assert result['num_found'] == len(shards[0])
+    assert {d['id'] for d in result['docs']} <= {d['id'] for d in shards[0]}
@@ -3,26 +3,370 @@ Flask web application for Movie Information Retrieval System.
 Provides search interface with faceting and More Like This features.
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import (
+    Flask, Response, render_template, request, jsonify, g, abort,
+    send_from_directory, before_render_template, template_rendered
+)
+from contextlib import contextmanager
+from markupsafe import Markup
+from functools import wraps
 from solr_client import SolrClient
+from bulkhead import BulkheadRegistry
+from metrics import REGISTRY, Counter, Gauge, Histogram
+from slow_query_log import SlowQueryLogger, DEFAULT_LOG_PATH
+from profiler import RequestProfiler
+from http_cache import etag_cached, mark_uncacheable
+from fragment_cache import FragmentCache
+from batch_search import BatchSearcher
+from id_filter import DocIdFilter
+from rescoring import Rescorer
+from latency_budget import (
+    Deadline, DegradationPolicy, ResultCache, dropped_features,
+    FULL, NO_FACETS, CACHED, PARTIAL
+)
+import json
 import os
+import re
+import time
 
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'movie-ir-system-secret-key-change-in-production'
 
-# Initialize Solr client
-solr_client = SolrClient()
+# Initialize Solr client (SOLR_URLS may list several comma-separated replicas)
+SOLR_URLS = [
+    url.strip()
+    for url in os.environ.get('SOLR_URLS', 'http://localhost:8983/solr/movies').split(',')
+    if url.strip()
+]
+# SOLR_SHARDS splits the collection across cores: shards are separated by
+# ';' and each lists its comma-separated replicas. Overrides SOLR_URLS.
+SOLR_SHARDS = [
+    [url.strip() for url in shard.split(',') if url.strip()]
+    for shard in os.environ.get('SOLR_SHARDS', '').split(';')
+    if shard.strip()
+]
+# Slow-query log, enabled by setting SLOW_QUERY_THRESHOLD_MS
+slow_query_logger = None
+if os.environ.get('SLOW_QUERY_THRESHOLD_MS'):
+    slow_query_logger = SlowQueryLogger(
+        path=os.environ.get('SLOW_QUERY_LOG', DEFAULT_LOG_PATH),
+        threshold=float(os.environ['SLOW_QUERY_THRESHOLD_MS']) / 1000.0,
+        sample_rate=float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', 1.0)),
+        max_per_minute=int(os.environ.get('SLOW_QUERY_MAX_PER_MINUTE', 30))
+    )
+
+# Separate NYT articles collection searched alongside movies (optional)
+NYT_ARTICLES_URL = os.environ.get('NYT_ARTICLES_URL')
+
+solr_client = SolrClient(
+    SOLR_URLS,
+    slow_query_logger=slow_query_logger,
+    shards=SOLR_SHARDS or None,
+    articles_url=NYT_ARTICLES_URL
+)
 
 # Results per page
 RESULTS_PER_PAGE = 10
 
+# Two-phase ranking of relevance-sorted /search pages: the top
+# RESCORE_WINDOW candidates are reordered by a blend of relevance, rating,
+# popularity and recency (RESCORE_WEIGHTS, JSON). 0 disables it.
+RESCORE_WINDOW = int(os.environ.get('RESCORE_WINDOW', 200))
+search_rescorer = None
+if RESCORE_WINDOW > 0:
+    search_rescorer = Rescorer(
+        window=RESCORE_WINDOW,
+        weights=json.loads(os.environ.get('RESCORE_WEIGHTS', '{}'))
+    )
+
+# Latency budget for /search in seconds; an upstream X-Request-Budget-Ms
+# header can only tighten it
+SEARCH_BUDGET_SECONDS = float(os.environ.get('SEARCH_BUDGET_SECONDS', 2.0))
+
+# Per-route concurrency limits. /search may use the reserved slots so an
+# autocomplete storm cannot starve it. BULKHEAD_LIMITS (JSON) overrides
+# individual route settings, e.g. '{"autocomplete": {"max_concurrent": 4}}'.
+TOTAL_CONCURRENCY = int(os.environ.get('TOTAL_CONCURRENCY', 32))
+RESERVED_FOR_SEARCH = int(os.environ.get('RESERVED_FOR_SEARCH', 8))
+BULKHEAD_LIMITS = {
+    'search': {'max_concurrent': 24, 'max_queue': 32, 'queue_timeout': 1.0,
+               'priority': True, 'reject_status': 503, 'retry_after': 2},
+    'similar': {'max_concurrent': 8, 'max_queue': 16, 'queue_timeout': 1.0,
+                'reject_status': 503, 'retry_after': 2},
+    'autocomplete': {'max_concurrent': 8, 'max_queue': 8, 'queue_timeout': 0.1,
+                     'reject_status': 429, 'retry_after': 1},
+    'batch': {'max_concurrent': 4, 'max_queue': 4, 'queue_timeout': 0.5,
+              'reject_status': 429, 'retry_after': 2},
+}
+for route, overrides in json.loads(os.environ.get('BULKHEAD_LIMITS', '{}')).items():
+    BULKHEAD_LIMITS.setdefault(route, {}).update(overrides)
+
+bulkheads = BulkheadRegistry(TOTAL_CONCURRENCY, RESERVED_FOR_SEARCH)
+for route, limits in BULKHEAD_LIMITS.items():
+    bulkheads.add(route, **limits)
+
+Gauge(
+    'bulkhead_queue_depth', 'Requests waiting for a bulkhead slot', ['route']
+).set_function(lambda: {
+    (name,): b['queue_depth'] for name, b in bulkheads.stats()['routes'].items()
+})
+Counter(
+    'bulkhead_shed_total', 'Requests rejected by a bulkhead', ['route']
+).set_function(lambda: {
+    (name,): b['shed'] for name, b in bulkheads.stats()['routes'].items()
+})
+
+# Batch search API: Solr queries in flight across all batches, specs per
+# batch, rows and start offset per spec and the time budget for a whole batch
+batch_searcher = BatchSearcher(
+    solr_client,
+    max_workers=int(os.environ.get('BATCH_WORKERS', 8)),
+    max_queries=int(os.environ.get('BATCH_MAX_QUERIES', 50)),
+    max_rows=int(os.environ.get('BATCH_MAX_ROWS', 100)),
+    max_start=int(os.environ.get('BATCH_MAX_START', 10000))
+)
+BATCH_TIMEOUT_SECONDS = float(os.environ.get('BATCH_TIMEOUT_SECONDS', 5.0))
+
+# Browser and shared-cache lifetimes (seconds) for ETag-cached routes;
+# ETags change with the index version, so revalidation is always cheap
+HTTP_CACHE = {
+    'search': {'max_age': 60, 's_maxage': 300},
+    'similar': {'max_age': 300, 's_maxage': 3600},
+    'stats': {'max_age': 10, 's_maxage': 30},
+    'autocomplete': {'max_age': 300, 's_maxage': 3600},
+}
+
+degradation_policy = DegradationPolicy()
+search_result_cache = ResultCache(max_entries=256)
+
+# Rendered HTML of result cards (keyed by doc ID, index version and
+# highlight terms) and of the facet sidebar (keyed by facet state)
+movie_card_cache = FragmentCache('movie_cards', max_bytes=16 * 1024 * 1024)
+facet_sidebar_cache = FragmentCache('facet_sidebar', max_bytes=4 * 1024 * 1024)
+FRAGMENT_CACHES = [movie_card_cache, facet_sidebar_cache]
+
+# Caches reported on /metrics
+CACHES = {
+    'search_results': search_result_cache,
+    'movie_cards': movie_card_cache,
+    'facet_sidebar': facet_sidebar_cache,
+}
+
+HIGHLIGHT_TERM_RE = re.compile(r'<mark>(.*?)</mark>')
+
+# Bloom filter of indexed IDs so /similar can 404 unknown IDs without Solr
+doc_id_filter = DocIdFilter(
+    solr_client.index_version,
+    solr_client.iter_ids,
+    lambda: solr_client.stats()['total_docs'],
+    error_rate=float(os.environ.get('ID_FILTER_ERROR_RATE', 0.01)),
+    negative_ttl=float(os.environ.get('ID_FILTER_NEGATIVE_TTL', 60.0))
+)
+
+# Request profiling, enabled by setting PROFILE_DIR. Requests opt in with an
+# X-Profile header ('stack' or 'cprofile') or by PROFILE_SAMPLE_RATE sampling.
+request_profiler = None
+if os.environ.get('PROFILE_DIR'):
+    request_profiler = RequestProfiler(
+        os.environ['PROFILE_DIR'],
+        sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0)),
+        default_mode=os.environ.get('PROFILE_MODE', 'stack'),
+        token=os.environ.get('PROFILE_TOKEN')
+    )
+
+# Endpoints never profiled
+UNPROFILED_ENDPOINTS = {'static', 'metrics', 'profiles', 'profile_file'}
+
+# Metrics exported on /metrics
+REQUEST_SECONDS = Histogram(
+    'http_request_seconds', 'Total time spent handling requests', ['route', 'status']
+)
+REQUEST_PHASE_SECONDS = Histogram(
+    'http_request_phase_seconds',
+    'Request time broken down into solr, postprocess and render phases',
+    ['route', 'phase']
+)
+Counter(
+    'solr_coalesced_requests_total', 'Solr requests served by an identical in-flight request'
+).set_function(lambda: solr_client.coalescing_stats()['coalesced'])
+Counter(
+    'search_degradation_total', 'Search responses served at each degradation level', ['level']
+).set_function(lambda: {(level,): n for level, n in degradation_policy.stats()['counts'].items()})
+Counter(
+    'cache_requests_total', 'Cache lookups by result', ['cache', 'result']
+).set_function(lambda: {
+    key: value
+    for name, cache in CACHES.items()
+    for key, value in (((name, 'hit'), cache.hits), ((name, 'miss'), cache.misses))
+})
+Gauge(
+    'cache_hit_ratio', 'Fraction of cache lookups that were hits', ['cache']
+).set_function(lambda: {
+    (name,): cache.hits / max(1, cache.hits + cache.misses) for name, cache in CACHES.items()
+})
+Gauge(
+    'cache_entries', 'Entries currently held in each cache', ['cache']
+).set_function(lambda: {(name,): len(cache) for name, cache in CACHES.items()})
+Gauge(
+    'fragment_cache_bytes', 'Bytes of rendered HTML held in each fragment cache', ['cache']
+).set_function(lambda: {(c.name,): c.stats()['bytes'] for c in FRAGMENT_CACHES})
+Counter(
+    'id_filter_rejections_total', 'Lookups of unknown IDs answered without Solr', ['source']
+).set_function(lambda: {
+    ('bloom',): doc_id_filter.rejected_bloom,
+    ('negative_cache',): doc_id_filter.rejected_negative
+})
+Counter(
+    'id_filter_false_positives_total', 'Unknown IDs that passed the Bloom filter'
+).set_function(lambda: doc_id_filter.false_positives)
+Gauge(
+    'id_filter_bytes', 'Memory used by the Bloom filter of indexed IDs'
+).set_function(lambda: doc_id_filter.stats()['memory_bytes'])
+Counter(
+    'fragment_render_seconds_total', 'Time spent rendering fragment cache misses', ['cache']
+).set_function(lambda: {(c.name,): c.render_seconds for c in FRAGMENT_CACHES})
+
+
+def request_deadline(default_budget: float) -> Deadline:
+    """Start the deadline for the current request."""
+    budget = default_budget
+    header = request.headers.get('X-Request-Budget-Ms')
+    if header:
+        try:
+            budget = min(budget, float(header) / 1000.0)
+        except ValueError:
+            pass
+    return Deadline(budget)
+
+
+@contextmanager
+def request_phase(phase: str):
+    """Attribute the time spent in a with-block to a phase of this request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.phases[phase] = g.phases.get(phase, 0.0) + time.perf_counter() - started
+
+
+@app.before_request
+def start_request_timer():
+    """Start timing the request."""
+    g.request_started = time.perf_counter()
+    g.phases = {}
+
+
+@app.after_request
+def observe_request_time(response):
+    """Record total and per-phase request time."""
+    if 'request_started' not in g:
+        return response
+    route = request.endpoint or 'unmatched'
+    total = time.perf_counter() - g.request_started
+    REQUEST_SECONDS.labels(route, response.status_code).observe(total)
+    solr_time = g.phases.get('solr', 0.0)
+    render_time = g.phases.get('render', 0.0)
+    REQUEST_PHASE_SECONDS.labels(route, 'solr').observe(solr_time)
+    REQUEST_PHASE_SECONDS.labels(route, 'render').observe(render_time)
+    REQUEST_PHASE_SECONDS.labels(route, 'postprocess').observe(
+        max(0.0, total - solr_time - render_time)
+    )
+    return response
+
+
+@app.before_request
+def start_profiling():
+    """Start a profiler for requests selected by header or sampling."""
+    if request_profiler is None or request.endpoint in UNPROFILED_ENDPOINTS:
+        return
+    mode = request_profiler.select(request.headers)
+    if mode:
+        g.profile_session = request_profiler.start(mode)
+
+
+@app.after_request
+def stop_profiling(response):
+    """Write the profile of a profiled request."""
+    session = g.pop('profile_session', None)
+    if session is not None:
+        entry = request_profiler.finish(
+            session, request.endpoint or 'unmatched', request.full_path, response.status_code
+        )
+        response.headers['X-Profile-File'] = entry['file']
+    return response
+
+
+def _start_render_timer(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+
+def _stop_render_timer(sender, template, context, **extra):
+    if 'render_started' in g and 'phases' in g:
+        g.phases['render'] = (
+            g.phases.get('render', 0.0) + time.perf_counter() - g.pop('render_started')
+        )
+
+
+before_render_template.connect(_start_render_timer, app)
+template_rendered.connect(_stop_render_timer, app)
+
+
+def render_movie_card(movie: dict, index_version) -> Markup:
+    """Render a result card, reusing the cached HTML when possible."""
+    render = lambda: render_template('_movie_card.html', movie=movie)
+    if index_version is None:
+        return Markup(render())
+    terms = tuple(sorted({
+        term.lower() for term in HIGHLIGHT_TERM_RE.findall(movie.get('snippet') or '')
+    }))
+    return movie_card_cache.get_or_render((movie['id'], index_version, terms), render)
+
+
+def render_facet_sidebar(**state) -> Markup:
+    """Render the facet sidebar, reusing the cached HTML for the same facet state."""
+    key = json.dumps(state, sort_keys=True, default=str)
+    return facet_sidebar_cache.get_or_render(
+        key, lambda: render_template('_facet_sidebar.html', **state)
+    )
+
+
+def limit_concurrency(route: str):
+    """
+    Decorator running a view inside the named bulkhead.
+    
+    Requests that cannot get a slot are shed with the bulkhead's status
+    code and a Retry-After header.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not bulkheads.acquire(route):
+                bulkhead = bulkheads.bulkheads[route]
+                if request.path.startswith('/api/'):
+                    response = jsonify({'error': 'Server busy, please retry.'})
+                else:
+                    response = app.make_response(render_template(
+                        'error.html',
+                        message="The server is busy. Please try again in a moment."
+                    ))
+                response.status_code = bulkhead.reject_status
+                response.headers['Retry-After'] = str(bulkhead.retry_after)
+                return response
+            try:
+                return view(*args, **kwargs)
+            finally:
+                bulkheads.release(route)
+        return wrapper
+    return decorator
+
 
 @app.route('/')
 def index():
     """Home page with search form."""
     # Get available facet values for filters
-    genres = solr_client.get_facet_values('genres', limit=50)
+    with request_phase('solr'):
+        genres = solr_client.get_facet_values('genres', limit=50)
     
     return render_template(
         'index.html',
@@ -31,6 +375,8 @@ def index():
 
 
 @app.route('/search')
+@etag_cached(solr_client.index_version, **HTTP_CACHE['search'])
+@limit_concurrency('search')
 def search():
     """
     Search endpoint with faceting and filtering support.
@@ -44,6 +390,8 @@ def search():
         sort: Sort order
         page: Page number (default: 1)
     """
+    deadline = request_deadline(SEARCH_BUDGET_SECONDS)
+    
     # Get search parameters
     query = request.args.get('q', '*:*').strip()
     if not query:
@@ -78,16 +426,47 @@ def search():
     if not sort:
         sort = None  # Use Solr's default relevance ranking
     
-    # Perform search with faceting
-    results = solr_client.search(
-        query=query,
-        filters=filters,
-        facets=['genres', 'year'],
-        sort=sort,
-        start=start,
-        rows=RESULTS_PER_PAGE,
-        highlight=True
-    )
+    # Perform search with faceting, dropping highlighting and then facets
+    # when the remaining budget is not expected to cover them
+    cache_key = json.dumps([query, filters, sort, start], sort_keys=True)
+    level = degradation_policy.choose(deadline.remaining())
+    results = None
+    if level != CACHED:
+        solr_started = time.perf_counter()
+        with request_phase('solr'):
+            results = solr_client.federated_search(
+                query=query,
+                filters=filters,
+                facets=['genres', 'year'] if level != NO_FACETS else None,
+                sort=sort,
+                start=start,
+                rows=RESULTS_PER_PAGE,
+                highlight=level == FULL,
+                timeout=deadline.remaining(),
+                rescorer=search_rescorer
+            )
+        if 'error' in results:
+            results = None
+        else:
+            degradation_policy.observe(level, time.perf_counter() - solr_started)
+            if not results['partial']:
+                search_result_cache.put(
+                    cache_key, dict(results, docs=[dict(doc) for doc in results['docs']])
+                )
+    
+    # Out of budget or Solr failed: serve cached results, else an empty page
+    if results is None:
+        cached = search_result_cache.get(cache_key)
+        if cached is not None:
+            level = CACHED
+            results = dict(cached, docs=[dict(doc) for doc in cached['docs']])
+        else:
+            level = PARTIAL
+            results = {'docs': [], 'num_found': 0, 'facets': {}, 'highlighting': {}}
+    degradation_policy.record(level)
+    degraded = level != FULL or results.get('partial', False)
+    if degraded:
+        mark_uncacheable()
     
     # Calculate pagination
     total_results = results['num_found']
@@ -115,24 +494,43 @@ def search():
         
         docs_with_highlights.append(doc)
     
+    # Cached results may predate the current index, so their cards are not cached
+    index_version = solr_client.index_version() if level != CACHED else None
+    result_cards = [render_movie_card(doc, index_version) for doc in docs_with_highlights]
+    sidebar = render_facet_sidebar(
+        query=query,
+        facets=results.get('facets', {}),
+        selected_genres=selected_genres,
+        year_min=year_min,
+        year_max=year_max,
+        rating_min=rating_min,
+        sort=sort
+    )
+    
     return render_template(
         'results.html',
         query=query,
-        results=docs_with_highlights,
+        result_cards=result_cards,
+        sidebar=sidebar,
         total_results=total_results,
         page=page,
         total_pages=total_pages,
         results_per_page=RESULTS_PER_PAGE,
-        facets=results.get('facets', {}),
         selected_genres=selected_genres,
         year_min=year_min,
         year_max=year_max,
         rating_min=rating_min,
-        sort=sort
+        sort=sort,
+        degraded=degraded,
+        degradation_level=level,
+        dropped_features=dropped_features(level),
+        article_groups=results.get('article_groups', [])
     )
 
 
 @app.route('/similar/<doc_id>')
+@etag_cached(solr_client.index_version, **HTTP_CACHE['similar'])
+@limit_concurrency('similar')
 def similar_movies(doc_id):
     """
     Find and display similar movies using More Like This.
@@ -140,8 +538,11 @@ def similar_movies(doc_id):
     Args:
         doc_id: ID of the source movie
     """
-    # Get the source movie
-    source_movie = solr_client.get_by_id(doc_id)
+    # Get the source movie, skipping Solr for IDs known not to exist
+    source_movie = None
+    if doc_id_filter.might_exist(doc_id):
+        with request_phase('solr'):
+            source_movie = solr_client.get_by_id(doc_id, on_missing=doc_id_filter.record_missing)
     
     if not source_movie:
         return render_template(
@@ -150,7 +551,10 @@ def similar_movies(doc_id):
         ), 404
     
     # Get similar movies
-    similar = solr_client.more_like_this(doc_id, rows=10)
+    with request_phase('solr'):
+        similar = solr_client.more_like_this(doc_id, rows=10)
+    if 'error' in similar:
+        mark_uncacheable()
     
     return render_template(
         'similar.html',
@@ -161,13 +565,105 @@ def similar_movies(doc_id):
 
 
 @app.route('/api/stats')
+@etag_cached(solr_client.index_version, **HTTP_CACHE['stats'])
 def api_stats():
     """API endpoint for collection statistics."""
-    stats = solr_client.stats()
+    with request_phase('solr'):
+        stats = solr_client.stats()
+    stats.pop('replicas', None)
+    if stats['status'] == 'error':
+        mark_uncacheable()
+    else:
+        stats['index_version'] = solr_client.index_version()
     return jsonify(stats)
 
 
+@app.route('/api/runtime')
+def api_runtime():
+    """API endpoint for live runtime counters (never cached)."""
+    runtime = {
+        'replicas': solr_client.replica_status(),
+        'coalescing': solr_client.coalescing_stats(),
+        'degradation': degradation_policy.stats(),
+        'bulkheads': bulkheads.stats(),
+        'fragment_caches': {c.name: c.stats() for c in FRAGMENT_CACHES},
+        'id_filter': doc_id_filter.stats()
+    }
+    if slow_query_logger is not None:
+        runtime['slow_queries'] = slow_query_logger.stats()
+    response = jsonify(runtime)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics in text exposition format."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _check_profile_access():
+    """Abort unless profiling is enabled and the caller presents the token."""
+    if request_profiler is None:
+        abort(404)
+    if request_profiler.token:
+        supplied = request.headers.get('X-Profile-Token') or request.args.get('token')
+        if supplied != request_profiler.token:
+            abort(404)
+
+
+@app.route('/_profiles')
+def profiles():
+    """List the slowest profiled requests."""
+    _check_profile_access()
+    return render_template(
+        'profiles.html',
+        profiles=request_profiler.slowest(limit=100),
+        token=request.args.get('token')
+    )
+
+
+@app.route('/_profiles/<path:filename>')
+def profile_file(filename):
+    """Download a pstats or collapsed-stack profile."""
+    _check_profile_access()
+    return send_from_directory(
+        os.path.abspath(request_profiler.directory), filename, as_attachment=True
+    )
+
+
+@app.route('/api/search/batch', methods=['POST'])
+@limit_concurrency('batch')
+def api_search_batch():
+    """
+    API endpoint running many searches in one request.
+    
+    Request body:
+        {"queries": [{"query": "...", "filters": {...}, "sort": "rating desc",
+                      "start": 0, "rows": 10, "fields": ["id", "title"]}, ...]}
+    
+    Returns results in request order; failed items carry an "error" key.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Request body must be a JSON object.'}), 400
+    
+    started = time.perf_counter()
+    try:
+        with request_phase('solr'):
+            results = batch_searcher.run(payload.get('queries'), BATCH_TIMEOUT_SECONDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 1)
+    })
+
+
 @app.route('/api/autocomplete')
+@etag_cached(solr_client.index_version, **HTTP_CACHE['autocomplete'])
+@limit_concurrency('autocomplete')
 def api_autocomplete():
     """
     API endpoint for search query autocomplete.
@@ -178,10 +674,13 @@ def api_autocomplete():
         return jsonify([])
     
     # Search for titles starting with prefix
-    results = solr_client.search(
-        query=f'title:{prefix}*',
-        rows=10
-    )
+    with request_phase('solr'):
+        results = solr_client.search(
+            query=f'title:{prefix}*',
+            rows=10
+        )
+    if 'error' in results:
+        mark_uncacheable()
     
     suggestions = [
         {
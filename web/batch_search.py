@@ -0,0 +1,218 @@
+"""
+Batch execution of search queries.
+Validates a list of query specs and runs them concurrently against Solr
+on a bounded thread pool, reporting results and errors per item.
+"""
+
+import json
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Tuple
+
+from solr_client import SEARCH_FIELDS, SolrClient
+
+
+# Fields that may be filtered on, returned, and sorted by
+FILTER_FIELDS = {'genres', 'directors', 'cast', 'site', 'year', 'rating', 'num_reviews'}
+RETURN_FIELDS = set(SEARCH_FIELDS.split(',')) | {'score'}
+SORT_RE = re.compile(r'^(score|year|rating|num_reviews) (asc|desc)$')
+
+
+def _is_number(value: Any) -> bool:
+    # JSON numbers like 1e400 parse as inf, which Solr can't use
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _filter_value(field: str, value: Any) -> str:
+    """Validate one filter value; it must not be able to leave its quoted phrase."""
+    if _is_number(value):
+        return str(value)
+    if not isinstance(value, str):
+        raise ValueError(f"values of filter '{field}' must be strings or numbers")
+    if '"' in value or '\\' in value:
+        raise ValueError(f"values of filter '{field}' must not contain quotes or backslashes")
+    return value
+
+
+def _range_bound(field: str, value: Any) -> str:
+    """Validate a range bound: a number, or '*' for open-ended."""
+    if value == '*':
+        return value
+    if not _is_number(value):
+        raise ValueError(f"range bounds of filter '{field}' must be numbers")
+    return str(value)
+
+
+def parse_spec(spec: Any, max_rows: int, max_start: int = 10000) -> Dict:
+    """
+    Validate one query spec and convert it to SolrClient.search arguments.
+
+    Spec keys: query, filters, sort, start, rows, fields. Filter values may
+    be a string, a list of strings (OR) or {"min": x, "max": y} (range).
+
+    Args:
+        spec: Decoded JSON object
+        max_rows: Upper bound on rows
+        max_start: Upper bound on start (deep paging is expensive in Solr)
+
+    Returns:
+        Keyword arguments for SolrClient.search
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("query spec must be an object")
+
+    query = spec.get('query', '*:*')
+    if not isinstance(query, str):
+        raise ValueError("'query' must be a string")
+    query = query.strip() or '*:*'
+
+    raw_filters = spec.get('filters') or {}
+    if not isinstance(raw_filters, dict):
+        raise ValueError("'filters' must be an object")
+    filters = {}
+    for field, value in raw_filters.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"cannot filter on '{field}'")
+        if isinstance(value, dict):
+            filters[field] = (
+                _range_bound(field, value.get('min', '*')),
+                _range_bound(field, value.get('max', '*'))
+            )
+        elif isinstance(value, list):
+            filters[field] = [_filter_value(field, v) for v in value]
+        else:
+            filters[field] = _filter_value(field, value)
+
+    sort = spec.get('sort') or None
+    if sort is not None and (not isinstance(sort, str) or not SORT_RE.match(sort)):
+        raise ValueError(f"unsupported sort '{sort}'")
+
+    try:
+        start = int(spec.get('start', 0))
+        rows = int(spec.get('rows', 10))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("'start' and 'rows' must be integers")
+    if start < 0 or rows < 0:
+        raise ValueError("'start' and 'rows' must not be negative")
+    if rows > max_rows:
+        raise ValueError(f"'rows' must be at most {max_rows}")
+    if start > max_start:
+        raise ValueError(f"'start' must be at most {max_start}")
+
+    fields = spec.get('fields') or None
+    if fields is not None:
+        if not isinstance(fields, list) or not all(
+            isinstance(f, str) and f in RETURN_FIELDS for f in fields
+        ):
+            raise ValueError(f"'fields' must be a list drawn from {sorted(RETURN_FIELDS)}")
+        if 'id' not in fields:
+            fields = ['id'] + fields
+
+    return {
+        'query': query,
+        'filters': filters,
+        'sort': sort,
+        'start': start,
+        'rows': rows,
+        'fields': fields
+    }
+
+
+class BatchSearcher:
+    """Runs batches of searches concurrently on a bounded pool."""
+
+    def __init__(
+        self,
+        solr_client: SolrClient,
+        max_workers: int = 8,
+        max_queries: int = 50,
+        max_rows: int = 100,
+        max_start: int = 10000
+    ):
+        """
+        Initialize the searcher.
+
+        Args:
+            solr_client: Client used for every query
+            max_workers: Queries running at once, shared by all batches
+            max_queries: Maximum number of specs per batch
+            max_rows: Maximum rows per query
+            max_start: Maximum start offset per query
+        """
+        self.solr_client = solr_client
+        self.max_queries = max_queries
+        self.max_rows = max_rows
+        self.max_start = max_start
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch-search')
+
+    def run(self, specs: List[Any], timeout: float) -> List[Dict]:
+        """
+        Execute a batch.
+
+        Identical specs in the same batch are executed once.
+
+        Args:
+            specs: Query specs as decoded from JSON
+            timeout: Time budget for the whole batch in seconds
+
+        Returns:
+            One entry per spec, in order: {"num_found", "start", "docs"} on
+            success or {"error": message} on failure
+
+        Raises:
+            ValueError: If the batch itself is malformed or too large
+        """
+        if not isinstance(specs, list) or not specs:
+            raise ValueError("'queries' must be a non-empty list")
+        if len(specs) > self.max_queries:
+            raise ValueError(f"at most {self.max_queries} queries per batch")
+
+        deadline = time.monotonic() + timeout
+        results: List[Optional[Dict]] = [None] * len(specs)
+        pending: Dict[str, Tuple[Any, List[int]]] = {}
+
+        for i, spec in enumerate(specs):
+            try:
+                kwargs = parse_spec(spec, self.max_rows, self.max_start)
+            except ValueError as e:
+                results[i] = {'error': str(e)}
+                continue
+            key = json.dumps(kwargs, sort_keys=True, default=str)
+            if key in pending:
+                pending[key][1].append(i)
+            else:
+                future = self._executor.submit(self._search, kwargs, deadline)
+                pending[key] = (future, [i])
+
+        for future, indices in pending.values():
+            try:
+                item = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+                item = {'error': 'timed out'}
+            except Exception as e:
+                item = {'error': str(e)}
+            for i in indices:
+                results[i] = item
+        return results
+
+    def _search(self, kwargs: Dict, deadline: float) -> Dict:
+        """Run one query within the batch deadline and shape its compact result."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return {'error': 'timed out'}
+        response = self.solr_client.search(timeout=remaining, **kwargs)
+        if 'error' in response:
+            return {'error': response['error']}
+        return {
+            'num_found': response['num_found'],
+            'start': response['start'],
+            'docs': response['docs']
+        }
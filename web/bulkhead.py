@@ -0,0 +1,171 @@
+"""
+Per-route concurrency limits (bulkheads) with bounded queues.
+Each route gets its own concurrency cap and wait queue; a share of the
+total capacity is reserved for priority routes so that cheap, bursty
+traffic cannot starve them.
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+class Bulkhead:
+    """Concurrency cap and bounded wait queue for one route."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        priority: bool = False,
+        reject_status: int = 503,
+        retry_after: int = 1
+    ):
+        """
+        Initialize a bulkhead.
+
+        Args:
+            name: Route name
+            max_concurrent: Maximum requests running at once
+            max_queue: Maximum requests waiting for a slot
+            queue_timeout: Seconds a request may wait before being shed
+            priority: Whether the route may use the reserved capacity
+            reject_status: HTTP status for shed requests (429 or 503)
+            retry_after: Retry-After value in seconds for shed requests
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.priority = priority
+        self.reject_status = reject_status
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+
+    def to_dict(self) -> Dict:
+        """Describe the bulkhead for status reporting."""
+        return {
+            'active': self.active,
+            'queue_depth': self.waiting,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'priority': self.priority,
+            'admitted': self.admitted,
+            'shed': self.shed_queue_full + self.shed_timeout,
+            'shed_queue_full': self.shed_queue_full,
+            'shed_timeout': self.shed_timeout
+        }
+
+
+class BulkheadRegistry:
+    """Set of bulkheads sharing a total capacity."""
+
+    def __init__(self, total_capacity: int, reserved_for_priority: int = 0):
+        """
+        Initialize the registry.
+
+        Args:
+            total_capacity: Requests allowed to run at once across all routes
+            reserved_for_priority: Slots only priority routes may use
+        """
+        self.total_capacity = total_capacity
+        self.reserved_for_priority = reserved_for_priority
+        self.bulkheads: Dict[str, Bulkhead] = {}
+        self._active_total = 0
+        self._cond = threading.Condition()
+
+    def add(self, name: str, **limits) -> Bulkhead:
+        """
+        Register a bulkhead.
+
+        Args:
+            name: Route name
+            **limits: Keyword arguments for Bulkhead
+
+        Returns:
+            The new Bulkhead
+        """
+        bulkhead = Bulkhead(name, **limits)
+        self.bulkheads[name] = bulkhead
+        return bulkhead
+
+    def _can_run(self, bulkhead: Bulkhead) -> bool:
+        """Check (lock held) whether a request may start now."""
+        if bulkhead.active >= bulkhead.max_concurrent:
+            return False
+        if bulkhead.priority:
+            return self._active_total < self.total_capacity
+        # Non-priority routes leave the reserve free and never overtake
+        # queued priority requests
+        if any(b.priority and b.waiting for b in self.bulkheads.values()):
+            return False
+        return self._active_total < self.total_capacity - self.reserved_for_priority
+
+    def acquire(self, name: str) -> bool:
+        """
+        Take a slot for a request, waiting in the route's queue if needed.
+
+        Args:
+            name: Route name
+
+        Returns:
+            True if the request may run, False if it was shed
+        """
+        bulkhead = self.bulkheads[name]
+        with self._cond:
+            if not self._can_run(bulkhead):
+                if bulkhead.waiting >= bulkhead.max_queue:
+                    bulkhead.shed_queue_full += 1
+                    return False
+                bulkhead.waiting += 1
+                deadline = time.monotonic() + bulkhead.queue_timeout
+                try:
+                    while not self._can_run(bulkhead):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            bulkhead.shed_timeout += 1
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    bulkhead.waiting -= 1
+                    if bulkhead.priority:
+                        # Queued non-priority requests may be unblocked now
+                        self._cond.notify_all()
+            bulkhead.active += 1
+            bulkhead.admitted += 1
+            self._active_total += 1
+            return True
+
+    def release(self, name: str):
+        """
+        Return a slot taken by acquire().
+
+        Args:
+            name: Route name
+        """
+        bulkhead = self.bulkheads[name]
+        with self._cond:
+            bulkhead.active -= 1
+            self._active_total -= 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """
+        Get per-route queue depth and shed counts.
+
+        Returns:
+            Dictionary with total usage and per-route bulkhead state
+        """
+        with self._cond:
+            return {
+                'total_capacity': self.total_capacity,
+                'reserved_for_priority': self.reserved_for_priority,
+                'active': self._active_total,
+                'routes': {name: b.to_dict() for name, b in self.bulkheads.items()}
+            }
@@ -0,0 +1,99 @@
+"""
+Cache of rendered template fragments.
+Holds rendered HTML (e.g. movie result cards and the facet sidebar) in a
+byte-bounded LRU so identical fragments are not re-rendered by Jinja on
+every request.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """Byte-bounded LRU cache of rendered HTML fragments."""
+
+    def __init__(self, name: str, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Cache name used in reports
+            max_bytes: Upper bound on the total size of cached fragments
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.render_seconds = 0.0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> Markup:
+        """
+        Return the cached fragment for key, rendering it on a miss.
+
+        Args:
+            key: Hashable identity of everything the fragment depends on
+            render: Zero-argument callable producing the HTML
+
+        Returns:
+            Rendered fragment as safe Markup
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        started = time.perf_counter()
+        fragment = Markup(render())
+        elapsed = time.perf_counter() - started
+
+        # Entries keep their encoded size, so accounting is in bytes
+        size = len(fragment.encode('utf-8'))
+        with self._lock:
+            self.render_seconds += elapsed
+            if size > self.max_bytes:
+                return fragment
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (fragment, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+        return fragment
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with entries, bytes, hits, misses, evictions and the
+            time spent rendering misses
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'render_seconds': self.render_seconds
+            }
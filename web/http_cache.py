@@ -0,0 +1,105 @@
+"""
+HTTP-level response caching.
+ETags are derived from the Solr index version plus the normalized request
+parameters, so conditional requests can be answered with 304 Not Modified
+before any Solr query or template rendering happens. Cache-Control headers
+let a fronting reverse proxy or CDN serve repeat traffic.
+"""
+
+import hashlib
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, g, request
+
+from metrics import Counter
+
+
+CONDITIONAL_REQUESTS = Counter(
+    'http_conditional_requests_total',
+    'Responses of ETag-cached routes by outcome',
+    ['route', 'result']
+)
+
+
+def compute_etag(index_version: str, path: str, args) -> str:
+    """
+    Build an ETag from the index version and normalized request parameters.
+
+    Parameter order, surrounding whitespace and empty values do not change
+    the tag.
+
+    Args:
+        index_version: Current Solr index version
+        path: Request path
+        args: Request query arguments (a MultiDict)
+
+    Returns:
+        Opaque ETag value (without quotes)
+    """
+    params = sorted(
+        (key, value.strip())
+        for key, value in args.items(multi=True)
+        if value.strip()
+    )
+    digest = hashlib.sha1()
+    digest.update(index_version.encode('utf-8'))
+    digest.update(path.encode('utf-8'))
+    for key, value in params:
+        digest.update(b'\0' + key.encode('utf-8') + b'=' + value.encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def mark_uncacheable():
+    """Prevent the current response from being cached (e.g. degraded results)."""
+    g.no_store = True
+
+
+def etag_cached(
+    version_fn: Callable[[], Optional[str]],
+    max_age: int = 60,
+    s_maxage: Optional[int] = None
+):
+    """
+    Decorator adding index-version ETags and Cache-Control to a view.
+
+    Args:
+        version_fn: Returns the current index version, or None if unknown
+        max_age: Seconds browsers may reuse the response
+        s_maxage: Seconds shared caches (proxies, CDNs) may reuse it
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_fn()
+            if version is None:
+                # Without a version there is nothing safe to validate against
+                return view(*args, **kwargs)
+
+            etag = compute_etag(version, request.path, request.args)
+            route = request.endpoint or 'unmatched'
+
+            if request.if_none_match.contains_weak(etag):
+                CONDITIONAL_REQUESTS.labels(route, 'not_modified').inc()
+                response = current_app.response_class(status=304)
+                _set_cache_headers(response, etag, max_age, s_maxage)
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if g.get('no_store'):
+                response.headers['Cache-Control'] = 'no-store'
+            elif response.status_code == 200:
+                CONDITIONAL_REQUESTS.labels(route, 'modified').inc()
+                _set_cache_headers(response, etag, max_age, s_maxage)
+            return response
+        return wrapper
+    return decorator
+
+
+def _set_cache_headers(response, etag: str, max_age: int, s_maxage: Optional[int]):
+    """Attach ETag and Cache-Control headers."""
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if s_maxage is not None:
+        response.cache_control.s_maxage = s_maxage
@@ -0,0 +1,241 @@
+"""
+Negative lookups for document IDs.
+A Bloom filter of every indexed ID, rebuilt in the background whenever the
+index version changes, lets lookups of IDs that are definitely not indexed
+(crawlers, stale links) be rejected without a Solr query. A short-TTL
+negative cache catches repeated misses that pass the filter.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Initialize an empty filter.
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false-positive rate at capacity
+        """
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Bit positions of an item (Kirsch-Mitzenmacher double hashing)."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """Add an item."""
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the bit array."""
+        return len(self._bits)
+
+    def expected_error_rate(self) -> float:
+        """False-positive rate predicted for the items added so far."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class NegativeCache:
+    """LRU set of recently missed keys, each expiring after a TTL."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a miss is remembered
+            max_entries: Upper bound on remembered misses
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: str):
+        """Remember a miss."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = time.monotonic() + self.ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            return True
+
+    def clear(self):
+        """Forget all misses."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DocIdFilter:
+    """Rejects lookups of IDs that are not in the current index."""
+
+    def __init__(
+        self,
+        version_fn: Callable[[], Optional[str]],
+        load_ids: Callable[[], Iterable[str]],
+        count_ids: Callable[[], int],
+        error_rate: float = 0.01,
+        negative_ttl: float = 60.0,
+        negative_max_entries: int = 10000
+    ):
+        """
+        Initialize the filter; it is built on first use.
+
+        Args:
+            version_fn: Returns the current index version, or None if unknown
+            load_ids: Yields every indexed document ID
+            count_ids: Returns the number of indexed documents
+            error_rate: Target Bloom filter false-positive rate
+            negative_ttl: Seconds a confirmed miss is remembered
+            negative_max_entries: Upper bound on remembered misses
+        """
+        self.version_fn = version_fn
+        self.load_ids = load_ids
+        self.count_ids = count_ids
+        self.error_rate = error_rate
+        self.negative = NegativeCache(negative_ttl, negative_max_entries)
+        self._bloom: Optional[BloomFilter] = None
+        self._version: Optional[str] = None
+        self._building: Optional[str] = None
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+        self.build_seconds = 0.0
+        self.checks = 0
+        self.rejected_bloom = 0
+        self.rejected_negative = 0
+        self.false_positives = 0
+
+    def might_exist(self, doc_id: str) -> bool:
+        """
+        Check whether an ID may be indexed.
+
+        Until a filter for the current index version is built every ID
+        passes, so newly indexed documents are never rejected.
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            False only if the ID is definitely not indexed
+        """
+        version = self.version_fn()
+        with self._lock:
+            self.checks += 1
+            current = version is not None and version == self._version
+            if version is not None and not current:
+                self._start_rebuild(version)
+            if current and doc_id not in self._bloom:
+                self.rejected_bloom += 1
+                return False
+        if doc_id in self.negative:
+            with self._lock:
+                self.rejected_negative += 1
+            return False
+        return True
+
+    def record_missing(self, doc_id: str):
+        """
+        Record that a lookup that passed might_exist() found nothing.
+
+        Args:
+            doc_id: Document ID
+        """
+        self.negative.add(doc_id)
+        with self._lock:
+            if self._bloom is not None and doc_id in self._bloom:
+                self.false_positives += 1
+
+    def _start_rebuild(self, version: str):
+        """Build the filter for a new index version in the background (lock held)."""
+        if self._building is not None or time.monotonic() - self._failed_at < 30.0:
+            return
+        self._building = version
+        threading.Thread(
+            target=self._rebuild, args=(version,), name='id-filter-build', daemon=True
+        ).start()
+
+    def _rebuild(self, version: str):
+        """Load all IDs into a new filter and swap it in."""
+        started = time.perf_counter()
+        try:
+            bloom = BloomFilter(self.count_ids(), self.error_rate)
+            for doc_id in self.load_ids():
+                bloom.add(str(doc_id))
+        except Exception as e:
+            print(f"ID filter build error: {e}")
+            with self._lock:
+                self._building = None
+                self._failed_at = time.monotonic()
+            return
+        with self._lock:
+            self._bloom = bloom
+            self._version = version
+            self._building = None
+            self.build_seconds = time.perf_counter() - started
+        # Misses may have been indexed since
+        self.negative.clear()
+
+    def stats(self) -> Dict:
+        """
+        Get filter counters.
+
+        The observed false-positive rate is the fraction of missing IDs that
+        passed the Bloom filter and cost a Solr query.
+
+        Returns:
+            Dictionary with size, memory, rejection and error-rate counters
+        """
+        with self._lock:
+            bloom = self._bloom
+            passed_missing = self.false_positives
+            missing = passed_missing + self.rejected_bloom
+            return {
+                'index_version': self._version,
+                'ids': bloom.count if bloom else 0,
+                'bits': bloom.num_bits if bloom else 0,
+                'hashes': bloom.num_hashes if bloom else 0,
+                'memory_bytes': bloom.memory_bytes if bloom else 0,
+                'expected_false_positive_rate': bloom.expected_error_rate() if bloom else 0.0,
+                'observed_false_positive_rate': passed_missing / missing if missing else 0.0,
+                'build_seconds': self.build_seconds,
+                'checks': self.checks,
+                'rejected_bloom': self.rejected_bloom,
+                'rejected_negative': self.rejected_negative,
+                'false_positives': self.false_positives,
+                'negative_entries': len(self.negative)
+            }
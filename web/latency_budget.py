@@ -0,0 +1,175 @@
+"""
+Latency budgets and graceful degradation for search requests.
+Tracks a per-request deadline, picks the richest search variant that is
+expected to fit in the remaining budget, and keeps a small cache of good
+responses to fall back on when Solr cannot answer in time.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+
+# Degradation levels, from richest to cheapest
+FULL = 'full'
+NO_HIGHLIGHT = 'no_highlight'
+NO_FACETS = 'no_facets'
+CACHED = 'cached'
+PARTIAL = 'partial'
+
+LEVELS = [FULL, NO_HIGHLIGHT, NO_FACETS, CACHED, PARTIAL]
+
+
+class Deadline:
+    """Absolute deadline for a single request."""
+
+    def __init__(self, budget: float):
+        """
+        Start a deadline.
+
+        Args:
+            budget: Time budget in seconds, starting now
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+
+class ResultCache:
+    """Bounded LRU cache of recent good responses."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DegradationPolicy:
+    """
+    Chooses a search variant from the remaining budget.
+
+    An exponentially weighted moving average of observed Solr latency is
+    kept for each live level; the richest level whose estimate fits in the
+    remaining budget is chosen. How often each level fires is counted.
+    """
+
+    def __init__(self, headroom: float = 1.5, alpha: float = 0.2, min_query_time: float = 0.05):
+        """
+        Initialize the policy.
+
+        Args:
+            headroom: Safety factor applied to latency estimates
+            alpha: Smoothing factor for the moving averages
+            min_query_time: Below this many seconds no live query is attempted
+        """
+        self.headroom = headroom
+        self.alpha = alpha
+        self.min_query_time = min_query_time
+        self._estimates: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {level: 0 for level in LEVELS}
+        self._lock = threading.Lock()
+
+    def choose(self, remaining: float) -> str:
+        """
+        Pick the richest live level expected to finish in time.
+
+        Args:
+            remaining: Seconds left in the request budget
+
+        Returns:
+            One of FULL, NO_HIGHLIGHT, NO_FACETS or CACHED
+        """
+        if remaining < self.min_query_time:
+            return CACHED
+        with self._lock:
+            for level in (FULL, NO_HIGHLIGHT):
+                estimate = self._estimates.get(level)
+                if estimate is None or estimate * self.headroom <= remaining:
+                    return level
+        return NO_FACETS
+
+    def observe(self, level: str, elapsed: float):
+        """
+        Record the Solr latency of a completed live query.
+
+        Richer levels are pulled down towards a fast cheap observation as
+        well, so they get retried once Solr recovers.
+
+        Args:
+            level: Level the query ran at
+            elapsed: Observed latency in seconds
+        """
+        with self._lock:
+            for other in LEVELS[:LEVELS.index(level) + 1]:
+                previous = self._estimates.get(other)
+                if other == level and previous is None:
+                    self._estimates[other] = elapsed
+                elif previous is not None and (other == level or previous > elapsed):
+                    self._estimates[other] = (1 - self.alpha) * previous + self.alpha * elapsed
+
+    def record(self, level: str):
+        """Count a response served at the given level."""
+        with self._lock:
+            self._counts[level] = self._counts.get(level, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get level counters and latency estimates.
+
+        Returns:
+            Dictionary with per-level counts and estimated latencies (seconds)
+        """
+        with self._lock:
+            return {
+                'counts': dict(self._counts),
+                'estimates': dict(self._estimates)
+            }
+
+
+def dropped_features(level: str) -> List[str]:
+    """
+    List the features dropped at a given level.
+
+    Args:
+        level: Degradation level
+
+    Returns:
+        Names of dropped features, e.g. ['highlighting', 'facets']
+    """
+    dropped = []
+    if level != FULL:
+        dropped.append('highlighting')
+    if level not in (FULL, NO_HIGHLIGHT):
+        dropped.append('facets')
+    return dropped
@@ -0,0 +1,269 @@
+"""
+Minimal Prometheus-style metrics.
+Provides counters, gauges and histograms with labels, and renders them in
+the Prometheus text exposition format for the /metrics endpoint.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from 1ms to 10s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the exposition format."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set, e.g. {route="search",phase="solr"}."""
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List['_Metric'] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: '_Metric'):
+        """Add a metric to the registry."""
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """
+        Render all metrics in text exposition format.
+
+        Returns:
+            Exposition text ending with a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for suffix, names, values, value in metric.samples():
+                lines.append(f'{metric.name}{suffix}{_format_labels(names, values)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    type = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._function: Optional[Callable] = None
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values, **kwargs):
+        """
+        Get the child metric for a label combination.
+
+        Args:
+            *values: Label values in labelnames order
+            **kwargs: Label values by name
+
+        Returns:
+            Child metric supporting the same operations as the parent
+        """
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def set_function(self, fn: Callable):
+        """
+        Compute samples on scrape instead of storing them.
+
+        Args:
+            fn: Callable returning a number, or for labelled metrics a
+                dictionary mapping label-value tuples to numbers
+        """
+        self._function = fn
+
+    def _default(self):
+        """Child for a metric without labels."""
+        return self.labels()
+
+    def samples(self):
+        """Yield (suffix, labelnames, labelvalues, value) tuples."""
+        if self._function is not None:
+            result = self._function()
+            if not self.labelnames:
+                result = {(): result}
+            for key, value in result.items():
+                key = key if isinstance(key, tuple) else (key,)
+                yield '', self.labelnames, tuple(str(k) for k in key), float(value)
+            return
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            for suffix, names, values, value in child.samples():
+                yield suffix, self.labelnames + names, key + values, value
+
+    def _new_child(self):
+        """Create the value held for one label combination."""
+        return _Value()
+
+
+class _Value:
+    """Thread-safe numeric value."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def samples(self):
+        yield '', (), (), self.value
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled counter."""
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type = 'gauge'
+
+    def set(self, value: float):
+        """Set the unlabelled gauge."""
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled gauge."""
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        """Decrement the unlabelled gauge."""
+        self._default().dec(amount)
+
+
+class _HistogramValue:
+    """Bucketed observations for one label combination."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with-block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self):
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            yield '_bucket', ('le',), (_format_value(bound),), cumulative
+        yield '_bucket', ('le',), ('+Inf',), count
+        yield '_sum', (), (), total
+        yield '_count', (), (), count
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional[Registry] = REGISTRY
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        """Record an observation on the unlabelled histogram."""
+        self._default().observe(value)
+
+    def time(self):
+        """Observe the duration of a with-block on the unlabelled histogram."""
+        return self._default().time()
@@ -0,0 +1,226 @@
+"""
+Opt-in request profiling.
+Selected requests (by header or by random sampling) are profiled either
+with cProfile or with a low-overhead stack sampler. Profiles are written to
+a directory as pstats files or collapsed stacks (the input format of
+flamegraph.pl and speedscope), and an in-memory index tracks the slowest
+profiled requests.
+"""
+
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional
+
+
+CPROFILE = 'cprofile'
+STACK = 'stack'
+MODES = (CPROFILE, STACK)
+
+
+class StackSampler:
+    """Periodically samples the call stack of one thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Initialize the sampler.
+
+        Args:
+            thread_id: Identifier of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """
+        Stop sampling.
+
+        Returns:
+            Counter mapping collapsed stacks (root first) to sample counts
+        """
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+
+class ProfileSession:
+    """Profiler state for one request."""
+
+    def __init__(self, mode: str, interval: float):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+        if mode == CPROFILE:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                self._profile = profile
+            except ValueError:
+                # Another profiler is active in this process; fall back
+                self.mode = STACK
+        if self.mode == STACK:
+            self._sampler = StackSampler(threading.get_ident(), interval)
+            self._sampler.start()
+
+    def stop(self, path_without_ext: str) -> str:
+        """
+        Stop profiling and write the profile.
+
+        Args:
+            path_without_ext: Output path without extension
+
+        Returns:
+            Path of the written file
+        """
+        if self._profile is not None:
+            self._profile.disable()
+            path = path_without_ext + '.pstats'
+            self._profile.dump_stats(path)
+            return path
+
+        stacks = self._sampler.stop()
+        path = path_without_ext + '.collapsed'
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        return path
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps an index of results."""
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        default_mode: str = STACK,
+        header: str = 'X-Profile',
+        token: Optional[str] = None,
+        interval: float = 0.005,
+        max_index: int = 500
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            directory: Directory profiles are written to
+            sample_rate: Fraction of requests profiled without a header
+            default_mode: Profiler used for sampled requests ('stack' or 'cprofile')
+            header: Request header that opts a request in; its value may name the mode
+            token: If set, the X-Profile-Token header must match for header opt-in
+            interval: Stack sampling interval in seconds
+            max_index: Number of profiled requests remembered in the index
+        """
+        if default_mode not in MODES:
+            raise ValueError(f"Unknown profiler mode: {default_mode}")
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.default_mode = default_mode
+        self.header = header
+        self.token = token
+        self.interval = interval
+        self.max_index = max_index
+        self._index: List[Dict] = []
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def select(self, headers: Mapping[str, str]) -> Optional[str]:
+        """
+        Decide whether to profile a request.
+
+        Args:
+            headers: Request headers
+
+        Returns:
+            Profiler mode to use, or None to skip profiling
+        """
+        requested = headers.get(self.header)
+        if requested:
+            if self.token and headers.get('X-Profile-Token') != self.token:
+                return None
+            requested = requested.strip().lower()
+            return requested if requested in MODES else self.default_mode
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.default_mode
+        return None
+
+    def start(self, mode: str) -> ProfileSession:
+        """Start profiling the current thread."""
+        return ProfileSession(mode, self.interval)
+
+    def finish(self, session: ProfileSession, endpoint: str, path: str, status: int) -> Dict:
+        """
+        Stop a session, write its profile and add it to the index.
+
+        Args:
+            session: Session returned by start()
+            endpoint: Flask endpoint name
+            path: Request path (with query string)
+            status: Response status code
+
+        Returns:
+            Index entry for the profiled request
+        """
+        duration = time.perf_counter() - session.started
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        safe_endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', endpoint)
+        base = os.path.join(
+            self.directory, f'{stamp}_{safe_endpoint}_{int(duration * 1000)}ms'
+        )
+        file_path = session.stop(base)
+        entry = {
+            'file': os.path.basename(file_path),
+            'mode': session.mode,
+            'endpoint': endpoint,
+            'path': path,
+            'status': status,
+            'duration_ms': round(duration * 1000, 1),
+            'timestamp': stamp
+        }
+        with self._lock:
+            self._index.append(entry)
+            if len(self._index) > self.max_index:
+                self._index.pop(0)
+        return entry
+
+    def slowest(self, limit: int = 50) -> List[Dict]:
+        """
+        Get the slowest profiled requests.
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            Index entries sorted by duration, slowest first
+        """
+        with self._lock:
+            entries = list(self._index)
+        return sorted(entries, key=lambda e: e['duration_ms'], reverse=True)[:limit]
@@ -0,0 +1,329 @@
+"""
+Replica-aware connection pool for Solr.
+Routes each request to the healthy replica with the fewest outstanding
+requests, ejects failing replicas with a circuit breaker and readmits them
+after periodic health pings succeed.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pysolr
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_HTTP_STATUS_RE = re.compile(r'\(HTTP (\d{3})\)')
+
+
+class _TimedDecoder:
+    """JSON decoder wrapper recording decode time in a thread-local."""
+
+    def __init__(self, decoder, local: threading.local):
+        self._decoder = decoder
+        self._local = local
+
+    def decode(self, text: str):
+        started = time.perf_counter()
+        try:
+            return self._decoder.decode(text)
+        finally:
+            self._local.decode_time = time.perf_counter() - started
+
+
+class _NodeSolr(pysolr.Solr):
+    """
+    pysolr.Solr whose timeout can be overridden per thread, and which
+    records transport and decode time of the calling thread's last request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._local = threading.local()
+        super().__init__(*args, **kwargs)
+        self.decoder = _TimedDecoder(self.decoder, self._local)
+
+    def _send_request(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super()._send_request(*args, **kwargs)
+        finally:
+            self._local.transport_time = time.perf_counter() - started
+
+    def request_timings(self) -> Dict[str, float]:
+        """
+        Get timings of the calling thread's last request.
+
+        Returns:
+            Dictionary with transport and decode time in seconds
+        """
+        return {
+            'transport': getattr(self._local, 'transport_time', 0.0),
+            'decode': getattr(self._local, 'decode_time', 0.0)
+        }
+
+    @property
+    def timeout(self):
+        return getattr(self._local, 'timeout', None) or self.default_timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.default_timeout = value
+
+
+def is_node_failure(error: Exception) -> bool:
+    """
+    Decide whether an error reflects a broken node rather than a bad query.
+
+    Connection errors, timeouts and HTTP 5xx responses count against the
+    node; HTTP 4xx responses (e.g. query syntax errors) do not.
+
+    Args:
+        error: Exception raised by pysolr
+
+    Returns:
+        True if the node should be charged with the failure
+    """
+    match = _HTTP_STATUS_RE.search(str(error))
+    if match:
+        return int(match.group(1)) >= 500
+    return True
+
+
+class SolrNode:
+    """A single Solr replica with its own pooled session and breaker state."""
+
+    def __init__(self, url: str, timeout: float = 10, pool_size: int = 10):
+        """
+        Initialize a replica.
+
+        Args:
+            url: URL of the Solr collection on this replica
+            timeout: Request timeout in seconds
+            pool_size: Maximum number of keep-alive connections to the node
+        """
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.solr = _NodeSolr(url, always_commit=True, timeout=timeout, session=self.session)
+
+        self.outstanding = 0
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Describe the node for status reporting."""
+        return {
+            'url': self.url,
+            'state': self.state,
+            'outstanding': self.outstanding,
+            'consecutive_failures': self.consecutive_failures,
+            'total_requests': self.total_requests,
+            'total_failures': self.total_failures,
+            'last_error': self.last_error
+        }
+
+
+class ReplicaPool:
+    """Least-outstanding-requests load balancer over Solr replicas."""
+
+    def __init__(
+        self,
+        urls: List[str],
+        timeout: float = 10,
+        pool_size: int = 10,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        health_interval: float = 10.0
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: URLs of the Solr collection on each replica
+            timeout: Request timeout in seconds
+            pool_size: Keep-alive connections per replica
+            failure_threshold: Consecutive failures before a node is ejected
+            reset_timeout: Seconds an ejected node waits before a trial request
+            health_interval: Seconds between health pings (0 disables them)
+        """
+        if not urls:
+            raise ValueError("At least one Solr URL is required")
+
+        self.nodes = [SolrNode(url, timeout, pool_size) for url in urls]
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.health_interval = health_interval
+        self._rotation = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+        if health_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name='solr-health', daemon=True
+            )
+            self._health_thread.start()
+
+    def _available(self, node: SolrNode, now: float) -> bool:
+        """Check (under lock) whether a node may receive a request."""
+        if node.state == CLOSED:
+            return True
+        # An ejected node gets a single trial request once its timeout expires
+        return node.state == OPEN and now - node.opened_at >= self.reset_timeout
+
+    def _acquire(self, exclude: List[SolrNode]) -> Optional[SolrNode]:
+        """Pick the available node with the fewest outstanding requests."""
+        now = time.monotonic()
+        with self._lock:
+            # Rotate the starting point so ties are broken round-robin
+            self._rotation = (self._rotation + 1) % len(self.nodes)
+            ordered = self.nodes[self._rotation:] + self.nodes[:self._rotation]
+            candidates = [
+                n for n in ordered
+                if n not in exclude and self._available(n, now)
+            ]
+            if not candidates:
+                return None
+            node = min(candidates, key=lambda n: n.outstanding)
+            if node.state == OPEN:
+                node.state = HALF_OPEN
+            node.outstanding += 1
+            node.total_requests += 1
+            return node
+
+    def _release(self, node: SolrNode, error: Optional[Exception] = None):
+        """Return a node to the pool and update its breaker."""
+        with self._lock:
+            node.outstanding -= 1
+            if error is None:
+                self._record_success(node)
+            else:
+                self._record_failure(node, error)
+
+    def _record_success(self, node: SolrNode):
+        """Close the breaker after a successful request (lock held)."""
+        node.consecutive_failures = 0
+        node.state = CLOSED
+
+    def _record_failure(self, node: SolrNode, error: Exception):
+        """Count a failure and eject the node if needed (lock held)."""
+        node.consecutive_failures += 1
+        node.total_failures += 1
+        node.last_error = str(error)
+        if node.state == HALF_OPEN or node.consecutive_failures >= self.failure_threshold:
+            node.state = OPEN
+            node.opened_at = time.monotonic()
+
+    def execute(self, fn: Callable[[pysolr.Solr], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a request against the best available replica.
+
+        Node failures are retried on the remaining replicas while the timeout
+        allows; query errors (HTTP 4xx) are raised immediately.
+
+        Args:
+            fn: Callable receiving a pysolr.Solr bound to the chosen replica
+            timeout: Overall time budget in seconds (default: the node timeout)
+
+        Returns:
+            The result of fn
+
+        Raises:
+            pysolr.SolrError: If no replica could serve the request
+        """
+        tried: List[SolrNode] = []
+        last_error: Optional[Exception] = None
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            node = self._acquire(tried)
+            if node is None:
+                break
+            tried.append(node)
+            node.solr._local.timeout = remaining
+            try:
+                result = fn(node.solr)
+            except Exception as e:
+                budget_cut = remaining is not None and 'timed out' in str(e)
+                if budget_cut or not is_node_failure(e):
+                    # Query errors and caller-imposed timeouts are not the node's fault
+                    self._release(node)
+                    raise
+                self._release(node, e)
+                last_error = e
+                continue
+            finally:
+                node.solr._local.timeout = None
+            self._release(node)
+            return result
+
+        if last_error is not None:
+            raise last_error
+        if deadline is not None and time.monotonic() >= deadline:
+            raise pysolr.SolrError("Solr request budget exhausted")
+        raise pysolr.SolrError("No healthy Solr replicas available")
+
+    def ping(self, node: SolrNode) -> bool:
+        """
+        Health-check a single node with the same query used by stats().
+
+        Args:
+            node: Node to check
+
+        Returns:
+            True if the node answered
+        """
+        try:
+            node.solr.search(q='*:*', rows=0)
+        except Exception as e:
+            with self._lock:
+                self._record_failure(node, e)
+            return False
+        with self._lock:
+            self._record_success(node)
+        return True
+
+    def check_health(self):
+        """Ping every node once, readmitting recovered ones."""
+        for node in self.nodes:
+            self.ping(node)
+
+    def _health_loop(self):
+        """Background loop running periodic health pings."""
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def status(self) -> List[Dict]:
+        """
+        Get per-node status.
+
+        Returns:
+            List of node descriptions
+        """
+        with self._lock:
+            return [node.to_dict() for node in self.nodes]
+
+    def close(self):
+        """Stop health pings and close pooled sessions."""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=1)
+        for node in self.nodes:
+            node.session.close()
@@ -0,0 +1,130 @@
+"""
+Two-phase relevance ranking.
+The first pass fetches the top candidates from Solr with only the fields
+needed for scoring; a blended score of BM25 relevance, rating, popularity
+and recency is then computed for the whole window in one vectorized NumPy
+pass, and only the documents of the requested page are fetched in full.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Fields fetched for every candidate
+FEATURE_FIELDS = ('score', 'rating', 'num_reviews', 'year')
+
+DEFAULT_WEIGHTS = {
+    'relevance': 0.6,
+    'rating': 0.2,
+    'popularity': 0.1,
+    'recency': 0.1
+}
+
+
+def _column(docs: Sequence[Dict], field: str) -> np.ndarray:
+    """Extract a numeric field as a float array, NaN where missing."""
+    return np.array(
+        [doc.get(field) if doc.get(field) is not None else np.nan for doc in docs],
+        dtype=float
+    )
+
+
+class Rescorer:
+    """Reorders a window of Solr candidates by a blended score."""
+
+    def __init__(
+        self,
+        window: int = 200,
+        weights: Optional[Dict[str, float]] = None,
+        half_life_years: float = 15.0
+    ):
+        """
+        Initialize the rescorer.
+
+        Args:
+            window: Number of top Solr candidates rescored
+            weights: Weights of the relevance, rating, popularity and recency
+                features (missing keys keep their defaults)
+            half_life_years: Age at which the recency feature halves
+        """
+        unknown = set(weights or {}) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown rescoring features: {sorted(unknown)}")
+        self.window = window
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.half_life_years = half_life_years
+        self.fields = FEATURE_FIELDS
+
+    def features(self, docs: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Compute normalized features of the candidates.
+
+        Every feature is scaled to [0, 1]; missing values get the window
+        median so they neither help nor hurt a document much.
+
+        Args:
+            docs: Candidate documents with FEATURE_FIELDS
+
+        Returns:
+            Mapping of feature name to array, aligned with docs
+        """
+        score = _column(docs, 'score')
+        rating = _column(docs, 'rating')
+        reviews = _column(docs, 'num_reviews')
+        year = _column(docs, 'year')
+
+        max_score = np.nanmax(score) if np.isfinite(score).any() else 0.0
+        relevance = score / max_score if max_score > 0 else np.ones_like(score)
+
+        popularity = np.log1p(np.clip(reviews, 0, None))
+        max_popularity = np.nanmax(popularity) if np.isfinite(popularity).any() else 0.0
+        if max_popularity > 0:
+            popularity = popularity / max_popularity
+
+        age = np.clip(date.today().year - year, 0, None)
+        recency = np.exp2(-age / self.half_life_years)
+
+        features = {
+            'relevance': relevance,
+            'rating': np.clip(rating / 10.0, 0.0, 1.0),
+            'popularity': popularity,
+            'recency': recency
+        }
+        for name, values in features.items():
+            missing = np.isnan(values)
+            if missing.any():
+                fill = np.nanmedian(values) if not missing.all() else 0.0
+                values[missing] = fill
+        return features
+
+    def blend(self, docs: Sequence[Dict]) -> np.ndarray:
+        """
+        Compute the blended score of each candidate.
+
+        Args:
+            docs: Candidate documents with FEATURE_FIELDS
+
+        Returns:
+            Array of scores aligned with docs
+        """
+        if not docs:
+            return np.zeros(0)
+        features = self.features(docs)
+        return sum(self.weights[name] * values for name, values in features.items())
+
+    def rank(self, docs: Sequence[Dict]) -> List[int]:
+        """
+        Order candidates by blended score.
+
+        Ties keep Solr's order.
+
+        Args:
+            docs: Candidate documents in Solr's order
+
+        Returns:
+            Indices into docs, best first
+        """
+        scores = self.blend(docs)
+        return np.argsort(-scores, kind='stable').tolist()
@@ -0,0 +1,260 @@
+"""
+Client-side sharding for standalone Solr cores.
+Provides consistent-hash routing of documents to shards by id, the
+per-shard parameter rewrite used for scatter-gather queries, and merging
+of shard responses (top-k by sort/score, summed facet counts, pagination).
+
+Run as a script to split a Solr JSON file into per-shard files for
+indexing:
+    python sharding.py ../data/solr/movies.json --shards 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+from functools import cmp_to_key
+from typing import Any, Dict, List, Tuple
+
+
+def jump_consistent_hash(key: int, num_buckets: int) -> int:
+    """
+    Map a 64-bit key to a bucket with Lamping and Veach's jump hash.
+
+    Growing from n to n+1 buckets moves only 1/(n+1) of the keys.
+
+    Args:
+        key: 64-bit unsigned integer key
+        num_buckets: Number of buckets
+
+    Returns:
+        Bucket index in [0, num_buckets)
+    """
+    b, j = -1, 0
+    while j < num_buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def shard_for_id(doc_id: str, num_shards: int) -> int:
+    """
+    Get the shard owning a document.
+
+    Args:
+        doc_id: Document ID
+        num_shards: Number of shards
+
+    Returns:
+        Shard index
+    """
+    key = int.from_bytes(hashlib.md5(str(doc_id).encode('utf-8')).digest()[:8], 'big')
+    return jump_consistent_hash(key, num_shards)
+
+
+def parse_sort(sort: str) -> List[Tuple[str, bool]]:
+    """
+    Parse a Solr sort string.
+
+    Args:
+        sort: e.g. 'rating desc, year asc'
+
+    Returns:
+        List of (field, descending) pairs
+    """
+    clauses = []
+    for clause in sort.split(','):
+        parts = clause.split()
+        if not parts:
+            continue
+        descending = len(parts) > 1 and parts[1].lower() == 'desc'
+        clauses.append((parts[0], descending))
+    return clauses
+
+
+def _sort_clauses(params: Dict) -> List[Tuple[str, bool]]:
+    """Sort clauses of a query; relevance (score desc) when unsorted."""
+    return parse_sort(params['sort']) if params.get('sort') else [('score', True)]
+
+
+def shard_params(params: Dict) -> Dict:
+    """
+    Rewrite query parameters for one shard of a scatter-gather query.
+
+    Every shard must return its own top start+rows documents, with the
+    fields needed to merge them, and over-requested facet counts so the
+    summed top values are accurate.
+
+    Args:
+        params: Client-level Solr parameters
+
+    Returns:
+        Parameters to send to each shard
+    """
+    shard = dict(params)
+    start = int(params.get('start', 0))
+    rows = int(params.get('rows', 10))
+    shard['start'] = 0
+    shard['rows'] = start + rows
+
+    merge_fields = [field for field, _ in _sort_clauses(params)]
+    fl = params.get('fl')
+    if fl and fl != '*':
+        present = set(fl.split(','))
+        missing = [f for f in merge_fields + ['id'] if f not in present]
+        if missing:
+            shard['fl'] = ','.join([fl] + sorted(set(missing)))
+    elif 'score' in merge_fields:
+        shard['fl'] = (fl or '*') + ',score'
+
+    if params.get('facet') == 'true':
+        limit = int(params.get('facet.limit', 100))
+        if limit > 0:
+            # Same over-request rule Solr uses for distributed faceting
+            shard['facet.limit'] = int(limit * 1.5) + 10
+    return shard
+
+
+def _compare_docs(clauses: List[Tuple[str, bool]]):
+    """Build a comparator ordering documents by sort clauses, missing values last."""
+    def compare(a: Tuple[int, int, Dict], b: Tuple[int, int, Dict]) -> int:
+        for field, descending in clauses:
+            va, vb = a[2].get(field), b[2].get(field)
+            if isinstance(va, list):
+                va = va[0] if va else None
+            if isinstance(vb, list):
+                vb = vb[0] if vb else None
+            if va == vb:
+                continue
+            if va is None:
+                return 1
+            if vb is None:
+                return -1
+            result = -1 if va < vb else 1
+            return -result if descending else result
+        # Stable tie-break: shard order, then position within the shard
+        return -1 if (a[0], a[1]) < (b[0], b[1]) else 1
+    return compare
+
+
+def merge_responses(responses: List[Dict], params: Dict, partial: bool = False) -> Dict:
+    """
+    Merge decoded shard responses into one response.
+
+    Args:
+        responses: Decoded Solr responses, one per shard that answered
+        params: Client-level Solr parameters (before shard_params)
+        partial: Whether some shards failed to answer
+
+    Returns:
+        Decoded response in the same shape a single core would return
+    """
+    start = int(params.get('start', 0))
+    rows = int(params.get('rows', 10))
+
+    ranked = []
+    num_found = 0
+    for shard_index, response in enumerate(responses):
+        body = response.get('response') or {}
+        num_found += body.get('numFound', 0)
+        for position, doc in enumerate(body.get('docs', [])):
+            ranked.append((shard_index, position, doc))
+    ranked.sort(key=cmp_to_key(_compare_docs(_sort_clauses(params))))
+
+    # Scores were only added to merge by relevance
+    drop_score = 'score' not in (params.get('fl') or '*').split(',')
+    docs = []
+    for _, _, doc in ranked[start:start + rows]:
+        if drop_score and 'score' in doc:
+            doc = {k: v for k, v in doc.items() if k != 'score'}
+        docs.append(doc)
+
+    merged: Dict[str, Any] = {
+        'responseHeader': {
+            'status': 0,
+            'QTime': max((r.get('responseHeader', {}).get('QTime') or 0) for r in responses),
+            'partialResults': partial or any(
+                r.get('responseHeader', {}).get('partialResults') for r in responses
+            )
+        },
+        'response': {'numFound': num_found, 'start': start, 'docs': docs}
+    }
+
+    if params.get('facet') == 'true':
+        merged['facet_counts'] = {'facet_fields': _merge_facet_fields(responses, params)}
+
+    highlighting: Dict = {}
+    more_like_this: Dict = {}
+    for response in responses:
+        highlighting.update(response.get('highlighting') or {})
+        more_like_this.update(response.get('moreLikeThis') or {})
+    if highlighting:
+        merged['highlighting'] = highlighting
+    if more_like_this:
+        merged['moreLikeThis'] = more_like_this
+    return merged
+
+
+def _merge_facet_fields(responses: List[Dict], params: Dict) -> Dict[str, List]:
+    """Sum per-shard facet counts and keep the top facet.limit values."""
+    limit = int(params.get('facet.limit', 100))
+    totals: Dict[str, Counter] = {}
+    for response in responses:
+        fields = (response.get('facet_counts') or {}).get('facet_fields') or {}
+        for field, values in fields.items():
+            counts = totals.setdefault(field, Counter())
+            for i in range(0, len(values) - 1, 2):
+                counts[values[i]] += values[i + 1]
+
+    merged = {}
+    for field, counts in totals.items():
+        top = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        if limit >= 0:
+            top = top[:limit]
+        merged[field] = [x for pair in top for x in pair]
+    return merged
+
+
+def split_documents(docs: List[Dict], num_shards: int) -> List[List[Dict]]:
+    """
+    Partition documents by owning shard.
+
+    Args:
+        docs: Documents with an 'id' field
+        num_shards: Number of shards
+
+    Returns:
+        One list of documents per shard
+    """
+    shards: List[List[Dict]] = [[] for _ in range(num_shards)]
+    for doc in docs:
+        shards[shard_for_id(doc['id'], num_shards)].append(doc)
+    return shards
+
+
+def main():
+    """Split a Solr JSON document file into one file per shard."""
+    parser = argparse.ArgumentParser(description="Split Solr documents into shard files.")
+    parser.add_argument('input', help="JSON file with a list of documents")
+    parser.add_argument('--shards', type=int, required=True, help="Number of shards")
+    parser.add_argument('--out-dir', help="Output directory (default: next to the input)")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        docs = json.load(f)
+
+    out_dir = args.out_dir or os.path.dirname(os.path.abspath(args.input))
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(args.input))[0]
+
+    for index, shard_docs in enumerate(split_documents(docs, args.shards)):
+        path = os.path.join(out_dir, f'{base}_shard{index}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(shard_docs, f, ensure_ascii=False)
+        print(f"Shard {index}: {len(shard_docs)} documents -> {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+"""
+Slow-query log for Solr requests.
+Queries slower than a threshold are sampled, rate-limited and re-issued in
+the background with debug=timing so Solr reports per-component times
+(query, facet, highlight, mlt, ...). The parameters and the breakdown are
+appended to a rotating JSONL log.
+
+Run as a script to aggregate the log into the top offenders:
+    python slow_query_log.py logs/slow_queries.jsonl --top 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(__file__), 'logs', 'slow_queries.jsonl')
+
+# Parameters that only affect the re-issued debug request
+_IGNORED_PARAMS = ('timeAllowed',)
+
+
+def parse_debug_timing(timing: Dict) -> Dict[str, float]:
+    """
+    Flatten Solr's debug timing section into per-component milliseconds.
+
+    Solr reports each search component under both 'prepare' and 'process';
+    the two phases are summed per component.
+
+    Args:
+        timing: The 'timing' section of a debug=timing response
+
+    Returns:
+        Dictionary mapping component name (query, facet, highlight, mlt,
+        ...) to time in milliseconds
+    """
+    components: Dict[str, float] = defaultdict(float)
+    for phase in ('prepare', 'process'):
+        for name, value in (timing.get(phase) or {}).items():
+            if isinstance(value, dict) and 'time' in value:
+                components[name] += float(value['time'])
+    return dict(components)
+
+
+class SlowQueryLogger:
+    """Samples slow Solr queries and logs their timing breakdowns."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LOG_PATH,
+        threshold: float = 0.5,
+        sample_rate: float = 1.0,
+        max_per_minute: int = 30,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5
+    ):
+        """
+        Initialize the logger.
+
+        Args:
+            path: JSONL log file (rotated as path.1, path.2, ...)
+            threshold: Queries slower than this many seconds are candidates
+            sample_rate: Fraction of slow queries that are captured
+            max_per_minute: Upper bound on debug re-issues per minute
+            max_bytes: Log size before rotation
+            backup_count: Number of rotated files to keep
+        """
+        self.path = path
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.slow = 0
+        self.captured = 0
+        self.dropped = 0
+
+        self._tokens = float(max_per_minute)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._log = logging.getLogger(f'slow_queries.{os.path.abspath(path)}')
+        self._log.setLevel(logging.INFO)
+        self._log.propagate = False
+        if not self._log.handlers:
+            handler = RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._log.addHandler(handler)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=100)
+        self._worker = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+        self._worker.start()
+
+    def _take_token(self) -> bool:
+        """Take one re-issue token from the per-minute budget."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._refilled_at
+            self._refilled_at = now
+            self._tokens = min(
+                float(self.max_per_minute),
+                self._tokens + elapsed * self.max_per_minute / 60.0
+            )
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def observe(
+        self,
+        operation: str,
+        params: Dict,
+        elapsed: float,
+        qtime: Optional[float],
+        reissue: Callable[[Dict], Dict]
+    ):
+        """
+        Consider a completed query for the slow-query log.
+
+        Args:
+            operation: Client method name
+            params: Solr parameters of the query
+            elapsed: Client-side latency in seconds
+            qtime: Solr QTime in seconds, if reported
+            reissue: Callable running the given parameters against Solr and
+                returning the raw decoded response
+        """
+        if elapsed < self.threshold:
+            return
+        with self._lock:
+            self.slow += 1
+        if random.random() >= self.sample_rate or not self._take_token():
+            with self._lock:
+                self.dropped += 1
+            return
+        entry = {
+            'ts': datetime.now(timezone.utc).isoformat(),
+            'operation': operation,
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'qtime_ms': round(qtime * 1000, 1) if qtime is not None else None,
+            'params': {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+        }
+        try:
+            self._queue.put_nowait((entry, reissue))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self):
+        """Worker loop re-issuing captured queries with debug=timing."""
+        while True:
+            entry, reissue = self._queue.get()
+            try:
+                debug_params = dict(entry['params'], debug='timing')
+                response = reissue(debug_params)
+                debug = response.get('debug') or {}
+                timing = debug.get('timing') or {}
+                entry['debug_qtime_ms'] = response.get('responseHeader', {}).get('QTime')
+                entry['timing_ms'] = parse_debug_timing(timing)
+                entry['total_timing_ms'] = timing.get('time')
+            except Exception as e:
+                entry['debug_error'] = str(e)
+            self._log.info(json.dumps(entry, default=str, sort_keys=True))
+            with self._lock:
+                self.captured += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get slow-query counters.
+
+        Returns:
+            Dictionary with slow, captured and dropped counts
+        """
+        with self._lock:
+            return {
+                'slow': self.slow,
+                'captured': self.captured,
+                'dropped': self.dropped
+            }
+
+
+def read_log(path: str) -> Iterator[Dict]:
+    """
+    Read entries from a slow-query log and its rotated backups.
+
+    Args:
+        path: Path of the current log file
+
+    Yields:
+        Decoded log entries, oldest files first
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    base = os.path.basename(path)
+    if not os.path.isdir(directory):
+        return
+    backups = sorted(
+        (f for f in os.listdir(directory) if f.startswith(base + '.') and f[len(base) + 1:].isdigit()),
+        key=lambda f: int(f[len(base) + 1:]),
+        reverse=True
+    )
+    for name in backups + [base]:
+        file_path = os.path.join(directory, name)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def query_signature(params: Dict) -> str:
+    """
+    Build a grouping key from the parameters that shape query cost.
+
+    Args:
+        params: Logged Solr parameters
+
+    Returns:
+        Human-readable signature string
+    """
+    fq = params.get('fq') or []
+    if isinstance(fq, str):
+        fq = [fq]
+    parts = [f"q={params.get('q', '')}"]
+    parts.extend(f'fq={f}' for f in sorted(fq))
+    if params.get('sort'):
+        parts.append(f"sort={params['sort']}")
+    if params.get('facet') == 'true':
+        parts.append(f"facet={params.get('facet.field')}")
+    if params.get('hl') == 'true':
+        parts.append('hl')
+    if params.get('mlt') == 'true':
+        parts.append('mlt')
+    return ' '.join(parts)
+
+
+def top_offenders(entries: Iterator[Dict], top: int = 20) -> List[Dict]:
+    """
+    Aggregate log entries by query signature.
+
+    Args:
+        entries: Slow-query log entries
+        top: Number of groups to return
+
+    Returns:
+        Groups sorted by total elapsed time, each with count, total, mean and
+        max latency and mean per-component Solr time
+    """
+    groups: Dict[str, Dict] = {}
+    for entry in entries:
+        signature = query_signature(entry.get('params') or {})
+        group = groups.setdefault(signature, {
+            'signature': signature,
+            'operation': entry.get('operation'),
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'components': defaultdict(float),
+            'timed': 0
+        })
+        elapsed = entry.get('elapsed_ms') or 0.0
+        group['count'] += 1
+        group['total_ms'] += elapsed
+        group['max_ms'] = max(group['max_ms'], elapsed)
+        if entry.get('timing_ms'):
+            group['timed'] += 1
+            for component, ms in entry['timing_ms'].items():
+                group['components'][component] += ms
+
+    ranked = sorted(groups.values(), key=lambda g: g['total_ms'], reverse=True)[:top]
+    for group in ranked:
+        group['mean_ms'] = group['total_ms'] / group['count']
+        timed = group.pop('timed')
+        group['components'] = {
+            name: total / timed for name, total in group['components'].items()
+        } if timed else {}
+    return ranked
+
+
+def main():
+    """Print the top offenders from a slow-query log."""
+    parser = argparse.ArgumentParser(description="Aggregate the Solr slow-query log.")
+    parser.add_argument('path', nargs='?', default=DEFAULT_LOG_PATH, help="Slow-query log file")
+    parser.add_argument('--top', type=int, default=20, help="Number of offenders to show")
+    args = parser.parse_args()
+
+    offenders = top_offenders(read_log(args.path), args.top)
+    if not offenders:
+        print(f"No slow queries logged in {args.path}")
+        return
+
+    for rank, group in enumerate(offenders, 1):
+        print(
+            f"{rank:>3}. {group['count']:>5}x  total {group['total_ms']:>9.0f} ms  "
+            f"mean {group['mean_ms']:>7.0f} ms  max {group['max_ms']:>7.0f} ms  "
+            f"[{group['operation']}]"
+        )
+        print(f"     {group['signature']}")
+        if group['components']:
+            breakdown = ', '.join(
+                f'{name} {ms:.0f} ms'
+                for name, ms in sorted(group['components'].items(), key=lambda c: -c[1])
+                if ms > 0
+            )
+            print(f"     mean Solr components: {breakdown or 'all < 1 ms'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,23 +3,259 @@ Solr client interface for movie search.
 Provides methods to query Solr and parse results.
 """
 
+import json
+import time
 import pysolr
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Any, Union
 from urllib.parse import urlencode
 
+from metrics import Counter, Histogram
+from replica_pool import ReplicaPool
+from rescoring import Rescorer
+from sharding import merge_responses, shard_for_id, shard_params
+from single_flight import SingleFlight
+from slow_query_log import SlowQueryLogger
+
+
+SOLR_REQUEST_SECONDS = Histogram(
+    'solr_request_seconds', 'Wall time of Solr requests made by SolrClient', ['operation']
+)
+SOLR_QTIME_SECONDS = Histogram(
+    'solr_qtime_seconds', 'Server-side query time reported by Solr (QTime)', ['operation']
+)
+SOLR_NETWORK_SECONDS = Histogram(
+    'solr_network_seconds', 'HTTP transport time of Solr requests excluding QTime', ['operation']
+)
+SOLR_DECODE_SECONDS = Histogram(
+    'solr_decode_seconds', 'Time spent decoding Solr JSON responses', ['operation']
+)
+SOLR_ERRORS = Counter(
+    'solr_errors_total', 'Solr requests that raised an error', ['operation']
+)
+
+
+# Fields returned by search() unless the caller asks for specific ones
+SEARCH_FIELDS = 'id,title,year,rating,genres,directors,cast,plot,reviews,url,site,num_reviews'
+
+# Fields of the NYT articles collection returned by search_articles()
+ARTICLE_FIELDS = 'id,imdb_id,movie_title,headline,abstract,pub_date,web_url'
+
 
 class SolrClient:
     """Interface for querying Solr movies collection."""
     
-    def __init__(self, solr_url: str = 'http://localhost:8983/solr/movies'):
+    def __init__(
+        self,
+        solr_url: Union[str, List[str]] = 'http://localhost:8983/solr/movies',
+        health_interval: float = 10.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        slow_query_logger: Optional[SlowQueryLogger] = None,
+        shards: Optional[List[Union[str, List[str]]]] = None,
+        articles_url: Optional[Union[str, List[str]]] = None
+    ):
         """
         Initialize Solr client.
         
         Args:
-            solr_url: URL of the Solr movies collection
+            solr_url: URL of the Solr movies collection, or a list of replica URLs
+            health_interval: Seconds between replica health pings (0 disables them)
+            failure_threshold: Consecutive failures before a replica is ejected
+            reset_timeout: Seconds before an ejected replica is tried again
+            slow_query_logger: Optional logger capturing timing breakdowns of slow queries
+            shards: Cores each holding one shard of the collection, each given as
+                a URL or a list of replica URLs; overrides solr_url. Documents
+                must be indexed with sharding.py so ids land on their owning shard.
+            articles_url: URL (or replica URLs) of the NYT articles collection
+                used by federated_search()
+        """
+        if shards:
+            shard_urls = [[s] if isinstance(s, str) else list(s) for s in shards]
+        else:
+            shard_urls = [[solr_url] if isinstance(solr_url, str) else list(solr_url)]
+        self.solr_urls = [url for urls in shard_urls for url in urls]
+        self.solr_url = self.solr_urls[0]
+        self.pools = [
+            ReplicaPool(
+                urls,
+                timeout=10,
+                failure_threshold=failure_threshold,
+                reset_timeout=reset_timeout,
+                health_interval=health_interval if len(urls) > 1 else 0
+            )
+            for urls in shard_urls
+        ]
+        self.pool = self.pools[0]
+        self._scatter_executor = None
+        if len(self.pools) > 1:
+            self._scatter_executor = ThreadPoolExecutor(
+                max_workers=4 * len(self.pools), thread_name_prefix='solr-scatter'
+            )
+        self.articles_pool = None
+        if articles_url:
+            article_urls = [articles_url] if isinstance(articles_url, str) else list(articles_url)
+            self.articles_pool = ReplicaPool(
+                article_urls,
+                timeout=10,
+                failure_threshold=failure_threshold,
+                reset_timeout=reset_timeout,
+                health_interval=health_interval if len(article_urls) > 1 else 0
+            )
+            self._federation_executor = ThreadPoolExecutor(
+                max_workers=16, thread_name_prefix='solr-federation'
+            )
+        self._flight = SingleFlight()
+        self.slow_query_logger = slow_query_logger
+        self._index_version: Optional[tuple] = None
+    
+    def _execute(
+        self,
+        operation: str,
+        timeout: Optional[float] = None,
+        shard: Optional[int] = None,
+        pool: Optional[ReplicaPool] = None,
+        **params
+    ) -> pysolr.Results:
+        """
+        Execute a Solr query, coalescing identical concurrent requests.
+        
+        Concurrent callers issuing the same operation with the same shard,
+        parameters and time budget share one request to Solr; an exception
+        raised by that request propagates to all of them. The request is
+        routed to the least-loaded healthy replica. With several shards it
+        is scattered to all of them and the responses are merged, unless a
+        single shard is given.
+        
+        Args:
+            operation: Client method name, used to label metrics
+            timeout: Time budget in seconds; also sent to Solr as timeAllowed
+            shard: Index of the only shard to query
+            pool: Pool of another collection to query instead of the movies
+            **params: Solr query parameters
+            
+        Returns:
+            pysolr Results object (shared between coalesced callers)
+        """
+        query_params = dict(params)
+        if timeout is not None:
+            query_params['timeAllowed'] = max(1, int(timeout * 1000))
+        
+        # Requests only share a response if they go to the same place with
+        # the same timeAllowed, so a tight budget's partial results stay its own
+        key = json.dumps(
+            {'operation': operation, 'shard': shard, 'articles': pool is not None,
+             'params': query_params},
+            sort_keys=True, default=str
+        )
+        
+        def run():
+            try:
+                if pool is not None:
+                    return pool.execute(
+                        lambda solr: self._timed_search(solr, operation, query_params),
+                        timeout=timeout
+                    )
+                if len(self.pools) > 1 and shard is None:
+                    return self._scatter(operation, query_params, timeout)
+                return self.pools[shard or 0].execute(
+                    lambda solr: self._timed_search(solr, operation, query_params),
+                    timeout=timeout
+                )
+            except Exception:
+                SOLR_ERRORS.labels(operation).inc()
+                raise
+        
+        return self._flight.do(key, run, timeout=timeout)
+    
+    def _scatter(self, operation: str, params: Dict, timeout: Optional[float]) -> pysolr.Results:
+        """
+        Query every shard in parallel and merge the responses.
+        
+        Shards that fail are left out and the result is marked partial; the
+        error is raised only if no shard answered.
+        
+        Args:
+            operation: Client method name, used to label metrics
+            params: Solr query parameters
+            timeout: Time budget in seconds for each shard
+            
+        Returns:
+            pysolr Results object built from the merged response
         """
-        self.solr = pysolr.Solr(solr_url, always_commit=True, timeout=10)
-        self.solr_url = solr_url
+        per_shard = shard_params(params)
+        futures = [
+            self._scatter_executor.submit(
+                pool.execute,
+                lambda solr: self._timed_search(solr, operation, per_shard).raw_response,
+                timeout
+            )
+            for pool in self.pools
+        ]
+        responses, errors = [], []
+        for future in futures:
+            try:
+                responses.append(future.result())
+            except Exception as e:
+                errors.append(e)
+        if not responses:
+            raise errors[0]
+        return pysolr.Results(merge_responses(responses, params, partial=bool(errors)))
+    
+    def shard_for(self, doc_id: str) -> Optional[int]:
+        """
+        Get the shard owning a document.
+        
+        Args:
+            doc_id: Document ID
+            
+        Returns:
+            Shard index, or None if the collection is not sharded
+        """
+        if len(self.pools) == 1:
+            return None
+        return shard_for_id(doc_id, len(self.pools))
+    
+    def _timed_search(self, solr: pysolr.Solr, operation: str, params: Dict) -> pysolr.Results:
+        """
+        Run a search on one replica, recording QTime, network and decode time.
+        
+        Args:
+            solr: pysolr client bound to a replica
+            operation: Client method name, used to label metrics
+            params: Solr query parameters
+            
+        Returns:
+            pysolr Results object
+        """
+        started = time.perf_counter()
+        results = solr.search(**params)
+        elapsed = time.perf_counter() - started
+        SOLR_REQUEST_SECONDS.labels(operation).observe(elapsed)
+        
+        timings = solr.request_timings()
+        qtime = (results.qtime or 0) / 1000.0
+        SOLR_QTIME_SECONDS.labels(operation).observe(qtime)
+        SOLR_NETWORK_SECONDS.labels(operation).observe(max(0.0, timings['transport'] - qtime))
+        SOLR_DECODE_SECONDS.labels(operation).observe(timings['decode'])
+        
+        if self.slow_query_logger is not None:
+            self.slow_query_logger.observe(
+                operation, params, elapsed,
+                qtime if results.qtime is not None else None,
+                # Re-issue on the same replica without coalescing or instrumentation
+                lambda debug_params: solr.search(**debug_params).raw_response
+            )
+        return results
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        """
+        Get request coalescing counters.
+        
+        Returns:
+            Dictionary with executed, coalesced and in-flight request counts
+        """
+        return self._flight.stats()
     
     def search(
         self,
@@ -29,11 +265,19 @@ class SolrClient:
         sort: Optional[str] = None,
         start: int = 0,
         rows: int = 10,
-        highlight: bool = False
+        highlight: bool = False,
+        timeout: Optional[float] = None,
+        fields: Optional[List[str]] = None,
+        rescorer: Optional[Rescorer] = None
     ) -> Dict:
         """
         Perform a search query on Solr.
         
+        With a rescorer, relevance-ranked pages inside its window are
+        ranked in two phases: the top candidates are fetched with scoring
+        fields only and reordered, then only the page's documents are
+        fetched in full.
+        
         Args:
             query: Main search query (searches the 'text' field by default)
             filters: Dictionary of filter queries (fq parameters)
@@ -42,6 +286,9 @@ class SolrClient:
             start: Start position for pagination
             rows: Number of results to return
             highlight: Whether to enable highlighting
+            timeout: Time budget in seconds (default: the client timeout)
+            fields: Fields to return (default: all display fields)
+            rescorer: Optional blended rescoring of relevance-ranked results
             
         Returns:
             Dictionary with results, facets, and metadata
@@ -51,7 +298,7 @@ class SolrClient:
             'q': f'text:{query}' if query != '*:*' else query,
             'start': start,
             'rows': rows,
-            'fl': 'id,title,year,rating,genres,directors,cast,plot,reviews,url,site,num_reviews'
+            'fl': ','.join(fields) if fields else SEARCH_FIELDS
         }
         
         # Add sort
@@ -60,18 +307,7 @@ class SolrClient:
         
         # Add filter queries
         if filters:
-            fq_list = []
-            for field, value in filters.items():
-                if isinstance(value, list):
-                    # Multiple values for same field (OR)
-                    or_clauses = [f'{field}:"{v}"' for v in value]
-                    fq_list.append(f"({' OR '.join(or_clauses)})")
-                elif isinstance(value, tuple) and len(value) == 2:
-                    # Range query (e.g., year:[2000 TO 2024])
-                    fq_list.append(f'{field}:[{value[0]} TO {value[1]}]')
-                else:
-                    fq_list.append(f'{field}:"{value}"')
-            params['fq'] = fq_list
+            params['fq'] = self._filter_queries(filters)
         
         # Add faceting
         if facets:
@@ -90,18 +326,27 @@ class SolrClient:
         
         # Execute search
         try:
-            results = self.solr.search(**params)
+            if rescorer is not None and not sort and start + rows <= rescorer.window:
+                results, docs, highlighting, partial = self._two_phase_search(
+                    params, rescorer, timeout
+                )
+            else:
+                results = self._execute('search', timeout=timeout, **params)
+                docs = [dict(doc) for doc in results.docs]
+                highlighting = results.highlighting
+                partial = self._is_partial(results)
             
             # Parse response
             response = {
-                'docs': list(results.docs),
+                'docs': docs,
                 'num_found': results.hits,
                 'start': start,
                 'rows': rows,
                 'query': query,
                 'filters': filters or {},
                 'facets': self._parse_facets(results.facets) if facets else {},
-                'highlighting': results.highlighting if highlight else {}
+                'highlighting': highlighting if highlight else {},
+                'partial': partial
             }
             
             return response
@@ -116,6 +361,219 @@ class SolrClient:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _filter_queries(filters: Optional[Dict[str, Any]]) -> List[str]:
+        """
+        Build filter queries (fq) from a filters dictionary.
+        
+        Args:
+            filters: Field to value (string), values (list, OR) or range (tuple)
+            
+        Returns:
+            List of fq strings
+        """
+        fq_list = []
+        for field, value in (filters or {}).items():
+            if isinstance(value, list):
+                # Multiple values for same field (OR)
+                or_clauses = [f'{field}:"{v}"' for v in value]
+                fq_list.append(f"({' OR '.join(or_clauses)})")
+            elif isinstance(value, tuple) and len(value) == 2:
+                # Range query (e.g., year:[2000 TO 2024])
+                fq_list.append(f'{field}:[{value[0]} TO {value[1]}]')
+            else:
+                fq_list.append(f'{field}:"{value}"')
+        return fq_list
+    
+    def _two_phase_search(
+        self,
+        params: Dict,
+        rescorer: Rescorer,
+        timeout: Optional[float]
+    ) -> tuple:
+        """
+        Rank a page by rescoring the top candidates, then fetch it in full.
+        
+        Args:
+            params: Solr parameters of the page as built by search()
+            rescorer: Rescorer whose window covers the page
+            timeout: Time budget in seconds for both phases
+            
+        Returns:
+            Tuple of (candidate Results carrying hits and facets, page
+            documents in rescored order, highlighting, partial flag)
+        """
+        started = time.monotonic()
+        start, rows = params['start'], params['rows']
+        
+        # Phase 1: candidates with scoring fields only; facets come along
+        candidate_params = {
+            key: value for key, value in params.items()
+            if key != 'hl' and not key.startswith('hl.')
+        }
+        candidate_params.update(start=0, rows=rescorer.window, fl='id,' + ','.join(rescorer.fields))
+        candidates = self._execute('rescore_candidates', timeout=timeout, **candidate_params)
+        
+        order = rescorer.rank(candidates.docs)[start:start + rows]
+        page_ids = [candidates.docs[i]['id'] for i in order]
+        if not page_ids:
+            return candidates, [], {}, self._is_partial(candidates)
+        
+        # Phase 2: full documents (and highlighting) for the page only
+        page_params = {
+            key: value for key, value in params.items()
+            if key != 'facet' and not key.startswith('facet.')
+        }
+        page_params.update(
+            start=0,
+            rows=len(page_ids),
+            fq=list(params.get('fq', [])) + ['{!terms f=id}' + ','.join(page_ids)]
+        )
+        remaining = None if timeout is None else max(0.001, timeout - (time.monotonic() - started))
+        page = self._execute('rescore_page', timeout=remaining, **page_params)
+        
+        by_id = {doc['id']: dict(doc) for doc in page.docs}
+        docs = [by_id[doc_id] for doc_id in page_ids if doc_id in by_id]
+        partial = self._is_partial(candidates) or self._is_partial(page)
+        return candidates, docs, page.highlighting, partial
+    
+    @staticmethod
+    def _is_partial(results: pysolr.Results) -> bool:
+        """Whether Solr cut the query short (timeAllowed or a failed shard)."""
+        return bool(results.raw_response.get('responseHeader', {}).get('partialResults', False))
+    
+    def search_articles(
+        self,
+        query: str,
+        rows: int = 50,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Search the NYT articles collection.
+        
+        Args:
+            query: Search query
+            rows: Maximum number of articles
+            timeout: Time budget in seconds
+            
+        Returns:
+            Matching articles, best first
+            
+        Raises:
+            RuntimeError: If no articles collection is configured
+        """
+        if self.articles_pool is None:
+            raise RuntimeError("No articles collection configured")
+        results = self._execute(
+            'search_articles',
+            timeout=timeout,
+            pool=self.articles_pool,
+            q=query,
+            defType='edismax',
+            qf='headline^3 abstract^2 snippet lead_paragraph movie_title',
+            fl=ARTICLE_FIELDS,
+            rows=rows
+        )
+        return [dict(doc) for doc in results.docs]
+    
+    def federated_search(
+        self,
+        query: str = '*:*',
+        filters: Optional[Dict[str, Any]] = None,
+        facets: Optional[List[str]] = None,
+        sort: Optional[str] = None,
+        start: int = 0,
+        rows: int = 10,
+        highlight: bool = False,
+        timeout: Optional[float] = None,
+        rescorer: Optional[Rescorer] = None,
+        article_rows: int = 50,
+        related_rows: int = 5
+    ) -> Dict:
+        """
+        Search movies and NYT articles in parallel and join articles to movies.
+        
+        Movies on the page get their matching articles. Movies matched only
+        through articles are fetched with the same filters as related
+        movies. Without an articles collection, or for match-all queries,
+        this is a plain search(); if the articles query fails the movie
+        results are still returned.
+        
+        Args:
+            query: Main search query
+            filters, facets, sort, start, rows, highlight, rescorer: As for search()
+            timeout: Time budget in seconds for the whole call
+            article_rows: Maximum number of article hits to join
+            related_rows: Maximum number of movies matched only through articles
+            
+        Returns:
+            search() result plus 'article_groups': a list of
+            {'movie', 'articles', 'on_page'} entries, page movies first
+        """
+        search_kwargs = dict(
+            query=query, filters=filters, facets=facets, sort=sort, start=start,
+            rows=rows, highlight=highlight, timeout=timeout, rescorer=rescorer
+        )
+        if self.articles_pool is None or query == '*:*':
+            return self.search(**search_kwargs)
+        
+        started = time.monotonic()
+        movies_future = self._federation_executor.submit(self.search, **search_kwargs)
+        articles_future = self._federation_executor.submit(
+            self.search_articles, query, article_rows, timeout
+        )
+        
+        # Join: group article hits by movie, keeping the articles' rank order
+        by_movie: Dict[str, List[Dict]] = {}
+        articles_error = None
+        try:
+            for article in articles_future.result():
+                if article.get('imdb_id'):
+                    by_movie.setdefault(article['imdb_id'], []).append(article)
+        except Exception as e:
+            print(f"Article search error: {e}")
+            articles_error = str(e)
+        
+        response = movies_future.result()
+        page_ids = {doc['id'] for doc in response['docs']}
+        groups = [
+            {'movie': doc, 'articles': by_movie[doc['id']], 'on_page': True}
+            for doc in response['docs'] if doc['id'] in by_movie
+        ]
+        
+        related_ids = [movie_id for movie_id in by_movie if movie_id not in page_ids][:related_rows]
+        if related_ids and 'error' not in response:
+            remaining = None if timeout is None else timeout - (time.monotonic() - started)
+            if remaining is None or remaining > 0:
+                groups.extend(
+                    {'movie': movie, 'articles': by_movie[movie['id']], 'on_page': False}
+                    for movie in self._get_filtered(related_ids, filters, remaining)
+                )
+        
+        response['article_groups'] = groups
+        if articles_error is not None:
+            response['articles_error'] = articles_error
+        return response
+    
+    def _get_filtered(
+        self,
+        doc_ids: List[str],
+        filters: Optional[Dict[str, Any]],
+        timeout: Optional[float]
+    ) -> List[Dict]:
+        """Fetch the given movies that pass the filters, in the given order."""
+        fq = self._filter_queries(filters) + ['{!terms f=id}' + ','.join(doc_ids)]
+        try:
+            results = self._execute(
+                'get_filtered', timeout=timeout, q='*:*', fq=fq,
+                fl='id,title,year,rating', rows=len(doc_ids)
+            )
+        except Exception as e:
+            print(f"Related movies error: {e}")
+            return []
+        by_id = {doc['id']: dict(doc) for doc in results.docs}
+        return [by_id[doc_id] for doc_id in doc_ids if doc_id in by_id]
+    
     def more_like_this(
         self,
         doc_id: str,
@@ -125,6 +583,8 @@ class SolrClient:
         """
         Find similar movies using MoreLikeThis.
         
+        On a sharded collection only the shard owning doc_id is searched.
+        
         Args:
             doc_id: ID of the document to find similar items for
             mlt_fields: Fields to use for similarity (default: text, genres, cast)
@@ -149,13 +609,13 @@ class SolrClient:
         }
         
         try:
-            results = self.solr.search(**params)
+            results = self._execute('more_like_this', shard=self.shard_for(doc_id), **params)
             
-            # Extract MLT results
-            similar_docs = []
-            if hasattr(results, 'moreLikeThis') and results.moreLikeThis:
-                mlt_results = results.moreLikeThis.get(doc_id, [])
-                similar_docs = list(mlt_results)
+            # Extract MLT results ({id: {numFound, start, docs}} in the raw response)
+            mlt_results = (results.raw_response.get('moreLikeThis') or {}).get(doc_id) or {}
+            if isinstance(mlt_results, dict):
+                mlt_results = mlt_results.get('docs', [])
+            similar_docs = [dict(doc) for doc in mlt_results]
             
             return {
                 'docs': similar_docs,
@@ -171,25 +631,59 @@ class SolrClient:
                 'error': str(e)
             }
     
-    def get_by_id(self, doc_id: str) -> Optional[Dict]:
+    def get_by_id(
+        self,
+        doc_id: str,
+        on_missing: Optional[Callable[[str], None]] = None
+    ) -> Optional[Dict]:
         """
         Get a specific movie by ID.
         
         Args:
             doc_id: Document ID
+            on_missing: Called with doc_id if Solr answered that it does not
+                exist (not on errors)
             
         Returns:
             Movie document or None if not found
         """
         try:
-            results = self.solr.search(q=f'id:{doc_id}', rows=1)
+            results = self._execute(
+                'get_by_id', shard=self.shard_for(doc_id), q=f'id:{doc_id}', rows=1
+            )
             if results.docs:
-                return results.docs[0]
+                return dict(results.docs[0])
+            if on_missing is not None:
+                on_missing(doc_id)
             return None
         except Exception as e:
             print(f"Get by ID error: {e}")
             return None
     
+    def iter_ids(self, batch_size: int = 10000) -> Iterator[str]:
+        """
+        Iterate over the IDs of all indexed documents with cursorMark paging.
+        
+        Args:
+            batch_size: IDs fetched per request
+            
+        Yields:
+            Document IDs
+        """
+        shards = range(len(self.pools)) if len(self.pools) > 1 else [None]
+        for shard in shards:
+            cursor = '*'
+            while True:
+                results = self._execute(
+                    'iter_ids', shard=shard, q='*:*', fl='id', sort='id asc',
+                    rows=batch_size, cursorMark=cursor
+                )
+                for doc in results.docs:
+                    yield doc['id']
+                if not results.nextCursorMark or results.nextCursorMark == cursor:
+                    break
+                cursor = results.nextCursorMark
+    
     def _parse_facets(self, facet_data: Dict) -> Dict:
         """
         Parse facet data from Solr response.
@@ -229,19 +723,89 @@ class SolrClient:
             List of facet values with counts
         """
         try:
-            results = self.solr.search(
+            results = self._execute(
+                'get_facet_values',
                 q='*:*',
                 rows=0,
                 facet='true',
-                facet_field=field,
-                facet_mincount=1,
-                facet_limit=limit
+                **{
+                    'facet.field': field,
+                    'facet.mincount': 1,
+                    'facet.limit': limit
+                }
             )
             return self._parse_facets(results.facets).get(field, [])
         except Exception as e:
             print(f"Get facet values error: {e}")
             return []
     
+    def index_version(self, max_age: float = 5.0) -> Optional[str]:
+        """
+        Get the version of the Solr index.
+        
+        The version changes whenever a commit changes the index, so it can
+        key caches of anything derived from search results. The value is
+        cached for max_age seconds to keep Solr off the hot path.
+        
+        Args:
+            max_age: Seconds a previously fetched version may be reused
+            
+        Returns:
+            Index version string (one part per shard, plus one for the
+            articles collection), or None if Solr could not be reached
+        """
+        now = time.monotonic()
+        cached = self._index_version
+        if cached is not None and now - cached[1] < max_age:
+            return cached[0]
+        
+        def fetch(pool: ReplicaPool) -> str:
+            return pool.execute(
+                lambda solr: solr._send_request('get', 'admin/luke?show=index&numTerms=0&wt=json')
+            )
+        
+        try:
+            parts = []
+            for i, pool in enumerate(self.pools):
+                raw = self._flight.do(f'admin/luke/{i}', lambda: fetch(pool))
+                info = json.loads(raw).get('index', {})
+                parts.append(f"{info.get('version')}-{info.get('numDocs')}")
+        except Exception as e:
+            print(f"Index version error: {e}")
+            return cached[0] if cached is not None else None
+        
+        if self.articles_pool is not None:
+            # Movies stay cacheable while the articles collection is down
+            try:
+                raw = self._flight.do('admin/luke/articles', lambda: fetch(self.articles_pool))
+                info = json.loads(raw).get('index', {})
+                parts.append(f"{info.get('version')}-{info.get('numDocs')}")
+            except Exception as e:
+                print(f"Articles index version error: {e}")
+                parts.append('unavailable')
+        version = '.'.join(parts)
+        
+        self._index_version = (version, now)
+        return version
+    
+    def replica_status(self) -> List[Dict]:
+        """
+        Get the status of every replica of every shard.
+        
+        Returns:
+            List of node descriptions, each with its collection and shard index
+        """
+        nodes = [
+            dict(node, collection='movies', shard=i)
+            for i, pool in enumerate(self.pools)
+            for node in pool.status()
+        ]
+        if self.articles_pool is not None:
+            nodes.extend(
+                dict(node, collection='articles', shard=0) for node in self.articles_pool.status()
+            )
+        return nodes
+    
     def stats(self) -> Dict:
         """
         Get collection statistics.
@@ -250,14 +814,16 @@ class SolrClient:
             Dictionary with collection stats
         """
         try:
-            results = self.solr.search(q='*:*', rows=0)
+            results = self._execute('stats', q='*:*', rows=0)
             return {
                 'total_docs': results.hits,
-                'status': 'ok'
+                'status': 'ok',
+                'replicas': self.replica_status()
             }
         except Exception as e:
             return {
                 'total_docs': 0,
                 'status': 'error',
-                'error': str(e)
+                'error': str(e),
+                'replicas': self.replica_status()
             }